@@ -3,7 +3,7 @@ import logging
 from datetime import datetime, timedelta
 import json
 import calendar
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
 from zoneinfo import ZoneInfo
 
 from aiogram import Router, F
@@ -14,7 +14,8 @@ from aiogram.types import Message, CallbackQuery, InlineKeyboardMarkup, InlineKe
 from aiogram import types
 from aiogram.filters.callback_data import CallbackData
 
-from ..config import API_URL
+from ..services.catalog import get_service, get_services
+from ..services.http_client import api
 from . import clients, services
 from .profile import get_admin_timezone
 
@@ -68,81 +69,125 @@ class ClientCallback(CallbackData, prefix="client"):
 class ServiceCallback(CallbackData, prefix="service"):
     id: int
 
+class AppointmentsPageCallback(CallbackData, prefix="appointments_page"):
+    direction: str  # next - записи после курсора, prev - перед ним
+    after_time: int  # время записи-курсора (unix-время в микросекундах, UTC: ключ сравнивается точно)
+    after_id: int
+
+# Записей на одной странице списка /appointments
+APPOINTMENTS_PAGE_SIZE = 10
+
+async def appointments_page_view(
+    admin_timezone: str,
+    page: Optional[AppointmentsPageCallback] = None
+) -> Tuple[str, InlineKeyboardMarkup]:
+    """Текст и клавиатура страницы предстоящих записей.
+
+    Страница загружается одним запросом: сервер отдает APPOINTMENTS_PAGE_SIZE записей от
+    курсора со встроенным клиентом (expand=client). Предыдущая страница - те же записи в
+    обратном порядке (order_by=-scheduled_time) от первой записи текущей.
+
+    Нижняя граница from округляется до минуты: в пределах минуты адрес страницы не меняется,
+    и сервер отвечает из кеша (или 304 на условный GET). Позицию в списке задает курсор.
+    """
+    backward = page is not None and page.direction == "prev"
+    result = await api.appointments_page(
+        from_time=datetime.utcnow().replace(second=0, microsecond=0),
+        order_by="-scheduled_time" if backward else "scheduled_time",
+        expand="client",
+        after_time=UNIX_EPOCH + timedelta(microseconds=page.after_time) if page else None,
+        after_id=page.after_id if page else None,
+        limit=APPOINTMENTS_PAGE_SIZE
+    )
+    appointments = result["items"]
+    if backward:
+        appointments.reverse()
+    more = result["next_cursor"] is not None
+    has_prev = more if backward else page is not None
+    has_next = page is not None if backward else more
+
+    buttons = []
+    for appointment in appointments:
+        client_data = appointment.get('client')
+        if not client_data:
+            logger.warning(f"Нет данных клиента {appointment['client_id']} в записи {appointment['id']}")
+            continue
+        
+        # Форматируем дату и время с учетом часового пояса администратора
+        scheduled_time = datetime.fromisoformat(appointment['scheduled_time'].replace('Z', '+00:00')).replace(tzinfo=ZoneInfo("UTC"))
+        local_time = scheduled_time.astimezone(ZoneInfo(admin_timezone))
+        formatted_time = local_time.strftime("%d.%m.%Y %H:%M")
+        
+        buttons.append([
+            InlineKeyboardButton(
+                text=f"{client_data['name']} - {formatted_time}",
+                callback_data=AppointmentCallback(id=appointment['id'], action="view").pack()
+            )
+        ])
+    
+    # Переход между страницами: курсор - первая или последняя запись страницы
+    navigation = []
+    if appointments and has_prev:
+        first = appointments[0]
+        navigation.append(InlineKeyboardButton(
+            text="⬅️ Назад",
+            callback_data=AppointmentsPageCallback(
+                direction="prev", after_time=_unix_micros(first['scheduled_time']), after_id=first['id']
+            ).pack()
+        ))
+    if appointments and has_next:
+        last = appointments[-1]
+        navigation.append(InlineKeyboardButton(
+            text="Вперед ➡️",
+            callback_data=AppointmentsPageCallback(
+                direction="next", after_time=_unix_micros(last['scheduled_time']), after_id=last['id']
+            ).pack()
+        ))
+    if navigation:
+        buttons.append(navigation)
+    
+    # Добавляем кнопки управления
+    buttons.extend([
+        [InlineKeyboardButton(text="➕ Создать запись", callback_data="create_appointment")],
+        [InlineKeyboardButton(text="🏠 Главное меню", callback_data="main_menu")]
+    ])
+    
+    text = "📝 Предстоящие записи:" if appointments else "📝 Нет предстоящих записей"
+    return text, InlineKeyboardMarkup(inline_keyboard=buttons)
+
+UNIX_EPOCH = datetime(1970, 1, 1)
+
+def _unix_micros(value: str) -> int:
+    """Время записи из ответа API (UTC) в unix-время с микросекундами для callback_data"""
+    moment = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    if moment.tzinfo is not None:
+        moment = moment.astimezone(ZoneInfo("UTC")).replace(tzinfo=None)
+    return (moment - UNIX_EPOCH) // timedelta(microseconds=1)
+
 @router.message(Command("appointments"))
 async def command_appointments(message: Message):
-    """Обработчик команды /appointments - показывает список записей"""
+    """Обработчик команды /appointments - показывает первую страницу предстоящих записей"""
     try:
         # Получаем часовой пояс администратора
         admin_timezone = get_admin_timezone(message.from_user.id)
-        
-        # Получаем список записей
-        async with httpx.AsyncClient() as client:
-            # Сначала получаем список всех записей
-            response = await client.get(f"{API_URL}/appointments")
-            response.raise_for_status()
-            appointments = response.json()
-            
-            if not appointments:
-                keyboard = InlineKeyboardMarkup(inline_keyboard=[
-                    [InlineKeyboardButton(text="➕ Создать запись", callback_data="create_appointment")],
-                    [InlineKeyboardButton(text="🏠 Главное меню", callback_data="main_menu")]
-                ])
-                await message.answer("📝 Нет доступных записей", reply_markup=keyboard)
-                return
-            
-            # Сортируем записи по времени
-            appointments.sort(key=lambda x: x['scheduled_time'])
-            
-            # Создаем список кнопок
-            buttons = []
-            
-            for appointment in appointments:
-                # Получаем информацию о клиенте
-                try:
-                    client_response = await client.get(f"{API_URL}/clients/{appointment['client_id']}")
-                    client_response.raise_for_status()
-                        
-                    client_data = client_response.json()
-                    if not client_data:
-                        logger.warning(f"Получен пустой ответ для клиента {appointment['client_id']}")
-                        continue
-                    
-                    # Форматируем дату и время с учетом часового пояса администратора
-                    scheduled_time = datetime.fromisoformat(appointment['scheduled_time'].replace('Z', '+00:00')).replace(tzinfo=ZoneInfo("UTC"))
-                    local_time = scheduled_time.astimezone(ZoneInfo(admin_timezone))
-                    formatted_time = local_time.strftime("%d.%m.%Y %H:%M")
-                    
-                    buttons.append([
-                        InlineKeyboardButton(
-                            text=f"{client_data['name']} - {formatted_time}",
-                            callback_data=AppointmentCallback(id=appointment['id'], action="view").pack()
-                        )
-                    ])
-                except Exception as e:
-                    logger.error(f"Ошибка при получении информации о клиенте {appointment.get('client_id', 'unknown')}: {e}")
-                    continue
-            
-            if not buttons:
-                keyboard = InlineKeyboardMarkup(inline_keyboard=[
-                    [InlineKeyboardButton(text="➕ Создать запись", callback_data="create_appointment")],
-                    [InlineKeyboardButton(text="🏠 Главное меню", callback_data="main_menu")]
-                ])
-                await message.answer("📝 Нет доступных записей", reply_markup=keyboard)
-                return
-            
-            # Добавляем кнопки управления
-            buttons.extend([
-                [InlineKeyboardButton(text="➕ Создать запись", callback_data="create_appointment")],
-                [InlineKeyboardButton(text="🏠 Главное меню", callback_data="main_menu")]
-            ])
-            
-            keyboard = InlineKeyboardMarkup(inline_keyboard=buttons)
-            await message.answer("📝 Список записей:", reply_markup=keyboard)
-            
+        text, keyboard = await appointments_page_view(admin_timezone)
+        await message.answer(text, reply_markup=keyboard)
     except Exception as e:
         logger.error(f"Ошибка при получении списка записей: {e}")
         await message.answer("❌ Произошла ошибка при получении списка записей")
 
+@router.callback_query(AppointmentsPageCallback.filter())
+async def process_appointments_page(callback: CallbackQuery, callback_data: AppointmentsPageCallback):
+    """Переход на соседнюю страницу списка записей"""
+    try:
+        admin_timezone = get_admin_timezone(callback.from_user.id)
+        text, keyboard = await appointments_page_view(admin_timezone, callback_data)
+        await callback.message.edit_text(text, reply_markup=keyboard)
+    except Exception as e:
+        logger.error(f"Ошибка при получении страницы записей: {e}")
+        await callback.message.answer("❌ Произошла ошибка при получении списка записей")
+    await callback.answer()
+
 @router.callback_query(lambda c: c.data == "create_appointment")
 async def process_create_appointment_callback(callback: types.CallbackQuery, state: FSMContext):
     """Начало создания записи"""
@@ -154,7 +199,8 @@ async def process_date(message: Message, state: FSMContext):
     """Обработка ввода даты"""
     try:
         date = datetime.strptime(message.text, "%d.%m.%Y")
-        await state.update_data(date=date)
+        # Данные состояния хранятся в JSON - даты сохраняем строками ISO 8601
+        await state.update_data(date=date.date().isoformat())
         await state.set_state(CreateAppointmentState.waiting_for_time)
         await message.answer("⏰ Введите время в формате ЧЧ:ММ")
     except ValueError:
@@ -166,24 +212,22 @@ async def process_time(message: Message, state: FSMContext):
     try:
         time = datetime.strptime(message.text, "%H:%M")
         data = await state.get_data()
-        date = data["date"]
+        date = datetime.fromisoformat(data["date"])
         scheduled_time = datetime.combine(date.date(), time.time())
-        await state.update_data(scheduled_time=scheduled_time)
+        await state.update_data(scheduled_time=scheduled_time.isoformat())
         
         # Показываем список клиентов
-        async with httpx.AsyncClient() as client:
-            response = await client.get(f"{API_URL}/clients")
-            clients = response.json()
-            
-            keyboard = InlineKeyboardMarkup(inline_keyboard=[
-                [InlineKeyboardButton(
-                    text=f"{client['name']} ({client['phone_number']})",
-                    callback_data=SelectClientCallback(id=client["id"]).pack()
-                )] for client in clients
-            ])
-            
-            await state.set_state(CreateAppointmentState.waiting_for_client)
-            await message.answer("👤 Выберите клиента:", reply_markup=keyboard)
+        clients = await api.list_clients()
+        
+        keyboard = InlineKeyboardMarkup(inline_keyboard=[
+            [InlineKeyboardButton(
+                text=f"{client['name']} ({client['phone_number']})",
+                callback_data=SelectClientCallback(id=client["id"]).pack()
+            )] for client in clients
+        ])
+        
+        await state.set_state(CreateAppointmentState.waiting_for_client)
+        await message.answer("👤 Выберите клиента:", reply_markup=keyboard)
     except ValueError:
         await message.answer("❌ Неверный формат времени. Введите время в формате ЧЧ:ММ")
 
@@ -193,19 +237,17 @@ async def process_client_selection(callback: CallbackQuery, callback_data: Selec
     await state.update_data(client_id=callback_data.id)
     
     # Показываем список услуг
-    async with httpx.AsyncClient() as client:
-        response = await client.get(f"{API_URL}/services")
-        services = response.json()
-        
-        keyboard = InlineKeyboardMarkup(inline_keyboard=[
-            [InlineKeyboardButton(
-                text=f"{service['name']} - {service['price']}₽",
-                callback_data=SelectServiceCallback(id=service["id"]).pack()
-            )] for service in services
-        ])
-        
-        await state.set_state(CreateAppointmentState.waiting_for_service)
-        await callback.message.answer("🔧 Выберите услугу:", reply_markup=keyboard)
+    services = await get_services()
+    
+    keyboard = InlineKeyboardMarkup(inline_keyboard=[
+        [InlineKeyboardButton(
+            text=f"{service['name']} - {service['price']}₽",
+            callback_data=SelectServiceCallback(id=service["id"]).pack()
+        )] for service in services
+    ])
+    
+    await state.set_state(CreateAppointmentState.waiting_for_service)
+    await callback.message.answer("🔧 Выберите услугу:", reply_markup=keyboard)
 
 @router.callback_query(SelectServiceCallback.filter(), CreateAppointmentState.waiting_for_service)
 async def process_service_selection(callback: CallbackQuery, callback_data: SelectServiceCallback, state: FSMContext):
@@ -214,78 +256,76 @@ async def process_service_selection(callback: CallbackQuery, callback_data: Sele
     
     try:
         # Создаем запись
-        async with httpx.AsyncClient() as client:
-            logger.info(f"Начинаем создание записи администратором: клиент ID {data['client_id']}, услуга ID {callback_data.id}")
-            
-            appointment_data = {
-                "client_id": data["client_id"],
-                "service_id": callback_data.id,
-                "scheduled_time": data["scheduled_time"].isoformat(),
-                "status": "confirmed",  # Записи, созданные администратором, сразу подтверждаются
-                "car_model": None
-            }
-            
-            # Создаем запись
-            response = await client.post(f"{API_URL}/appointments", json=appointment_data)
-            if response.status_code != 200:
-                logger.error(f"Ошибка при создании записи: {response.status_code}, {response.text}")
-                await callback.message.answer(f"❌ Ошибка при создании записи: {response.status_code}")
-                await state.clear()
-                return
-                
-            appointment = response.json()
-            logger.info(f"Создана запись: {appointment}")
-            
-            # Получаем информацию о клиенте
-            client_response = await client.get(f"{API_URL}/clients/{data['client_id']}")
-            if client_response.status_code != 200:
-                logger.error(f"Ошибка при получении клиента: {client_response.status_code}, {client_response.text}")
-                await callback.message.answer(f"✅ Запись создана, но возникла ошибка при получении данных клиента")
-                await command_appointments(callback.message)
-                await state.clear()
-                return
-                
-            client_data = client_response.json()
-            logger.info(f"Получен клиент: {client_data}")
+        logger.info(f"Начинаем создание записи администратором: клиент ID {data['client_id']}, услуга ID {callback_data.id}")
+        
+        appointment_data = {
+            "client_id": data["client_id"],
+            "service_id": callback_data.id,
+            "scheduled_time": data["scheduled_time"],
+            "status": "confirmed",  # Записи, созданные администратором, сразу подтверждаются
+            "car_model": None
+        }
+        
+        # Создаем запись
+        try:
+            appointment = await api.create_appointment(appointment_data)
+        except httpx.HTTPStatusError as e:
+            logger.error(f"Ошибка при создании записи: {e.response.status_code}, {e.response.text}")
+            await callback.message.answer(f"❌ Ошибка при создании записи: {e.response.status_code}")
+            await state.clear()
+            return
             
-            # Получаем информацию об услуге
-            service_response = await client.get(f"{API_URL}/services/{callback_data.id}")
-            if service_response.status_code != 200:
-                logger.error(f"Ошибка при получении услуги: {service_response.status_code}, {service_response.text}")
-                await callback.message.answer(f"✅ Запись создана, но возникла ошибка при получении данных услуги")
-                await command_appointments(callback.message)
-                await state.clear()
-                return
-                
-            service_data = service_response.json()
-            logger.info(f"Получена услуга: {service_data}")
+        logger.info(f"Создана запись: {appointment}")
+        
+        # Получаем информацию о клиенте
+        client_data = await api.get_client(data['client_id'])
+        if client_data is None:
+            logger.error(f"Клиент {data['client_id']} не найден")
+            await callback.message.answer(f"✅ Запись создана, но возникла ошибка при получении данных клиента")
+            await command_appointments(callback.message)
+            await state.clear()
+            return
             
-            # Форматируем дату и время для уведомления
-            formatted_time = data["scheduled_time"].strftime("%d.%m.%Y %H:%M")
+        logger.info(f"Получен клиент: {client_data}")
+        
+        # Получаем информацию об услуге
+        service_data = await get_service(callback_data.id)
+        if service_data is None:
+            logger.error(f"Услуга {callback_data.id} не найдена")
+            await callback.message.answer(f"✅ Запись создана, но возникла ошибка при получении данных услуги")
+            await command_appointments(callback.message)
+            await state.clear()
+            return
             
-            # Создаем сообщение для клиента
-            message_data = {
-                "text": f"✅ Администратор создал для вас запись на услугу \"{service_data['name']}\"!\n\n"
-                        f"📅 Дата и время: {formatted_time}\n"
-                        f"💰 Стоимость: {service_data['price']} руб.\n\n"
-                        f"Ждем вас по адресу: ул. Автосервисная, 123\n"
-                        f"Контактный телефон: +7 (123) 456-78-90",
-                "user_id": client_data['id'],
-                "is_from_admin": 1,  # Сообщение от администратора
-                "is_read": 0  # Непрочитанное
-            }
+        logger.info(f"Получена услуга: {service_data}")
+        
+        # Форматируем дату и время для уведомления
+        formatted_time = datetime.fromisoformat(data["scheduled_time"]).strftime("%d.%m.%Y %H:%M")
+        
+        # Создаем сообщение для клиента
+        message_data = {
+            "text": f"✅ Администратор создал для вас запись на услугу \"{service_data['name']}\"!\n\n"
+                    f"📅 Дата и время: {formatted_time}\n"
+                    f"💰 Стоимость: {service_data['price']} руб.\n\n"
+                    f"Ждем вас по адресу: ул. Автосервисная, 123\n"
+                    f"Контактный телефон: +7 (123) 456-78-90",
+            "user_id": client_data['id'],
+            "is_from_admin": 1,  # Сообщение от администратора
+            "is_read": 0  # Непрочитанное
+        }
+        
+        # Отправляем уведомление клиенту
+        try:
+            await api.create_message(message_data)
+        except httpx.HTTPError as e:
+            logger.error(f"Ошибка при отправке сообщения: {e}")
+            await callback.message.answer("✅ Запись создана, но не удалось отправить уведомление клиенту")
+        else:
+            logger.info(f"Сообщение клиенту успешно отправлено")
+            await callback.message.answer("✅ Запись успешно создана и клиент уведомлен!")
             
-            # Отправляем уведомление клиенту
-            messages_response = await client.post(f"{API_URL}/messages/", json=message_data)
-            if messages_response.status_code != 200:
-                logger.error(f"Ошибка при отправке сообщения: {messages_response.status_code}, {messages_response.text}")
-                await callback.message.answer("✅ Запись создана, но не удалось отправить уведомление клиенту")
-            else:
-                logger.info(f"Сообщение клиенту успешно отправлено")
-                await callback.message.answer("✅ Запись успешно создана и клиент уведомлен!")
-                
-            # Показываем обновленный список записей
-            await command_appointments(callback.message)
+        # Показываем обновленный список записей
+        await command_appointments(callback.message)
     except Exception as e:
         logger.error(f"Ошибка при создании записи: {e}")
         await callback.message.answer(f"❌ Произошла ошибка при создании записи: {str(e)}")
@@ -294,30 +334,27 @@ async def process_service_selection(callback: CallbackQuery, callback_data: Sele
 
 @router.callback_query(lambda c: c.data == "delete_appointment")
 async def process_delete_appointment_callback(callback: types.CallbackQuery):
-    async with httpx.AsyncClient() as client:
-        try:
-            response = await client.get(f"{API_URL}/appointments")
-            response.raise_for_status()
-            appointments = response.json()
+    try:
+        appointments = await api.list_appointments()
 
-            if not appointments:
-                await callback.message.answer("Нет доступных записей для удаления.")
-                return
+        if not appointments:
+            await callback.message.answer("Нет доступных записей для удаления.")
+            return
 
-            keyboard = InlineKeyboardMarkup(
-                inline_keyboard=[
-                    [
-                        InlineKeyboardButton(
-                            text=f"{a.get('date', 'Нет даты')} {a.get('time', 'Нет времени')} — {a.get('client_name', 'Нет клиента')}",
-                            callback_data=AppointmentCallback(id=a['id'], action="delete").pack()
-                        )
-                    ] for a in appointments
-                ]
-            )
+        keyboard = InlineKeyboardMarkup(
+            inline_keyboard=[
+                [
+                    InlineKeyboardButton(
+                        text=f"{a.get('date', 'Нет даты')} {a.get('time', 'Нет времени')} — {a.get('client_name', 'Нет клиента')}",
+                        callback_data=AppointmentCallback(id=a['id'], action="delete").pack()
+                    )
+                ] for a in appointments
+            ]
+        )
 
-            await callback.message.answer("Выберите запись для удаления:", reply_markup=keyboard)
-        except httpx.RequestError as e:
-            await callback.message.answer(f"❌ Ошибка при получении списка записей: {str(e)}")
+        await callback.message.answer("Выберите запись для удаления:", reply_markup=keyboard)
+    except httpx.RequestError as e:
+        await callback.message.answer(f"❌ Ошибка при получении списка записей: {str(e)}")
     
     await callback.answer()
 
@@ -345,26 +382,23 @@ async def process_edit_appointment(callback: types.CallbackQuery, callback_data:
     
     if action == "edit_service":
         # Получаем список доступных услуг
-        async with httpx.AsyncClient() as client:
-            response = await client.get(f"{API_URL}/services")
-            response.raise_for_status()
-            services = response.json()
-            logger.info(f"Получен список услуг: {services}")
-            
-            keyboard = InlineKeyboardMarkup(
-                inline_keyboard=[
-                    [
-                        InlineKeyboardButton(
-                            text=f"{service['name']} - {service['price']}₽",
-                            callback_data=SelectServiceCallback(id=service['id']).pack()
-                        )
-                    ] for service in services
-                ]
-            )
-            
-            await callback.message.edit_text("Выберите новую услугу:", reply_markup=keyboard)
-            await state.set_state(EditAppointmentState.waiting_for_value)
-            await state.update_data(appointment_id=appointment_id, field="service")
+        services = await get_services()
+        logger.info(f"Получен список услуг: {services}")
+        
+        keyboard = InlineKeyboardMarkup(
+            inline_keyboard=[
+                [
+                    InlineKeyboardButton(
+                        text=f"{service['name']} - {service['price']}₽",
+                        callback_data=SelectServiceCallback(id=service['id']).pack()
+                    )
+                ] for service in services
+            ]
+        )
+        
+        await callback.message.edit_text("Выберите новую услугу:", reply_markup=keyboard)
+        await state.set_state(EditAppointmentState.waiting_for_value)
+        await state.update_data(appointment_id=appointment_id, field="service")
     elif action == "edit_date":
         await callback.message.edit_text("Введите новую дату (в формате ДД.ММ.ГГГГ):")
         await state.set_state(EditAppointmentState.waiting_for_value)
@@ -407,41 +441,36 @@ async def process_service_selection(callback: types.CallbackQuery, callback_data
     service_id = callback_data.id
     
     try:
-        async with httpx.AsyncClient() as client:
-            # Проверяем существование услуги
-            logger.info(f"Запрос на получение услуги: GET {API_URL}/services/{service_id}")
-            service_response = await client.get(f"{API_URL}/services/{service_id}")
-            service_response.raise_for_status()
-            service = service_response.json()
-            logger.info(f"Получена услуга: {service}")
-            
-            # Получаем текущую запись
-            logger.info(f"Запрос на получение записи: GET {API_URL}/appointments/{appointment_id}")
-            appointment_response = await client.get(f"{API_URL}/appointments/{appointment_id}")
-            appointment_response.raise_for_status()
-            appointment = appointment_response.json()
-            logger.info(f"Получена запись: {appointment}")
-            
-            # Обновляем запись с новой услугой
-            update_data = {
-                "service_id": service_id  # Используем ID из callback_data
-            }
-            logger.info(f"Запрос на обновление записи: PATCH {API_URL}/appointments/{appointment_id} с данными {update_data}")
-            response = await client.patch(f"{API_URL}/appointments/{appointment_id}", json=update_data)
-            response.raise_for_status()
-            
-            await callback.answer("✅ Услуга успешно изменена!")
-            await state.clear()
-            
-            # Показываем обновленную информацию о записи
-            message_text, keyboard = await get_appointment_info(appointment_id)
-            await callback.message.edit_text(message_text, reply_markup=keyboard)
-            
+        # Проверяем существование услуги
+        service = await get_service(service_id)
+        if service is None:
+            raise ValueError("Услуга не найдена")
+        logger.info(f"Получена услуга: {service}")
+        
+        # Получаем текущую запись
+        appointment = await api.get_appointment(appointment_id)
+        if appointment is None:
+            raise ValueError("Запись не найдена")
+        logger.info(f"Получена запись: {appointment}")
+        
+        # Обновляем запись с новой услугой
+        update_data = {
+            "service_id": service_id  # Используем ID из callback_data
+        }
+        logger.info(f"Обновление записи {appointment_id} с данными {update_data}")
+        await api.update_appointment(appointment_id, update_data)
+        
+        await callback.answer("✅ Услуга успешно изменена!")
+        await state.clear()
+        
+        # Показываем обновленную информацию о записи
+        message_text, keyboard = await get_appointment_info(appointment_id)
+        await callback.message.edit_text(message_text, reply_markup=keyboard)
+        
+    except ValueError as e:
+        await callback.message.edit_text(f"❌ {str(e)}")
     except httpx.HTTPError as e:
-        if e.response and e.response.status_code == 404:
-            await callback.message.edit_text("❌ Услуга не найдена")
-        else:
-            await callback.message.edit_text(f"❌ Ошибка при обновлении услуги: {str(e)}")
+        await callback.message.edit_text(f"❌ Ошибка при обновлении услуги: {str(e)}")
     
     await callback.answer()
 
@@ -449,43 +478,42 @@ async def process_service_selection(callback: types.CallbackQuery, callback_data
 async def view_appointment_client(callback: CallbackQuery, callback_data: ViewClientCallback):
     """Просмотр информации о клиенте записи"""
     try:
-        async with httpx.AsyncClient() as http_client:
-            # Получаем информацию о записи
-            response = await http_client.get(f"{API_URL}/appointments/{callback_data.appointment_id}")
-            response.raise_for_status()
-            appointment = response.json()
-            
-            # Получаем информацию о клиенте
-            client_response = await http_client.get(f"{API_URL}/clients/{appointment['client_id']}")
-            client_response.raise_for_status()
-            client = client_response.json()
-            
-            # Формируем сообщение с информацией о клиенте
-            message = (
-                f"👤 Информация о клиенте\n\n"
-                f"Имя: {client['name']}\n"
-                f"Телефон: {client['phone_number']}\n"
-                f"Telegram ID: {client.get('telegram_id', 'Не указан')}\n"
-            )
-            
-            # Создаем клавиатуру с кнопками
-            keyboard = InlineKeyboardMarkup(
-                inline_keyboard=[
-                    [
-                        InlineKeyboardButton(
-                            text="◀️ Назад к записи",
-                            callback_data=AppointmentCallback(id=callback_data.appointment_id, action="view").pack()
-                        )
-                    ],
-                    [
-                        InlineKeyboardButton(text="🏠 В главное меню", callback_data="main_menu")
-                    ]
+        # Получаем информацию о записи
+        appointment = await api.get_appointment(callback_data.appointment_id)
+        if appointment is None:
+            raise ValueError("Запись не найдена")
+        
+        # Получаем информацию о клиенте
+        client = await api.get_client(appointment['client_id'])
+        if client is None:
+            raise ValueError("Клиент не найден")
+        
+        # Формируем сообщение с информацией о клиенте
+        message = (
+            f"👤 Информация о клиенте\n\n"
+            f"Имя: {client['name']}\n"
+            f"Телефон: {client['phone_number']}\n"
+            f"Telegram ID: {client.get('telegram_id', 'Не указан')}\n"
+        )
+        
+        # Создаем клавиатуру с кнопками
+        keyboard = InlineKeyboardMarkup(
+            inline_keyboard=[
+                [
+                    InlineKeyboardButton(
+                        text="◀️ Назад к записи",
+                        callback_data=AppointmentCallback(id=callback_data.appointment_id, action="view").pack()
+                    )
+                ],
+                [
+                    InlineKeyboardButton(text="🏠 В главное меню", callback_data="main_menu")
                 ]
-            )
-            
-            await callback.message.edit_text(message, reply_markup=keyboard)
-            await callback.answer()
-            
+            ]
+        )
+        
+        await callback.message.edit_text(message, reply_markup=keyboard)
+        await callback.answer()
+        
     except Exception as e:
         logger.error(f"Ошибка при просмотре клиента: {e}")
         await callback.answer("❌ Произошла ошибка при получении информации о клиенте", show_alert=True)
@@ -519,16 +547,14 @@ async def process_confirm_delete(callback: types.CallbackQuery, callback_data: A
     """Обработка подтверждения удаления записи"""
     try:
         appointment_id = callback_data.id
-        async with httpx.AsyncClient() as client:
-            # Удаляем запись
-            response = await client.delete(f"{API_URL}/appointments/{appointment_id}")
-            response.raise_for_status()
-            
-            await callback.message.edit_text("✅ Запись успешно удалена")
-            
-            # Показываем обновленный список записей
-            await command_appointments(callback.message)
-            
+        # Удаляем запись
+        await api.delete_appointment(appointment_id)
+        
+        await callback.message.edit_text("✅ Запись успешно удалена")
+        
+        # Показываем обновленный список записей
+        await command_appointments(callback.message)
+        
     except Exception as e:
         logger.error(f"Ошибка при удалении записи: {e}")
         await callback.message.edit_text("❌ Произошла ошибка при удалении записи")
@@ -542,76 +568,74 @@ async def confirm_appointment(callback: CallbackQuery, callback_data: Appointmen
         appointment_id = callback_data.id
         logger.info(f"Начинаем подтверждение записи с ID {appointment_id}")
         
-        async with httpx.AsyncClient() as http_client:
-            # Получаем информацию о записи
-            appointment_response = await http_client.get(f"{API_URL}/appointments/{appointment_id}")
-            if appointment_response.status_code != 200:
-                logger.error(f"Ошибка при получении записи: {appointment_response.status_code}, {appointment_response.text}")
-                await callback.answer("❌ Ошибка при получении информации о записи", show_alert=True)
-                return
-            
-            appointment = appointment_response.json()
-            logger.info(f"Получена запись: {appointment}")
-            
-            # Обновляем статус записи на 'confirmed'
-            update_data = {"status": "confirmed"}
-            response = await http_client.patch(f"{API_URL}/appointments/{appointment_id}", json=update_data)
+        # Получаем информацию о записи
+        appointment = await api.get_appointment(appointment_id)
+        if appointment is None:
+            logger.error(f"Запись {appointment_id} не найдена")
+            await callback.answer("❌ Ошибка при получении информации о записи", show_alert=True)
+            return
+        
+        logger.info(f"Получена запись: {appointment}")
+        
+        # Обновляем статус записи на 'confirmed'
+        update_data = {"status": "confirmed"}
+        try:
+            await api.update_appointment(appointment_id, update_data)
+        except httpx.HTTPStatusError as e:
+            logger.error(f"Ошибка при обновлении статуса: {e.response.status_code}, {e.response.text}")
+            await callback.answer("❌ Ошибка при подтверждении записи", show_alert=True)
+            return
+        
+        logger.info("Статус записи успешно обновлен на confirmed")
+        
+        # Получаем информацию о клиенте для уведомления
+        client = await api.get_client(appointment['client_id'])
+        if client is None:
+            logger.error(f"Клиент {appointment['client_id']} не найден")
+            await callback.answer("❌ Ошибка при получении информации о клиенте", show_alert=True)
+            return
+        
+        logger.info(f"Получен клиент: {client}")
+        
+        # Получаем информацию об услуге
+        service = await get_service(appointment['service_id'])
+        if service is None:
+            logger.error(f"Услуга {appointment['service_id']} не найдена")
+            await callback.answer("❌ Ошибка при получении информации об услуге", show_alert=True)
+            return
+        
+        logger.info(f"Получена услуга: {service}")
+        
+        # Форматируем дату и время
+        scheduled_time = datetime.fromisoformat(appointment['scheduled_time'].replace('Z', '+00:00'))
+        formatted_time = scheduled_time.strftime("%d.%m.%Y %H:%M")
+        
+        # Создаем сообщение для клиента
+        message_data = {
+            "text": f"✅ Ваша запись на услугу \"{service['name']}\" подтверждена!\n\n"
+                    f"📅 Дата и время: {formatted_time}\n"
+                    f"💰 Стоимость: {service['price']} руб.\n"
+                    f"🚗 Автомобиль: {appointment['car_model'] or 'Не указан'}\n\n"
+                    f"Ждем вас по адресу: ул. Автосервисная, 123\n"
+                    f"Контактный телефон: +7 (123) 456-78-90",
+            "user_id": client['id'],
+            "is_from_admin": 1,  # Сообщение от администратора
+            "is_read": 0  # Непрочитанное
+        }
+        
+        # Отправляем сообщение клиенту
+        try:
+            await api.create_message(message_data)
+        except httpx.HTTPError as e:
+            logger.error(f"Ошибка при отправке сообщения: {e}")
+            await callback.answer("✅ Запись подтверждена, но не удалось отправить уведомление клиенту", show_alert=True)
+        else:
+            logger.info(f"Сообщение клиенту успешно отправлено")
             
-            if response.status_code == 200:
-                logger.info("Статус записи успешно обновлен на confirmed")
-                
-                # Получаем информацию о клиенте для уведомления
-                client_response = await http_client.get(f"{API_URL}/clients/{appointment['client_id']}")
-                if client_response.status_code != 200:
-                    logger.error(f"Ошибка при получении клиента: {client_response.status_code}, {client_response.text}")
-                    await callback.answer("❌ Ошибка при получении информации о клиенте", show_alert=True)
-                    return
-                
-                client = client_response.json()
-                logger.info(f"Получен клиент: {client}")
-                
-                # Получаем информацию об услуге
-                service_response = await http_client.get(f"{API_URL}/services/{appointment['service_id']}")
-                if service_response.status_code != 200:
-                    logger.error(f"Ошибка при получении услуги: {service_response.status_code}, {service_response.text}")
-                    await callback.answer("❌ Ошибка при получении информации об услуге", show_alert=True)
-                    return
-                
-                service = service_response.json()
-                logger.info(f"Получена услуга: {service}")
-                
-                # Форматируем дату и время
-                scheduled_time = datetime.fromisoformat(appointment['scheduled_time'].replace('Z', '+00:00'))
-                formatted_time = scheduled_time.strftime("%d.%m.%Y %H:%M")
-                
-                # Создаем сообщение для клиента
-                message_data = {
-                    "text": f"✅ Ваша запись на услугу \"{service['name']}\" подтверждена!\n\n"
-                            f"📅 Дата и время: {formatted_time}\n"
-                            f"💰 Стоимость: {service['price']} руб.\n"
-                            f"🚗 Автомобиль: {appointment['car_model'] or 'Не указан'}\n\n"
-                            f"Ждем вас по адресу: ул. Автосервисная, 123\n"
-                            f"Контактный телефон: +7 (123) 456-78-90",
-                    "user_id": client['id'],
-                    "is_from_admin": 1,  # Сообщение от администратора
-                    "is_read": 0  # Непрочитанное
-                }
-                
-                # Отправляем сообщение клиенту
-                messages_response = await http_client.post(f"{API_URL}/messages/", json=message_data)
-                if messages_response.status_code != 200:
-                    logger.error(f"Ошибка при отправке сообщения: {messages_response.status_code}, {messages_response.text}")
-                    await callback.answer("✅ Запись подтверждена, но не удалось отправить уведомление клиенту", show_alert=True)
-                else:
-                    logger.info(f"Сообщение клиенту успешно отправлено")
-                    
-                # Обновляем информацию о записи на странице
-                await show_appointment_details(callback, appointment_id)
-                
-                await callback.answer("✅ Запись успешно подтверждена!")
-            else:
-                logger.error(f"Ошибка при обновлении статуса: {response.status_code}, {response.text}")
-                await callback.answer("❌ Ошибка при подтверждении записи", show_alert=True)
+        # Обновляем информацию о записи на странице
+        await show_appointment_details(callback, appointment_id)
+        
+        await callback.answer("✅ Запись успешно подтверждена!")
     except Exception as e:
         logger.error(f"Ошибка при подтверждении записи: {e}")
         await callback.answer("❌ Произошла ошибка при подтверждении записи", show_alert=True)
@@ -637,82 +661,82 @@ async def process_reject_reason(message: Message, state: FSMContext):
         appointment_id = data["appointment_id"]
         rejection_reason = message.text
         
-        async with httpx.AsyncClient() as http_client:
-            # Получаем информацию о записи
-            appointment_response = await http_client.get(f"{API_URL}/appointments/{appointment_id}")
-            if appointment_response.status_code != 200:
-                logger.error(f"Ошибка при получении записи: {appointment_response.status_code}, {appointment_response.text}")
-                await message.answer("❌ Ошибка при получении информации о записи")
-                await state.clear()
-                return
-                
-            appointment = appointment_response.json()
-            logger.info(f"Получена запись: {appointment}")
+        # Получаем информацию о записи
+        appointment = await api.get_appointment(appointment_id)
+        if appointment is None:
+            logger.error(f"Запись {appointment_id} не найдена")
+            await message.answer("❌ Ошибка при получении информации о записи")
+            await state.clear()
+            return
             
-            # Обновляем статус записи на 'rejected'
-            update_data = {"status": "rejected"}
-            response = await http_client.patch(f"{API_URL}/appointments/{appointment_id}", json=update_data)
+        logger.info(f"Получена запись: {appointment}")
+        
+        # Обновляем статус записи на 'rejected'
+        update_data = {"status": "rejected"}
+        try:
+            await api.update_appointment(appointment_id, update_data)
+        except httpx.HTTPStatusError as e:
+            logger.error(f"Ошибка при обновлении статуса: {e.response.status_code}, {e.response.text}")
+            await message.answer("❌ Ошибка при отклонении записи")
+            return
+        
+        logger.info("Статус записи успешно обновлен на rejected")
+        
+        # Получаем информацию о клиенте для уведомления
+        client = await api.get_client(appointment['client_id'])
+        if client is None:
+            logger.error(f"Клиент {appointment['client_id']} не найден")
+            await message.answer("❌ Ошибка при получении информации о клиенте")
+            await state.clear()
+            return
             
-            if response.status_code == 200:
-                logger.info("Статус записи успешно обновлен на rejected")
-                
-                # Получаем информацию о клиенте для уведомления
-                client_response = await http_client.get(f"{API_URL}/clients/{appointment['client_id']}")
-                if client_response.status_code != 200:
-                    logger.error(f"Ошибка при получении клиента: {client_response.status_code}, {client_response.text}")
-                    await message.answer("❌ Ошибка при получении информации о клиенте")
-                    await state.clear()
-                    return
-                    
-                client = client_response.json()
-                logger.info(f"Получен клиент: {client}")
-                
-                # Получаем информацию об услуге
-                service_response = await http_client.get(f"{API_URL}/services/{appointment['service_id']}")
-                if service_response.status_code != 200:
-                    logger.error(f"Ошибка при получении услуги: {service_response.status_code}, {service_response.text}")
-                    await message.answer("❌ Ошибка при получении информации об услуге")
-                    await state.clear()
-                    return
-                    
-                service = service_response.json()
-                logger.info(f"Получена услуга: {service}")
-                
-                # Форматируем дату и время
-                scheduled_time = datetime.fromisoformat(appointment['scheduled_time'].replace('Z', '+00:00'))
-                formatted_time = scheduled_time.strftime("%d.%m.%Y %H:%M")
-                
-                # Создаем сообщение для клиента с указанием причины
-                message_data = {
-                    "text": f"❌ К сожалению, ваша запись на услугу \"{service['name']}\" отклонена.\n\n"
-                            f"📅 Запрошенная дата и время: {formatted_time}\n"
-                            f"⚠️ Причина: {rejection_reason}\n\n"
-                            f"Пожалуйста, выберите другую дату или время или свяжитесь через встроенный чат",
-                    "user_id": client['id'],
-                    "is_from_admin": 1,  # Сообщение от администратора
-                    "is_read": 0  # Непрочитанное
-                }
-                
-                # Отправляем сообщение клиенту
-                messages_response = await http_client.post(f"{API_URL}/messages/", json=message_data)
-                if messages_response.status_code != 200:
-                    logger.error(f"Ошибка при отправке сообщения: {messages_response.status_code}, {messages_response.text}")
-                    await message.answer("❌ Ошибка при отправке сообщения клиенту")
-                else:
-                    logger.info(f"Сообщение клиенту успешно отправлено")
-                
-                # Удаляем запись
-                delete_response = await http_client.delete(f"{API_URL}/appointments/{appointment_id}")
-                if delete_response.status_code == 200:
-                    await message.answer(f"✅ Запись №{appointment_id} отклонена и удалена.\nПричина: {rejection_reason}")
-                else:
-                    await message.answer(f"✅ Запись отклонена, но удалить её не удалось. Причина: {rejection_reason}")
-                
-                # Показываем обновленный список записей
-                await command_appointments(message)
-            else:
-                logger.error(f"Ошибка при обновлении статуса: {response.status_code}, {response.text}")
-                await message.answer("❌ Ошибка при отклонении записи")
+        logger.info(f"Получен клиент: {client}")
+        
+        # Получаем информацию об услуге
+        service = await get_service(appointment['service_id'])
+        if service is None:
+            logger.error(f"Услуга {appointment['service_id']} не найдена")
+            await message.answer("❌ Ошибка при получении информации об услуге")
+            await state.clear()
+            return
+            
+        logger.info(f"Получена услуга: {service}")
+        
+        # Форматируем дату и время
+        scheduled_time = datetime.fromisoformat(appointment['scheduled_time'].replace('Z', '+00:00'))
+        formatted_time = scheduled_time.strftime("%d.%m.%Y %H:%M")
+        
+        # Создаем сообщение для клиента с указанием причины
+        message_data = {
+            "text": f"❌ К сожалению, ваша запись на услугу \"{service['name']}\" отклонена.\n\n"
+                    f"📅 Запрошенная дата и время: {formatted_time}\n"
+                    f"⚠️ Причина: {rejection_reason}\n\n"
+                    f"Пожалуйста, выберите другую дату или время или свяжитесь через встроенный чат",
+            "user_id": client['id'],
+            "is_from_admin": 1,  # Сообщение от администратора
+            "is_read": 0  # Непрочитанное
+        }
+        
+        # Отправляем сообщение клиенту
+        try:
+            await api.create_message(message_data)
+        except httpx.HTTPError as e:
+            logger.error(f"Ошибка при отправке сообщения: {e}")
+            await message.answer("❌ Ошибка при отправке сообщения клиенту")
+        else:
+            logger.info(f"Сообщение клиенту успешно отправлено")
+        
+        # Удаляем запись
+        try:
+            await api.delete_appointment(appointment_id)
+        except httpx.HTTPError as e:
+            logger.error(f"Ошибка при удалении записи: {e}")
+            await message.answer(f"✅ Запись отклонена, но удалить её не удалось. Причина: {rejection_reason}")
+        else:
+            await message.answer(f"✅ Запись №{appointment_id} отклонена и удалена.\nПричина: {rejection_reason}")
+        
+        # Показываем обновленный список записей
+        await command_appointments(message)
     except Exception as e:
         logger.error(f"Ошибка при обработке причины отклонения: {e}")
         await message.answer("❌ Произошла ошибка при отклонении записи")
@@ -757,6 +781,13 @@ async def show_appointment_details(callback: CallbackQuery, appointment_id: int)
     appointment_callback = AppointmentCallback(id=appointment_id, action="view")
     await process_appointment_selection(callback, appointment_callback)
 
+async def get_appointment(appointment_id: int, expand: Optional[str] = None) -> dict:
+    """Запись по id; ValueError, если такой записи нет"""
+    appointment = await api.get_appointment(appointment_id, expand=expand)
+    if appointment is None:
+        raise ValueError(f"Запись {appointment_id} не найдена")
+    return appointment
+
 async def get_appointment_info(appointment_id: int) -> tuple[str, InlineKeyboardMarkup]:
     """Получение информации о записи с форматированием в часовом поясе администратора
     
@@ -767,124 +798,107 @@ async def get_appointment_info(appointment_id: int) -> tuple[str, InlineKeyboard
         tuple: Текст сообщения с информацией о записи, клавиатура с кнопками управления
     """
     try:
-        async with httpx.AsyncClient() as http_client:
-            # Получаем информацию о записи
-            response = await http_client.get(f"{API_URL}/appointments/{appointment_id}")
-            response.raise_for_status()
-            appointment = response.json()
-            logger.info(f"Получена запись: {appointment}")
-            
-            if not appointment:
-                raise ValueError(f"Запись с ID {appointment_id} не найдена")
-            
-            # Получаем информацию о клиенте
-            client_info = "👤 Клиент: Не найден\n📱 Телефон: Не указан\n"
-            if appointment.get('client_id'):
-                try:
-                    client_response = await http_client.get(f"{API_URL}/clients/{appointment['client_id']}")
-                    if client_response.status_code == 200:
-                        client_data = client_response.json()
-                        if client_data:
-                            client_info = (
-                                f"👤 Клиент: {client_data['name']}\n"
-                                f"📱 Телефон: {client_data['phone_number']}\n"
-                            )
-                except Exception as e:
-                    logger.error(f"Ошибка при получении информации о клиенте {appointment['client_id']}: {e}")
-            
-            # Получаем информацию об услуге
-            service_info = "🔧 Услуга: Не найдена\n"
-            if appointment.get('service_id'):
-                try:
-                    service_response = await http_client.get(f"{API_URL}/services/{appointment['service_id']}")
-                    if service_response.status_code == 200:
-                        service = service_response.json()
-                        if service:
-                            service_info = f"🔧 Услуга: {service['name']}\n💰 Стоимость: {service['price']} руб.\n"
-                except Exception as e:
-                    logger.error(f"Ошибка при получении информации об услуге {appointment['service_id']}: {e}")
-            
-            # Получаем часовой пояс администратора
-            admin_timezone = get_admin_timezone(0)  # 0 - это временный ID, так как эта функция вызывается из разных мест
-            
-            # Форматируем дату и время с учетом часового пояса администратора
-            scheduled_time = datetime.fromisoformat(appointment['scheduled_time'].replace('Z', '+00:00')).replace(tzinfo=ZoneInfo("UTC"))
-            local_time = scheduled_time.astimezone(ZoneInfo(admin_timezone))
-            formatted_time = local_time.strftime("%d.%m.%Y %H:%M")
-            
-            # Создаем клавиатуру с кнопками управления
-            buttons = []
-            
-            # Если запись в статусе ожидания, добавляем кнопки подтверждения и отклонения
-            if appointment.get('status') == 'pending':
-                buttons.append([
-                    InlineKeyboardButton(
-                        text="✅ Подтвердить запись",
-                        callback_data=AppointmentCallback(action="confirm", id=appointment_id).pack()
-                    ),
-                    InlineKeyboardButton(
-                        text="❌ Отклонить запись",
-                        callback_data=AppointmentCallback(action="reject", id=appointment_id).pack()
-                    )
-                ])
-            
-            buttons.extend([
-                [
-                    InlineKeyboardButton(
-                        text="📅 Изменить дату",
-                        callback_data=AppointmentCallback(action="edit_date", id=appointment_id).pack()
-                    ),
-                    InlineKeyboardButton(
-                        text="⏰ Изменить время",
-                        callback_data=AppointmentCallback(action="edit_time", id=appointment_id).pack()
-                    )
-                ],
-                [
-                    InlineKeyboardButton(
-                        text="🔧 Изменить услугу",
-                        callback_data=AppointmentCallback(action="edit_service", id=appointment_id).pack()
-                    ),
-                    InlineKeyboardButton(
-                        text="🚗 Изменить авто",
-                        callback_data=AppointmentCallback(action="edit_car", id=appointment_id).pack()
-                    )
-                ],
-                [
-                    InlineKeyboardButton(
-                        text="🔄 Изменить статус",
-                        callback_data=AppointmentCallback(action="edit_status", id=appointment_id).pack()
-                    ),
-                    InlineKeyboardButton(
-                        text="👤 Просмотр клиента",
-                        callback_data=ViewClientCallback(appointment_id=appointment_id).pack()
-                    )
-                ],
-                [
-                    InlineKeyboardButton(
-                        text="❌ Удалить запись",
-                        callback_data=AppointmentCallback(action="delete", id=appointment_id).pack()
-                    )
-                ],
-                [
-                    InlineKeyboardButton(text="◀️ Назад к списку", callback_data="back_to_appointments"),
-                    InlineKeyboardButton(text="🏠 В главное меню", callback_data="main_menu")
-                ]
-            ])
-            
-            keyboard = InlineKeyboardMarkup(inline_keyboard=buttons)
-            
-            # Формируем сообщение с информацией о записи
-            message = (
-                f"📝 Запись #{appointment_id}\n\n"
-                f"{client_info}"
-                f"🚗 Автомобиль: {appointment.get('car_model', 'Не указан')}\n"
-                f"{service_info}"
-                f"📅 Дата и время: {formatted_time}\n"
-                f"📊 Статус: {appointment.get('status', 'Не указан')}\n"
+        # Получаем запись вместе с клиентом и услугой одним запросом
+        appointment = await get_appointment(appointment_id, expand="client,service")
+        logger.info(f"Получена запись: {appointment}")
+        
+        if not appointment:
+            raise ValueError(f"Запись с ID {appointment_id} не найдена")
+        
+        client_info = "👤 Клиент: Не найден\n📱 Телефон: Не указан\n"
+        client_data = appointment.get('client')
+        if client_data:
+            client_info = (
+                f"👤 Клиент: {client_data['name']}\n"
+                f"📱 Телефон: {client_data['phone_number']}\n"
             )
-            
-            return message, keyboard
-            
+        
+        service_info = "🔧 Услуга: Не найдена\n"
+        service = appointment.get('service')
+        if service:
+            service_info = f"🔧 Услуга: {service['name']}\n💰 Стоимость: {service['price']} руб.\n"
+        
+        # Получаем часовой пояс администратора
+        admin_timezone = get_admin_timezone(0)  # 0 - это временный ID, так как эта функция вызывается из разных мест
+        
+        # Форматируем дату и время с учетом часового пояса администратора
+        scheduled_time = datetime.fromisoformat(appointment['scheduled_time'].replace('Z', '+00:00')).replace(tzinfo=ZoneInfo("UTC"))
+        local_time = scheduled_time.astimezone(ZoneInfo(admin_timezone))
+        formatted_time = local_time.strftime("%d.%m.%Y %H:%M")
+        
+        # Создаем клавиатуру с кнопками управления
+        buttons = []
+        
+        # Если запись в статусе ожидания, добавляем кнопки подтверждения и отклонения
+        if appointment.get('status') == 'pending':
+            buttons.append([
+                InlineKeyboardButton(
+                    text="✅ Подтвердить запись",
+                    callback_data=AppointmentCallback(action="confirm", id=appointment_id).pack()
+                ),
+                InlineKeyboardButton(
+                    text="❌ Отклонить запись",
+                    callback_data=AppointmentCallback(action="reject", id=appointment_id).pack()
+                )
+            ])
+        
+        buttons.extend([
+            [
+                InlineKeyboardButton(
+                    text="📅 Изменить дату",
+                    callback_data=AppointmentCallback(action="edit_date", id=appointment_id).pack()
+                ),
+                InlineKeyboardButton(
+                    text="⏰ Изменить время",
+                    callback_data=AppointmentCallback(action="edit_time", id=appointment_id).pack()
+                )
+            ],
+            [
+                InlineKeyboardButton(
+                    text="🔧 Изменить услугу",
+                    callback_data=AppointmentCallback(action="edit_service", id=appointment_id).pack()
+                ),
+                InlineKeyboardButton(
+                    text="🚗 Изменить авто",
+                    callback_data=AppointmentCallback(action="edit_car", id=appointment_id).pack()
+                )
+            ],
+            [
+                InlineKeyboardButton(
+                    text="🔄 Изменить статус",
+                    callback_data=AppointmentCallback(action="edit_status", id=appointment_id).pack()
+                ),
+                InlineKeyboardButton(
+                    text="👤 Просмотр клиента",
+                    callback_data=ViewClientCallback(appointment_id=appointment_id).pack()
+                )
+            ],
+            [
+                InlineKeyboardButton(
+                    text="❌ Удалить запись",
+                    callback_data=AppointmentCallback(action="delete", id=appointment_id).pack()
+                )
+            ],
+            [
+                InlineKeyboardButton(text="◀️ Назад к списку", callback_data="back_to_appointments"),
+                InlineKeyboardButton(text="🏠 В главное меню", callback_data="main_menu")
+            ]
+        ])
+        
+        keyboard = InlineKeyboardMarkup(inline_keyboard=buttons)
+        
+        # Формируем сообщение с информацией о записи
+        message = (
+            f"📝 Запись #{appointment_id}\n\n"
+            f"{client_info}"
+            f"🚗 Автомобиль: {appointment.get('car_model', 'Не указан')}\n"
+            f"{service_info}"
+            f"📅 Дата и время: {formatted_time}\n"
+            f"📊 Статус: {appointment.get('status', 'Не указан')}\n"
+        )
+        
+        return message, keyboard
+        
     except Exception as e:
         logger.error(f"Ошибка при получении информации о записи: {e}")
         raise
@@ -906,30 +920,26 @@ async def process_edit_value(message: Message, state: FSMContext):
                 return
                 
             # Получаем текущую запись
-            async with httpx.AsyncClient() as client:
-                response = await client.get(f"{API_URL}/appointments/{appointment_id}")
-                response.raise_for_status()
-                appointment = response.json()
-                
-                # Обновляем только дату, сохраняя время
-                current_time = datetime.fromisoformat(appointment['scheduled_time'].replace('Z', '+00:00'))
-                new_datetime = datetime.combine(date_obj.date(), current_time.time())
-                
-                # Обновляем запись
-                update_data = {
-                    "scheduled_time": new_datetime.isoformat()
-                }
-                
-                response = await client.patch(f"{API_URL}/appointments/{appointment_id}", json=update_data)
-                response.raise_for_status()
-                
-                await message.answer("✅ Дата успешно обновлена")
-                await state.clear()
-                
-                # Показываем обновленную информацию о записи
-                message_text, keyboard = await get_appointment_info(appointment_id)
-                await message.answer(message_text, reply_markup=keyboard)
-                
+            appointment = await get_appointment(appointment_id)
+            
+            # Обновляем только дату, сохраняя время
+            current_time = datetime.fromisoformat(appointment['scheduled_time'].replace('Z', '+00:00'))
+            new_datetime = datetime.combine(date_obj.date(), current_time.time())
+            
+            # Обновляем запись
+            update_data = {
+                "scheduled_time": new_datetime.isoformat()
+            }
+            
+            await api.update_appointment(appointment_id, update_data)
+            
+            await message.answer("✅ Дата успешно обновлена")
+            await state.clear()
+            
+            # Показываем обновленную информацию о записи
+            message_text, keyboard = await get_appointment_info(appointment_id)
+            await message.answer(message_text, reply_markup=keyboard)
+            
         elif field == "time":
             # Парсим время
             try:
@@ -939,30 +949,26 @@ async def process_edit_value(message: Message, state: FSMContext):
                 return
                 
             # Получаем текущую запись
-            async with httpx.AsyncClient() as client:
-                response = await client.get(f"{API_URL}/appointments/{appointment_id}")
-                response.raise_for_status()
-                appointment = response.json()
-                
-                # Обновляем только время, сохраняя дату
-                current_datetime = datetime.fromisoformat(appointment['scheduled_time'].replace('Z', '+00:00'))
-                new_datetime = datetime.combine(current_datetime.date(), time_obj.time())
-                
-                # Обновляем запись
-                update_data = {
-                    "scheduled_time": new_datetime.isoformat()
-                }
-                
-                response = await client.patch(f"{API_URL}/appointments/{appointment_id}", json=update_data)
-                response.raise_for_status()
-                
-                await message.answer("✅ Время успешно обновлено")
-                await state.clear()
-                
-                # Показываем обновленную информацию о записи
-                message_text, keyboard = await get_appointment_info(appointment_id)
-                await message.answer(message_text, reply_markup=keyboard)
-                
+            appointment = await get_appointment(appointment_id)
+            
+            # Обновляем только время, сохраняя дату
+            current_datetime = datetime.fromisoformat(appointment['scheduled_time'].replace('Z', '+00:00'))
+            new_datetime = datetime.combine(current_datetime.date(), time_obj.time())
+            
+            # Обновляем запись
+            update_data = {
+                "scheduled_time": new_datetime.isoformat()
+            }
+            
+            await api.update_appointment(appointment_id, update_data)
+            
+            await message.answer("✅ Время успешно обновлено")
+            await state.clear()
+            
+            # Показываем обновленную информацию о записи
+            message_text, keyboard = await get_appointment_info(appointment_id)
+            await message.answer(message_text, reply_markup=keyboard)
+            
         elif field == "status":
             # Проверяем валидность статуса
             status = message.text.strip().lower()
@@ -973,38 +979,34 @@ async def process_edit_value(message: Message, state: FSMContext):
                 return
                 
             # Обновляем статус
-            async with httpx.AsyncClient() as client:
-                update_data = {
-                    "status": status
-                }
-                
-                response = await client.patch(f"{API_URL}/appointments/{appointment_id}", json=update_data)
-                response.raise_for_status()
-                
-                await message.answer("✅ Статус успешно обновлен")
-                await state.clear()
-                
-                # Показываем обновленную информацию о записи
-                message_text, keyboard = await get_appointment_info(appointment_id)
-                await message.answer(message_text, reply_markup=keyboard)
-                
+            update_data = {
+                "status": status
+            }
+            
+            await api.update_appointment(appointment_id, update_data)
+            
+            await message.answer("✅ Статус успешно обновлен")
+            await state.clear()
+            
+            # Показываем обновленную информацию о записи
+            message_text, keyboard = await get_appointment_info(appointment_id)
+            await message.answer(message_text, reply_markup=keyboard)
+            
         elif field == "car_model":
             # Обновляем модель автомобиля
-            async with httpx.AsyncClient() as client:
-                update_data = {
-                    "car_model": message.text.strip()
-                }
-                
-                response = await client.patch(f"{API_URL}/appointments/{appointment_id}", json=update_data)
-                response.raise_for_status()
-                
-                await message.answer("✅ Модель автомобиля успешно обновлена")
-                await state.clear()
-                
-                # Показываем обновленную информацию о записи
-                message_text, keyboard = await get_appointment_info(appointment_id)
-                await message.answer(message_text, reply_markup=keyboard)
-                
+            update_data = {
+                "car_model": message.text.strip()
+            }
+            
+            await api.update_appointment(appointment_id, update_data)
+            
+            await message.answer("✅ Модель автомобиля успешно обновлена")
+            await state.clear()
+            
+            # Показываем обновленную информацию о записи
+            message_text, keyboard = await get_appointment_info(appointment_id)
+            await message.answer(message_text, reply_markup=keyboard)
+            
     except Exception as e:
         logger.error(f"Ошибка при обновлении {field}: {e}")
         await message.answer(f"❌ Произошла ошибка при обновлении {field}")
@@ -1022,65 +1024,58 @@ async def quick_confirm_appointment(callback: CallbackQuery):
         admin_timezone = get_admin_timezone(callback.from_user.id)
         
         # Обновляем статус записи
-        async with httpx.AsyncClient() as client:
-            # Получаем текущую запись
-            response = await client.get(f"{API_URL}/appointments/{appointment_id}")
-            response.raise_for_status()
-            appointment = response.json()
-            
-            # Обновляем статус
-            response = await client.patch(
-                f"{API_URL}/appointments/{appointment_id}", 
-                json={"status": "confirmed"}
-            )
-            response.raise_for_status()
-            
-            # Получаем информацию о клиенте
-            client_response = await client.get(f"{API_URL}/clients/{appointment['client_id']}")
-            client_response.raise_for_status()
-            client_data = client_response.json()
-            
-            # Получаем информацию об услуге
-            service_response = await client.get(f"{API_URL}/services/{appointment['service_id']}")
-            service_response.raise_for_status()
-            service_data = service_response.json()
-            
-            # Форматируем дату и время с учетом часового пояса администратора
-            scheduled_time = datetime.fromisoformat(appointment["scheduled_time"].replace('Z', '+00:00')).replace(tzinfo=ZoneInfo("UTC"))
-            local_time = scheduled_time.astimezone(ZoneInfo(admin_timezone))
-            formatted_time = local_time.strftime("%d.%m.%Y %H:%M")
-            
-            # Создаем сообщение для клиента
-            message_data = {
-                "text": f"✅ Ваша запись на услугу \"{service_data['name']}\" подтверждена!\n\n"
-                        f"📅 Дата и время: {formatted_time}\n"
-                        f"💰 Стоимость: {service_data['price']} руб.\n\n"
-                        f"Ждем вас по адресу: ул. Автосервисная, 123\n"
-                        f"Контактный телефон: +7 (123) 456-78-90",
-                "user_id": client_data['id'],
-                "is_from_admin": 1,  # Сообщение от администратора
-                "is_read": 0  # Непрочитанное
-            }
-            
-            # Отправляем уведомление клиенту
-            await client.post(f"{API_URL}/messages/", json=message_data)
-            
-            # Обновляем сообщение с уведомлением
-            keyboard = InlineKeyboardMarkup(inline_keyboard=[
-                [InlineKeyboardButton(
-                    text="📝 Просмотреть запись",
-                    callback_data=f"appointment_view_{appointment_id}"
-                )]
-            ])
-            
-            await callback.message.edit_text(
-                f"✅ Запись #{appointment_id} успешно подтверждена!\n\n"
-                f"👤 Клиент: {client_data['name']}\n"
-                f"📱 Телефон: {client_data['phone_number']}\n"
-                f"🔧 Услуга: {service_data['name']}\n"
-                f"📅 Дата и время: {formatted_time}",
-                reply_markup=keyboard
-            )
+        # Получаем текущую запись
+        appointment = await get_appointment(appointment_id)
+        
+        # Обновляем статус
+        await api.update_appointment(appointment_id, {"status": "confirmed"})
+        
+        # Получаем информацию о клиенте
+        client_data = await api.get_client(appointment['client_id'])
+        if client_data is None:
+            raise ValueError("Клиент не найден")
+        
+        # Получаем информацию об услуге
+        service_data = await get_service(appointment['service_id'])
+        if service_data is None:
+            raise ValueError("Услуга не найдена")
+        
+        # Форматируем дату и время с учетом часового пояса администратора
+        scheduled_time = datetime.fromisoformat(appointment["scheduled_time"].replace('Z', '+00:00')).replace(tzinfo=ZoneInfo("UTC"))
+        local_time = scheduled_time.astimezone(ZoneInfo(admin_timezone))
+        formatted_time = local_time.strftime("%d.%m.%Y %H:%M")
+        
+        # Создаем сообщение для клиента
+        message_data = {
+            "text": f"✅ Ваша запись на услугу \"{service_data['name']}\" подтверждена!\n\n"
+                    f"📅 Дата и время: {formatted_time}\n"
+                    f"💰 Стоимость: {service_data['price']} руб.\n\n"
+                    f"Ждем вас по адресу: ул. Автосервисная, 123\n"
+                    f"Контактный телефон: +7 (123) 456-78-90",
+            "user_id": client_data['id'],
+            "is_from_admin": 1,  # Сообщение от администратора
+            "is_read": 0  # Непрочитанное
+        }
+        
+        # Отправляем уведомление клиенту
+        await api.create_message(message_data)
+        
+        # Обновляем сообщение с уведомлением
+        keyboard = InlineKeyboardMarkup(inline_keyboard=[
+            [InlineKeyboardButton(
+                text="📝 Просмотреть запись",
+                callback_data=f"appointment_view_{appointment_id}"
+            )]
+        ])
+        
+        await callback.message.edit_text(
+            f"✅ Запись #{appointment_id} успешно подтверждена!\n\n"
+            f"👤 Клиент: {client_data['name']}\n"
+            f"📱 Телефон: {client_data['phone_number']}\n"
+            f"🔧 Услуга: {service_data['name']}\n"
+            f"📅 Дата и время: {formatted_time}",
+            reply_markup=keyboard
+        )
         
         await callback.answer("✅ Запись подтверждена")
     except Exception as e:
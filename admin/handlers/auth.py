@@ -5,7 +5,7 @@ from aiogram.fsm.state import StatesGroup, State
 from aiogram.types import Message
 import logging
 
-from ..middleware.auth_middleware import authorized_users, verify_password
+from ..middleware.auth_middleware import authorized_users, delete_session, save_session, verify_password
 
 logger = logging.getLogger(__name__)
 
@@ -27,6 +27,7 @@ async def process_password(message: Message, state: FSMContext):
     if verify_password(password):
         # Авторизуем пользователя (сохраняем с объектом для дополнительных данных)
         authorized_users[user_id] = {"timezone": "Europe/Moscow"}
+        await save_session(user_id)
         
         # Сбрасываем состояние
         await state.clear()
@@ -53,6 +54,7 @@ async def cmd_logout(message: Message):
     
     if user_id in authorized_users:
         del authorized_users[user_id]
+        await delete_session(user_id)
         await message.answer("🔒 Вы вышли из системы. Используйте /start для повторной авторизации.")
         logger.info(f"Пользователь {user_id} вышел из системы")
     else:
@@ -3,12 +3,11 @@ from aiogram.filters import Command, StateFilter
 from aiogram.fsm.context import FSMContext
 from aiogram.types import Message, InlineKeyboardMarkup, InlineKeyboardButton, CallbackQuery
 from aiogram.filters.callback_data import CallbackData
-import httpx
 import logging
 
 from aiogram.fsm.state import StatesGroup, State
 
-from ..config import API_URL
+from ..services.http_client import api
 
 logger = logging.getLogger(__name__)
 
@@ -41,44 +40,43 @@ class EditClientCallback(CallbackData, prefix="client"):
 async def get_client_info(client_id: int) -> tuple[str, InlineKeyboardMarkup]:
     """Получение информации о клиенте"""
     try:
-        async with httpx.AsyncClient() as http_client:
-            response = await http_client.get(f"{API_URL}/clients/{client_id}")
-            response.raise_for_status()
-            client = response.json()
-            
-            buttons = [
-                [
-                    InlineKeyboardButton(
-                        text="✏️ Изменить имя",
-                        callback_data=ClientCallback(action="edit_name", id=client_id).pack()
-                    ),
-                    InlineKeyboardButton(
-                        text="📝 Изменить телефон",
-                        callback_data=ClientCallback(action="edit_phone", id=client_id).pack()
-                    )
-                ],
-                [
-                    InlineKeyboardButton(
-                        text="❌ Удалить клиента",
-                        callback_data=ClientCallback(action="delete", id=client_id).pack()
-                    )
-                ],
-                [
-                    InlineKeyboardButton(text="◀️ Назад к списку", callback_data="back_to_clients"),
-                    InlineKeyboardButton(text="🏠 В главное меню", callback_data="main_menu")
-                ]
+        client = await api.get_client(client_id)
+        if client is None:
+            raise ValueError(f"Клиент {client_id} не найден")
+        
+        buttons = [
+            [
+                InlineKeyboardButton(
+                    text="✏️ Изменить имя",
+                    callback_data=ClientCallback(action="edit_name", id=client_id).pack()
+                ),
+                InlineKeyboardButton(
+                    text="📝 Изменить телефон",
+                    callback_data=ClientCallback(action="edit_phone", id=client_id).pack()
+                )
+            ],
+            [
+                InlineKeyboardButton(
+                    text="❌ Удалить клиента",
+                    callback_data=ClientCallback(action="delete", id=client_id).pack()
+                )
+            ],
+            [
+                InlineKeyboardButton(text="◀️ Назад к списку", callback_data="back_to_clients"),
+                InlineKeyboardButton(text="🏠 В главное меню", callback_data="main_menu")
             ]
-            
-            keyboard = InlineKeyboardMarkup(inline_keyboard=buttons)
-            
-            message_text = (
-                f"👤 Клиент #{client_id}\n\n"
-                f"📝 Имя: {client['name']}\n"
-                f"📱 Телефон: {client['phone_number']}\n"
-            )
-            
-            return message_text, keyboard
-            
+        ]
+        
+        keyboard = InlineKeyboardMarkup(inline_keyboard=buttons)
+        
+        message_text = (
+            f"👤 Клиент #{client_id}\n\n"
+            f"📝 Имя: {client['name']}\n"
+            f"📱 Телефон: {client['phone_number']}\n"
+        )
+        
+        return message_text, keyboard
+        
     except Exception as e:
         logger.error(f"Ошибка при получении информации о клиенте: {e}")
         raise
@@ -87,36 +85,33 @@ async def get_client_info(client_id: int) -> tuple[str, InlineKeyboardMarkup]:
 async def command_clients(message: Message):
     """Показать список клиентов"""
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(f"{API_URL}/clients")
-            response.raise_for_status()
-            clients = response.json()
-            
-            if not clients:
-                keyboard = InlineKeyboardMarkup(inline_keyboard=[
-                    [InlineKeyboardButton(text="➕ Создать клиента", callback_data="create_client")],
-                    [InlineKeyboardButton(text="🏠 В главное меню", callback_data="main_menu")]
-                ])
-                await message.answer("👤 Нет доступных клиентов", reply_markup=keyboard)
-                return
-            
-            buttons = []
-            for client in clients:
-                buttons.append([
-                    InlineKeyboardButton(
-                        text=f"{client['name']} - {client['phone_number']}",
-                        callback_data=ClientCallback(id=client['id'], action="view").pack()
-                    )
-                ])
-            
-            buttons.extend([
+        clients = await api.list_clients()
+        
+        if not clients:
+            keyboard = InlineKeyboardMarkup(inline_keyboard=[
                 [InlineKeyboardButton(text="➕ Создать клиента", callback_data="create_client")],
                 [InlineKeyboardButton(text="🏠 В главное меню", callback_data="main_menu")]
             ])
-            
-            keyboard = InlineKeyboardMarkup(inline_keyboard=buttons)
-            await message.answer("👤 Список клиентов:", reply_markup=keyboard)
-            
+            await message.answer("👤 Нет доступных клиентов", reply_markup=keyboard)
+            return
+        
+        buttons = []
+        for client in clients:
+            buttons.append([
+                InlineKeyboardButton(
+                    text=f"{client['name']} - {client['phone_number']}",
+                    callback_data=ClientCallback(id=client['id'], action="view").pack()
+                )
+            ])
+        
+        buttons.extend([
+            [InlineKeyboardButton(text="➕ Создать клиента", callback_data="create_client")],
+            [InlineKeyboardButton(text="🏠 В главное меню", callback_data="main_menu")]
+        ])
+        
+        keyboard = InlineKeyboardMarkup(inline_keyboard=buttons)
+        await message.answer("👤 Список клиентов:", reply_markup=keyboard)
+        
     except Exception as e:
         logger.error(f"Ошибка при получении списка клиентов: {e}")
         await message.answer("❌ Произошла ошибка при получении списка клиентов")
@@ -141,18 +136,13 @@ async def process_name_edit(message: Message, state: FSMContext):
         data = await state.get_data()
         client_id = data.get('client_id')
         
-        async with httpx.AsyncClient() as client:
-            response = await client.patch(
-                f"{API_URL}/clients/{client_id}",
-                json={"name": message.text.strip()}
-            )
-            response.raise_for_status()
-            
-            await message.answer("✅ Имя клиента успешно обновлено")
-            await state.clear()
-            
-            message_text, keyboard = await get_client_info(client_id)
-            await message.answer(message_text, reply_markup=keyboard)
+        await api.update_client(client_id, {"name": message.text.strip()})
+        
+        await message.answer("✅ Имя клиента успешно обновлено")
+        await state.clear()
+        
+        message_text, keyboard = await get_client_info(client_id)
+        await message.answer(message_text, reply_markup=keyboard)
     except Exception as e:
         logger.error(f"Ошибка при обновлении имени клиента: {e}")
         await message.answer("❌ Произошла ошибка при обновлении имени клиента")
@@ -177,21 +167,16 @@ async def process_create_phone(message: Message, state: FSMContext):
     try:
         data = await state.get_data()
         
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                f"{API_URL}/clients",
-                json={
-                    "name": data['name'],
-                    "phone_number": message.text.strip()
-                }
-            )
-            response.raise_for_status()
-            
-            await message.answer("✅ Клиент успешно создан")
-            await state.clear()
-            
-            # Возвращаемся к списку клиентов
-            await command_clients(message)
+        await api.create_client({
+            "name": data['name'],
+            "phone_number": message.text.strip()
+        })
+        
+        await message.answer("✅ Клиент успешно создан")
+        await state.clear()
+        
+        # Возвращаемся к списку клиентов
+        await command_clients(message)
     except Exception as e:
         logger.error(f"Ошибка при создании клиента: {e}")
         await message.answer("❌ Произошла ошибка при создании клиента")
@@ -216,34 +201,29 @@ async def process_delete(callback: CallbackQuery, callback_data: ClientCallback,
         client_id = callback_data.id
         
         # Проверяем, есть ли связанные записи
-        async with httpx.AsyncClient() as client:
-            response = await client.get(f"{API_URL}/appointments")
-            response.raise_for_status()
-            appointments = response.json()
-            
-            # Проверяем, есть ли записи с этим клиентом
-            client_appointments = [a for a in appointments if a['client_id'] == client_id]
-            
-            if client_appointments:
-                await callback.message.answer(
-                    "❌ Невозможно удалить клиента, так как есть связанные записи.\n"
-                    "Сначала удалите или измените эти записи."
-                )
-                return
-            
-            # Если нет связанных записей, запрашиваем подтверждение
-            keyboard = InlineKeyboardMarkup(inline_keyboard=[
-                [
-                    InlineKeyboardButton(text="✅ Да", callback_data=f"confirm_delete_{client_id}"),
-                    InlineKeyboardButton(text="❌ Нет", callback_data="cancel_delete")
-                ]
-            ])
+        # Достаточно одной записи клиента, чтобы запретить удаление
+        client_appointments = (await api.appointments_page(client_id=client_id, limit=1))["items"]
+        
+        if client_appointments:
             await callback.message.answer(
-                "⚠️ Вы уверены, что хотите удалить этого клиента?",
-                reply_markup=keyboard
+                "❌ Невозможно удалить клиента, так как есть связанные записи.\n"
+                "Сначала удалите или измените эти записи."
             )
-            await state.set_state("waiting_for_confirmation")
-            await state.update_data(client_id=client_id)
+            return
+        
+        # Если нет связанных записей, запрашиваем подтверждение
+        keyboard = InlineKeyboardMarkup(inline_keyboard=[
+            [
+                InlineKeyboardButton(text="✅ Да", callback_data=f"confirm_delete_{client_id}"),
+                InlineKeyboardButton(text="❌ Нет", callback_data="cancel_delete")
+            ]
+        ])
+        await callback.message.answer(
+            "⚠️ Вы уверены, что хотите удалить этого клиента?",
+            reply_markup=keyboard
+        )
+        await state.set_state("waiting_for_confirmation")
+        await state.update_data(client_id=client_id)
     except Exception as e:
         logger.error(f"Ошибка при начале удаления клиента: {e}")
         await callback.answer("❌ Произошла ошибка", show_alert=True)
@@ -267,15 +247,13 @@ async def confirm_delete_client(callback: types.CallbackQuery, state: FSMContext
     client_id = int(callback.data.split("_")[-1])
     
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.delete(f"{API_URL}/clients/{client_id}")
-            response.raise_for_status()
-            
-            await callback.message.answer("✅ Клиент успешно удален")
-            await state.clear()
-            
-            # Возвращаемся к списку клиентов
-            await command_clients(callback.message)
+        await api.delete_client(client_id)
+        
+        await callback.message.answer("✅ Клиент успешно удален")
+        await state.clear()
+        
+        # Возвращаемся к списку клиентов
+        await command_clients(callback.message)
     except Exception as e:
         logger.error(f"Ошибка при удалении клиента: {e}")
         await callback.message.answer("❌ Произошла ошибка при удалении клиента")
@@ -302,18 +280,13 @@ async def process_phone_edit(message: Message, state: FSMContext):
         data = await state.get_data()
         client_id = data.get('client_id')
         
-        async with httpx.AsyncClient() as client:
-            response = await client.patch(
-                f"{API_URL}/clients/{client_id}",
-                json={"phone_number": message.text.strip()}
-            )
-            response.raise_for_status()
-            
-            await message.answer("✅ Телефон клиента успешно обновлен")
-            await state.clear()
-            
-            message_text, keyboard = await get_client_info(client_id)
-            await message.answer(message_text, reply_markup=keyboard)
+        await api.update_client(client_id, {"phone_number": message.text.strip()})
+        
+        await message.answer("✅ Телефон клиента успешно обновлен")
+        await state.clear()
+        
+        message_text, keyboard = await get_client_info(client_id)
+        await message.answer(message_text, reply_markup=keyboard)
     except Exception as e:
         logger.error(f"Ошибка при обновлении телефона клиента: {e}")
         await message.answer("❌ Произошла ошибка при обновлении телефона клиента") 
\ No newline at end of file
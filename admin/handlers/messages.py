@@ -9,7 +9,7 @@ from datetime import datetime
 import json
 from typing import Union
 
-from ..config import API_URL
+from ..services.http_client import api
 
 router = Router()
 logger = logging.getLogger(__name__)
@@ -42,8 +42,9 @@ class MessageCallback:
         )
 
 # Клавиатура с сообщениями
-def get_messages_keyboard(messages_list):
+def get_messages_keyboard(messages_list, client_names=None):
     keyboard = InlineKeyboardMarkup(inline_keyboard=[])
+    client_names = client_names or {}
     
     for message in messages_list:
         # Статус сообщения (прочитано/не прочитано)
@@ -58,10 +59,14 @@ def get_messages_keyboard(messages_list):
         # Определяем тип сообщения (входящее/исходящее)
         message_type = "⬅️" if message.get("is_from_admin") == 0 else "➡️"
         
+        # Имя клиента, если удалось его получить
+        client_name = client_names.get(message.get("user_id"))
+        author = f"{client_name}: " if client_name else ""
+        
         # Добавляем кнопку для каждого сообщения
         keyboard.inline_keyboard.append([
             InlineKeyboardButton(
-                text=f"{status} {message_type} {message_preview} ({created_at})",
+                text=f"{status} {message_type} {author}{message_preview} ({created_at})",
                 callback_data=MessageCallback(
                     action="view",
                     message_id=message.get("id")
@@ -94,39 +99,30 @@ async def show_messages(message: types.Message):
 async def show_messages_list(message_or_callback: Union[types.Message, CallbackQuery]):
     """Общая функция для отображения списка сообщений"""
     try:
-        async with httpx.AsyncClient() as client:
-            # Запрашиваем список сообщений
-            response = await client.get(f"{API_URL}/messages/")
-            
-            if response.status_code == 200:
-                messages = response.json()
-                
-                if not messages:
-                    text = "Список сообщений пуст"
-                    keyboard = InlineKeyboardMarkup(inline_keyboard=[
-                        [InlineKeyboardButton(
-                            text="✉️ Написать сообщение", 
-                            callback_data=MessageCallback(action="create").pack()
-                        )],
-                        [InlineKeyboardButton(
-                            text="🏠 В главное меню", 
-                            callback_data="main_menu"
-                        )]
-                    ])
-                else:
-                    text = "📬 Входящие и исходящие сообщения:"
-                    keyboard = get_messages_keyboard(messages)
-                
-                if isinstance(message_or_callback, types.Message):
-                    await message_or_callback.answer(text, reply_markup=keyboard)
-                else:
-                    await message_or_callback.message.edit_text(text, reply_markup=keyboard)
-            else:
-                error_text = "Ошибка при получении списка сообщений"
-                if isinstance(message_or_callback, types.Message):
-                    await message_or_callback.answer(error_text)
-                else:
-                    await message_or_callback.message.edit_text(error_text)
+        # Запрашиваем последние сообщения (первая страница списка)
+        messages = (await api.messages_page())["items"]
+        
+        if not messages:
+            text = "Список сообщений пуст"
+            keyboard = InlineKeyboardMarkup(inline_keyboard=[
+                [InlineKeyboardButton(
+                    text="✉️ Написать сообщение", 
+                    callback_data=MessageCallback(action="create").pack()
+                )],
+                [InlineKeyboardButton(
+                    text="🏠 В главное меню", 
+                    callback_data="main_menu"
+                )]
+            ])
+        else:
+            text = "📬 Входящие и исходящие сообщения:"
+            client_names = await get_client_names({m["user_id"] for m in messages})
+            keyboard = get_messages_keyboard(messages, client_names)
+        
+        if isinstance(message_or_callback, types.Message):
+            await message_or_callback.answer(text, reply_markup=keyboard)
+        else:
+            await message_or_callback.message.edit_text(text, reply_markup=keyboard)
     except Exception as e:
         logger.error(f"Ошибка при получении списка сообщений: {e}")
         error_text = "Произошла ошибка при получении списка сообщений"
@@ -168,118 +164,114 @@ async def process_message_callback(callback: CallbackQuery, state: FSMContext):
 async def view_message(callback: CallbackQuery, message_id: int):
     """Просмотр детальной информации о сообщении и истории переписки"""
     try:
-        async with httpx.AsyncClient() as client:
-            # Получаем информацию о сообщении
-            response = await client.get(f"{API_URL}/messages/{message_id}")
+        # Получаем информацию о сообщении
+        message_data = await api.get_message(message_id)
+        if message_data is None:
+            await callback.message.edit_text("Ошибка при получении информации о сообщении")
+            return
+        
+        # Получаем информацию о клиенте
+        client_id = message_data["user_id"]
+        client_data = await api.get_client(client_id)
+        client_name = (client_data or {}).get("name", "Неизвестно")
+        
+        # Получаем историю переписки с этим клиентом
+        messages_history = await api.list_messages(user_id=client_id)
+        
+        # Сортируем сообщения по дате (от старых к новым)
+        messages_history.sort(key=lambda x: x["created_at"])
+        
+        # Формируем текст с историей переписки
+        history_text = f"💬 Переписка с {client_name}:\n\n"
+        
+        for hist_msg in messages_history:
+            # Определяем направление сообщения
+            direction = "➡️ Вы:" if hist_msg["is_from_admin"] == 1 else f"⬅️ {client_name}:"
             
-            if response.status_code == 200:
-                message_data = response.json()
-                
-                # Получаем информацию о клиенте
-                client_id = message_data["user_id"]
-                client_response = await client.get(f"{API_URL}/clients/{client_id}")
-                client_name = "Неизвестно"
-                
-                if client_response.status_code == 200:
-                    client_data = client_response.json()
-                    client_name = client_data.get("name", "Неизвестно")
-                
-                # Получаем историю переписки с этим клиентом
-                history_response = await client.get(f"{API_URL}/messages/?user_id={client_id}")
+            # Форматируем дату
+            created_at = datetime.fromisoformat(hist_msg["created_at"])
+            date_str = created_at.strftime("%d.%m.%Y %H:%M")
+            
+            # Добавляем сообщение в историю
+            msg_text = hist_msg["text"]
+            # Выделяем текущее сообщение
+            if hist_msg["id"] == message_id:
+                msg_text = f"➤ {msg_text}"
                 
-                if history_response.status_code == 200:
-                    messages_history = history_response.json()
-                    
-                    # Сортируем сообщения по дате (от старых к новым)
-                    messages_history.sort(key=lambda x: x["created_at"])
-                    
-                    # Формируем текст с историей переписки
-                    history_text = f"💬 Переписка с {client_name}:\n\n"
-                    
-                    for hist_msg in messages_history:
-                        # Определяем направление сообщения
-                        direction = "➡️ Вы:" if hist_msg["is_from_admin"] == 1 else f"⬅️ {client_name}:"
-                        
-                        # Форматируем дату
-                        created_at = datetime.fromisoformat(hist_msg["created_at"])
-                        date_str = created_at.strftime("%d.%m.%Y %H:%M")
-                        
-                        # Добавляем сообщение в историю
-                        msg_text = hist_msg["text"]
-                        # Выделяем текущее сообщение
-                        if hist_msg["id"] == message_id:
-                            msg_text = f"➤ {msg_text}"
-                            
-                        history_text += f"{direction} ({date_str})\n{msg_text}\n\n"
-                    
-                    # Создаем клавиатуру
-                    keyboard = InlineKeyboardMarkup(inline_keyboard=[
-                        [InlineKeyboardButton(
-                            text="↩️ Ответить", 
-                            callback_data=MessageCallback(action="reply", message_id=message_id).pack()
-                        )],
-                        [InlineKeyboardButton(
-                            text="❌ Удалить", 
-                            callback_data=MessageCallback(action="delete", message_id=message_id).pack()
-                        )],
-                        [InlineKeyboardButton(
-                            text="🔙 Назад к списку", 
-                            callback_data=MessageCallback(action="back").pack()
-                        )]
-                    ])
-                    
-                    await callback.message.edit_text(history_text, reply_markup=keyboard)
-                    
-                    # Если сообщение не прочитано и это входящее сообщение, помечаем его как прочитанное
-                    if message_data["is_read"] == 0 and message_data["is_from_admin"] == 0:
-                        await client.put(f"{API_URL}/messages/read/{message_id}")
-                else:
-                    await callback.message.edit_text("Ошибка при получении истории переписки")
-            else:
-                await callback.message.edit_text("Ошибка при получении информации о сообщении")
+            history_text += f"{direction} ({date_str})\n{msg_text}\n\n"
+        
+        # Создаем клавиатуру
+        keyboard = InlineKeyboardMarkup(inline_keyboard=[
+            [InlineKeyboardButton(
+                text="↩️ Ответить", 
+                callback_data=MessageCallback(action="reply", message_id=message_id).pack()
+            )],
+            [InlineKeyboardButton(
+                text="❌ Удалить", 
+                callback_data=MessageCallback(action="delete", message_id=message_id).pack()
+            )],
+            [InlineKeyboardButton(
+                text="🔙 Назад к списку", 
+                callback_data=MessageCallback(action="back").pack()
+            )]
+        ])
+        
+        await callback.message.edit_text(history_text, reply_markup=keyboard)
+        
+        # Если сообщение не прочитано и это входящее сообщение, помечаем его как прочитанное
+        if message_data["is_read"] == 0 and message_data["is_from_admin"] == 0:
+            await api.mark_read(message_id)
     except Exception as e:
         logger.error(f"Ошибка при просмотре сообщения: {e}")
         await callback.message.edit_text("Произошла ошибка при просмотре сообщения")
 
+async def get_client_names(client_ids) -> dict:
+    """Получить имена клиентов одним запросом /clients?ids=..."""
+    if not client_ids:
+        return {}
+    try:
+        return {c["id"]: c["name"] for c in await api.list_clients(ids=sorted(client_ids))}
+    except Exception as e:
+        logger.error(f"Ошибка при получении имен клиентов: {e}")
+        return {}
+
 async def start_create_message(callback: CallbackQuery, state: FSMContext):
     """Начать создание нового сообщения"""
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(f"{API_URL}/clients")
-            
-            if response.status_code == 200:
-                clients = response.json()
-                
-                if not clients:
-                    await callback.message.edit_text("Нет доступных клиентов")
-                    return
-                
-                keyboard = InlineKeyboardMarkup(inline_keyboard=[])
-                
-                # Добавляем кнопки для каждого клиента
-                for client_data in clients:
-                    keyboard.inline_keyboard.append([
-                        InlineKeyboardButton(
-                            text=f"{client_data['name']} - {client_data['phone_number'] or 'Без телефона'}",
-                            callback_data=MessageCallback(
-                                action="select_client",
-                                client_id=client_data['id']
-                            ).pack()
-                        )
-                    ])
-                
-                # Добавляем кнопку возврата
-                keyboard.inline_keyboard.append([
-                    InlineKeyboardButton(
-                        text="🔙 Назад", 
-                        callback_data=MessageCallback(action="back").pack()
-                    )
-                ])
-                
-                await callback.message.edit_text("Выберите клиента для отправки сообщения:", reply_markup=keyboard)
-                await state.set_state(MessageState.waiting_for_client)
-            else:
-                await callback.message.edit_text("Ошибка при получении списка клиентов")
+        try:
+            clients = await api.list_clients()
+        except httpx.HTTPStatusError:
+            await callback.message.edit_text("Ошибка при получении списка клиентов")
+            return
+        
+        if not clients:
+            await callback.message.edit_text("Нет доступных клиентов")
+            return
+        
+        keyboard = InlineKeyboardMarkup(inline_keyboard=[])
+        
+        # Добавляем кнопки для каждого клиента
+        for client_data in clients:
+            keyboard.inline_keyboard.append([
+                InlineKeyboardButton(
+                    text=f"{client_data['name']} - {client_data['phone_number'] or 'Без телефона'}",
+                    callback_data=MessageCallback(
+                        action="select_client",
+                        client_id=client_data['id']
+                    ).pack()
+                )
+            ])
+        
+        # Добавляем кнопку возврата
+        keyboard.inline_keyboard.append([
+            InlineKeyboardButton(
+                text="🔙 Назад", 
+                callback_data=MessageCallback(action="back").pack()
+            )
+        ])
+        
+        await callback.message.edit_text("Выберите клиента для отправки сообщения:", reply_markup=keyboard)
+        await state.set_state(MessageState.waiting_for_client)
     except Exception as e:
         logger.error(f"Ошибка при начале создания сообщения: {e}")
         await callback.message.edit_text("Произошла ошибка при начале создания сообщения")
@@ -293,22 +285,19 @@ async def select_client(callback: CallbackQuery, client_id: int, state: FSMConte
 async def start_reply_message(callback: CallbackQuery, message_id: int, state: FSMContext):
     """Начать ответ на сообщение"""
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(f"{API_URL}/messages/{message_id}")
-            
-            if response.status_code == 200:
-                message_data = response.json()
-                
-                # Сохраняем информацию для последующего использования
-                await state.update_data(
-                    reply_to_id=message_id,
-                    user_id=message_data["user_id"]
-                )
-                
-                await callback.message.edit_text("Введите текст сообщения:")
-                await state.set_state(MessageState.waiting_for_text)
-            else:
-                await callback.message.edit_text("Ошибка при получении информации о сообщении")
+        message_data = await api.get_message(message_id)
+        if message_data is None:
+            await callback.message.edit_text("Ошибка при получении информации о сообщении")
+            return
+        
+        # Сохраняем информацию для последующего использования
+        await state.update_data(
+            reply_to_id=message_id,
+            user_id=message_data["user_id"]
+        )
+        
+        await callback.message.edit_text("Введите текст сообщения:")
+        await state.set_state(MessageState.waiting_for_text)
     except Exception as e:
         logger.error(f"Ошибка при начале ответа на сообщение: {e}")
         await callback.message.edit_text("Произошла ошибка при начале ответа на сообщение")
@@ -316,16 +305,11 @@ async def start_reply_message(callback: CallbackQuery, message_id: int, state: F
 async def delete_message(callback: CallbackQuery, message_id: int):
     """Удалить сообщение"""
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.delete(f"{API_URL}/messages/{message_id}")
-            
-            if response.status_code == 200:
-                await callback.message.edit_text("✅ Сообщение успешно удалено")
-                
-                # Показываем список сообщений
-                await show_messages_list(callback)
-            else:
-                await callback.message.edit_text("Ошибка при удалении сообщения")
+        await api.delete_message(message_id)
+        await callback.message.edit_text("✅ Сообщение успешно удалено")
+        
+        # Показываем список сообщений
+        await show_messages_list(callback)
     except Exception as e:
         logger.error(f"Ошибка при удалении сообщения: {e}")
         await callback.message.edit_text("Произошла ошибка при удалении сообщения")
@@ -351,15 +335,11 @@ async def process_text(message: types.Message, state: FSMContext):
             "is_read": 0
         }
         
-        async with httpx.AsyncClient() as client:
-            response = await client.post(f"{API_URL}/messages/", json=message_data)
-            if response.status_code == 200:
-                await message.answer("✅ Сообщение успешно отправлено")
-                
-                # Показываем список сообщений
-                await show_messages(message)
-            else:
-                await message.answer("Ошибка при отправке сообщения")
+        await api.create_message(message_data)
+        await message.answer("✅ Сообщение успешно отправлено")
+        
+        # Показываем список сообщений
+        await show_messages(message)
     except Exception as e:
         logger.error(f"Ошибка при отправке сообщения: {e}")
         await message.answer("Произошла ошибка при отправке сообщения")
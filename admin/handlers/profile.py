@@ -6,7 +6,7 @@ from aiogram.fsm.state import StatesGroup, State
 import httpx
 import logging
 from ..config import API_URL
-from ..middleware.auth_middleware import authorized_users
+from ..middleware.auth_middleware import authorized_users, save_session
 
 logger = logging.getLogger(__name__)
 
@@ -103,6 +103,7 @@ async def process_timezone_setting(callback: CallbackQuery):
                 authorized_users[user_id]['timezone'] = timezone
             else:
                 authorized_users[user_id] = {'timezone': timezone}
+            await save_session(user_id)
         
         await callback.message.edit_text(f"✅ Часовой пояс установлен: {timezone}")
         await callback.answer()
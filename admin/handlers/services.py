@@ -3,12 +3,12 @@ from aiogram.filters import Command
 from aiogram.fsm.context import FSMContext
 from aiogram.types import Message, InlineKeyboardMarkup, InlineKeyboardButton, CallbackQuery
 from aiogram.filters.callback_data import CallbackData
-import httpx
 import logging
 
 from aiogram.fsm.state import StatesGroup, State
 
-from ..config import API_URL
+from ..services.http_client import api
+from ..services.catalog import catalog, get_service, get_services
 
 logger = logging.getLogger(__name__)
 
@@ -20,11 +20,13 @@ class EditServiceState(StatesGroup):
     waiting_for_name = State()
     waiting_for_description = State()
     waiting_for_price = State()
+    waiting_for_duration = State()
 
 class CreateServiceState(StatesGroup):
     waiting_for_name = State()
     waiting_for_description = State()
     waiting_for_price = State()
+    waiting_for_duration = State()
 
 class DeleteServiceState(StatesGroup):
     waiting_for_confirmation = State()
@@ -38,43 +40,55 @@ class EditServiceCallback(CallbackData, prefix="service"):
     id: int
     field: str
 
+# Что спросить и в какое состояние перейти при редактировании поля услуги
+EDIT_PROMPTS = {
+    "edit_name": ("Введите новое название услуги:", EditServiceState.waiting_for_name),
+    "edit_description": ("Введите новое описание услуги:", EditServiceState.waiting_for_description),
+    "edit_price": ("Введите новую стоимость услуги (только число):", EditServiceState.waiting_for_price),
+    "edit_duration": ("Введите новую длительность услуги в минутах:", EditServiceState.waiting_for_duration),
+}
+
+def parse_duration(text: str) -> int:
+    """Длительность услуги в минутах; ValueError, если это не целое положительное число"""
+    duration = int(text.strip())
+    if duration <= 0:
+        raise ValueError("Длительность должна быть больше нуля")
+    return duration
+
 @router.message(Command("services"))
 async def command_services(message: Message):
     """Показать список услуг"""
     try:
-        async with httpx.AsyncClient() as client:
-            # Получаем список услуг
-            response = await client.get(f"{API_URL}/services")
-            response.raise_for_status()
-            services = response.json()
-            
-            if not services:
-                keyboard = InlineKeyboardMarkup(inline_keyboard=[
-                    [InlineKeyboardButton(text="➕ Создать услугу", callback_data="create_service")],
-                    [InlineKeyboardButton(text="🏠 Главное меню", callback_data="main_menu")]
-                ])
-                await message.answer("🔧 Нет доступных услуг", reply_markup=keyboard)
-                return
-            
-            # Создаем кнопки для каждой услуги
-            buttons = []
-            for service in services:
-                buttons.append([
-                    InlineKeyboardButton(
-                        text=f"{service['name']} - {service['price']}₽",
-                        callback_data=ServiceCallback(id=service['id'], action="view").pack()
-                    )
-                ])
-            
-            # Добавляем кнопки управления
-            buttons.extend([
+        # Получаем список услуг
+        services = await get_services()
+        
+        if not services:
+            keyboard = InlineKeyboardMarkup(inline_keyboard=[
                 [InlineKeyboardButton(text="➕ Создать услугу", callback_data="create_service")],
                 [InlineKeyboardButton(text="🏠 Главное меню", callback_data="main_menu")]
             ])
-            
-            keyboard = InlineKeyboardMarkup(inline_keyboard=buttons)
-            await message.answer("🔧 Список услуг:", reply_markup=keyboard)
-            
+            await message.answer("🔧 Нет доступных услуг", reply_markup=keyboard)
+            return
+        
+        # Создаем кнопки для каждой услуги
+        buttons = []
+        for service in services:
+            buttons.append([
+                InlineKeyboardButton(
+                    text=f"{service['name']} - {service['price']}₽",
+                    callback_data=ServiceCallback(id=service['id'], action="view").pack()
+                )
+            ])
+        
+        # Добавляем кнопки управления
+        buttons.extend([
+            [InlineKeyboardButton(text="➕ Создать услугу", callback_data="create_service")],
+            [InlineKeyboardButton(text="🏠 Главное меню", callback_data="main_menu")]
+        ])
+        
+        keyboard = InlineKeyboardMarkup(inline_keyboard=buttons)
+        await message.answer("🔧 Список услуг:", reply_markup=keyboard)
+        
     except Exception as e:
         logger.error(f"Ошибка при получении списка услуг: {e}")
         await message.answer("❌ Произошла ошибка при получении списка услуг")
@@ -88,49 +102,55 @@ async def process_create_service_callback(callback: types.CallbackQuery, state:
 async def get_service_info(service_id: int) -> tuple[str, InlineKeyboardMarkup]:
     """Получение информации об услуге"""
     try:
-        async with httpx.AsyncClient() as http_client:
-            response = await http_client.get(f"{API_URL}/services/{service_id}")
-            response.raise_for_status()
-            service = response.json()
-            
-            buttons = [
-                [
-                    InlineKeyboardButton(
-                        text="✏️ Изменить название",
-                        callback_data=ServiceCallback(action="edit_name", id=service_id).pack()
-                    ),
-                    InlineKeyboardButton(
-                        text="📝 Изменить описание",
-                        callback_data=ServiceCallback(action="edit_description", id=service_id).pack()
-                    )
-                ],
-                [
-                    InlineKeyboardButton(
-                        text="💰 Изменить цену",
-                        callback_data=ServiceCallback(action="edit_price", id=service_id).pack()
-                    ),
-                    InlineKeyboardButton(
-                        text="❌ Удалить услугу",
-                        callback_data=ServiceCallback(action="delete", id=service_id).pack()
-                    )
-                ],
-                [
-                    InlineKeyboardButton(text="◀️ Назад к списку", callback_data="back_to_services"),
-                    InlineKeyboardButton(text="🏠 В главное меню", callback_data="main_menu")
-                ]
+        service = await get_service(service_id)
+        if service is None:
+            raise ValueError("Услуга не найдена")
+        
+        buttons = [
+            [
+                InlineKeyboardButton(
+                    text="✏️ Изменить название",
+                    callback_data=ServiceCallback(action="edit_name", id=service_id).pack()
+                ),
+                InlineKeyboardButton(
+                    text="📝 Изменить описание",
+                    callback_data=ServiceCallback(action="edit_description", id=service_id).pack()
+                )
+            ],
+            [
+                InlineKeyboardButton(
+                    text="💰 Изменить цену",
+                    callback_data=ServiceCallback(action="edit_price", id=service_id).pack()
+                ),
+                InlineKeyboardButton(
+                    text="⏱ Изменить длительность",
+                    callback_data=ServiceCallback(action="edit_duration", id=service_id).pack()
+                )
+            ],
+            [
+                InlineKeyboardButton(
+                    text="❌ Удалить услугу",
+                    callback_data=ServiceCallback(action="delete", id=service_id).pack()
+                )
+            ],
+            [
+                InlineKeyboardButton(text="◀️ Назад к списку", callback_data="back_to_services"),
+                InlineKeyboardButton(text="🏠 В главное меню", callback_data="main_menu")
             ]
-            
-            keyboard = InlineKeyboardMarkup(inline_keyboard=buttons)
-            
-            message_text = (
-                f"🔧 Услуга #{service_id}\n\n"
-                f"📝 Название: {service['name']}\n"
-                f"📋 Описание: {service.get('description', 'Не указано')}\n"
-                f"💰 Стоимость: {service['price']} руб.\n"
-            )
-            
-            return message_text, keyboard
-            
+        ]
+        
+        keyboard = InlineKeyboardMarkup(inline_keyboard=buttons)
+        
+        message_text = (
+            f"🔧 Услуга #{service_id}\n\n"
+            f"📝 Название: {service['name']}\n"
+            f"📋 Описание: {service.get('description', 'Не указано')}\n"
+            f"💰 Стоимость: {service['price']} руб.\n"
+            f"⏱ Длительность: {service['duration']} мин.\n"
+        )
+        
+        return message_text, keyboard
+        
     except Exception as e:
         logger.error(f"Ошибка при получении информации об услуге: {e}")
         raise
@@ -149,42 +169,43 @@ async def process_service_selection(callback: CallbackQuery, callback_data: Serv
         logger.error(f"Ошибка при просмотре услуги: {e}")
         await callback.answer("❌ Произошла ошибка при получении информации об услуге", show_alert=True)
 
-@router.callback_query(ServiceCallback.filter(F.action == "delete"))
+@router.callback_query(ServiceCallback.filter(F.action.in_(list(EDIT_PROMPTS) + ["delete"])))
 async def process_edit_service(callback: types.CallbackQuery, callback_data: ServiceCallback, state: FSMContext):
     """Обработка редактирования услуги"""
     service_id = callback_data.id
     action = callback_data.action
     
-    if action == "delete":
+    if action in EDIT_PROMPTS:
+        prompt, next_state = EDIT_PROMPTS[action]
+        await callback.message.answer(prompt)
+        await state.set_state(next_state)
+        await state.update_data(service_id=service_id)
+    
+    elif action == "delete":
         # Проверяем, есть ли связанные записи
-        async with httpx.AsyncClient() as client:
-            response = await client.get(f"{API_URL}/appointments")
-            response.raise_for_status()
-            appointments = response.json()
-            
-            # Проверяем, есть ли записи с этой услугой
-            service_appointments = [a for a in appointments if a.get('service_id') == service_id]
-            
-            if service_appointments:
-                await callback.message.edit_text(
-                    "❌ Невозможно удалить услугу, так как есть связанные записи.\n"
-                    "Сначала удалите или измените эти записи."
-                )
-                return
-            
-            # Если нет связанных записей, запрашиваем подтверждение
-            keyboard = InlineKeyboardMarkup(inline_keyboard=[
-                [
-                    InlineKeyboardButton(text="✅ Да", callback_data=f"service:delete:confirm:{service_id}"),
-                    InlineKeyboardButton(text="❌ Нет", callback_data="service:delete:cancel")
-                ]
-            ])
+        # Достаточно одной записи на эту услугу, чтобы запретить удаление
+        service_appointments = (await api.appointments_page(service_id=service_id, limit=1))["items"]
+        
+        if service_appointments:
             await callback.message.edit_text(
-                "⚠️ Вы уверены, что хотите удалить эту услугу?",
-                reply_markup=keyboard
+                "❌ Невозможно удалить услугу, так как есть связанные записи.\n"
+                "Сначала удалите или измените эти записи."
             )
-            await state.set_state(DeleteServiceState.waiting_for_confirmation)
-            await state.update_data(service_id=service_id)
+            return
+        
+        # Если нет связанных записей, запрашиваем подтверждение
+        keyboard = InlineKeyboardMarkup(inline_keyboard=[
+            [
+                InlineKeyboardButton(text="✅ Да", callback_data=f"service:delete:confirm:{service_id}"),
+                InlineKeyboardButton(text="❌ Нет", callback_data="service:delete:cancel")
+            ]
+        ])
+        await callback.message.edit_text(
+            "⚠️ Вы уверены, что хотите удалить эту услугу?",
+            reply_markup=keyboard
+        )
+        await state.set_state(DeleteServiceState.waiting_for_confirmation)
+        await state.update_data(service_id=service_id)
     
     await callback.answer()
 
@@ -199,16 +220,15 @@ async def process_confirm_delete_service(callback: types.CallbackQuery, state: F
     """Обработка подтверждения удаления услуги"""
     try:
         service_id = int(callback.data.split(":")[-1])
-        async with httpx.AsyncClient() as client:
-            # Удаляем услугу
-            response = await client.delete(f"{API_URL}/services/{service_id}")
-            response.raise_for_status()
-            
-            await callback.message.edit_text("✅ Услуга успешно удалена")
-            
-            # Показываем обновленный список услуг
-            await command_services(callback.message)
-            
+        # Удаляем услугу
+        await api.delete_service(service_id)
+        catalog.invalidate("services")
+        
+        await callback.message.edit_text("✅ Услуга успешно удалена")
+        
+        # Показываем обновленный список услуг
+        await command_services(callback.message)
+        
     except Exception as e:
         logger.error(f"Ошибка при удалении услуги: {e}")
         await callback.message.edit_text("❌ Произошла ошибка при удалении услуги")
@@ -230,18 +250,14 @@ async def process_edit_name(message: Message, state: FSMContext):
         data = await state.get_data()
         service_id = data.get('service_id')
         
-        async with httpx.AsyncClient() as client:
-            response = await client.patch(
-                f"{API_URL}/services/{service_id}",
-                json={"name": message.text}
-            )
-            response.raise_for_status()
-            
-            await message.answer("✅ Название услуги успешно обновлено")
-            await state.clear()
-            
-            message_text, keyboard = await get_service_info(service_id)
-            await message.answer(message_text, reply_markup=keyboard)
+        await api.update_service(service_id, {"name": message.text})
+        catalog.invalidate("services")
+        
+        await message.answer("✅ Название услуги успешно обновлено")
+        await state.clear()
+        
+        message_text, keyboard = await get_service_info(service_id)
+        await message.answer(message_text, reply_markup=keyboard)
     except Exception as e:
         logger.error(f"Ошибка при обновлении названия услуги: {e}")
         await message.answer("❌ Произошла ошибка при обновлении названия услуги")
@@ -253,18 +269,14 @@ async def process_edit_description(message: Message, state: FSMContext):
         data = await state.get_data()
         service_id = data.get('service_id')
         
-        async with httpx.AsyncClient() as client:
-            response = await client.patch(
-                f"{API_URL}/services/{service_id}",
-                json={"description": message.text}
-            )
-            response.raise_for_status()
-            
-            await message.answer("✅ Описание услуги успешно обновлено")
-            await state.clear()
-            
-            message_text, keyboard = await get_service_info(service_id)
-            await message.answer(message_text, reply_markup=keyboard)
+        await api.update_service(service_id, {"description": message.text})
+        catalog.invalidate("services")
+        
+        await message.answer("✅ Описание услуги успешно обновлено")
+        await state.clear()
+        
+        message_text, keyboard = await get_service_info(service_id)
+        await message.answer(message_text, reply_markup=keyboard)
     except Exception as e:
         logger.error(f"Ошибка при обновлении описания услуги: {e}")
         await message.answer("❌ Произошла ошибка при обновлении описания услуги")
@@ -277,25 +289,43 @@ async def process_edit_price(message: Message, state: FSMContext):
         data = await state.get_data()
         service_id = data.get('service_id')
         
-        async with httpx.AsyncClient() as client:
-            response = await client.patch(
-                f"{API_URL}/services/{service_id}",
-                json={"price": price}
-            )
-            response.raise_for_status()
-            
-            await message.answer("✅ Стоимость услуги успешно обновлена")
-            await state.clear()
-            
-            # Возвращаемся к списку услуг
-            message_text, keyboard = await get_service_info(service_id)
-            await message.answer(message_text, reply_markup=keyboard)
+        await api.update_service(service_id, {"price": price})
+        catalog.invalidate("services")
+        
+        await message.answer("✅ Стоимость услуги успешно обновлена")
+        await state.clear()
+        
+        # Возвращаемся к списку услуг
+        message_text, keyboard = await get_service_info(service_id)
+        await message.answer(message_text, reply_markup=keyboard)
     except ValueError:
         await message.answer("❌ Пожалуйста, введите корректное число")
     except Exception as e:
         logger.error(f"Ошибка при обновлении стоимости услуги: {e}")
         await message.answer("❌ Произошла ошибка при обновлении стоимости услуги")
 
+@router.message(EditServiceState.waiting_for_duration)
+async def process_edit_duration(message: Message, state: FSMContext):
+    """Обработка новой длительности услуги"""
+    try:
+        duration = parse_duration(message.text)
+        data = await state.get_data()
+        service_id = data.get('service_id')
+        
+        await api.update_service(service_id, {"duration": duration})
+        catalog.invalidate("services")
+        
+        await message.answer("✅ Длительность услуги успешно обновлена")
+        await state.clear()
+        
+        message_text, keyboard = await get_service_info(service_id)
+        await message.answer(message_text, reply_markup=keyboard)
+    except ValueError:
+        await message.answer("❌ Пожалуйста, введите целое число минут больше нуля")
+    except Exception as e:
+        logger.error(f"Ошибка при обновлении длительности услуги: {e}")
+        await message.answer("❌ Произошла ошибка при обновлении длительности услуги")
+
 @router.message(CreateServiceState.waiting_for_name)
 async def process_create_name(message: Message, state: FSMContext):
     """Обработка названия новой услуги"""
@@ -315,26 +345,35 @@ async def process_create_price(message: Message, state: FSMContext):
     """Обработка цены новой услуги"""
     try:
         price = float(message.text)
+    except ValueError:
+        await message.answer("❌ Пожалуйста, введите корректное число")
+        return
+    await state.update_data(price=price)
+    await message.answer("Введите длительность услуги в минутах (например, 60):")
+    await state.set_state(CreateServiceState.waiting_for_duration)
+
+@router.message(CreateServiceState.waiting_for_duration)
+async def process_create_duration(message: Message, state: FSMContext):
+    """Обработка длительности новой услуги"""
+    try:
+        duration = parse_duration(message.text)
         data = await state.get_data()
         
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                f"{API_URL}/services",
-                json={
-                    "name": data['name'],
-                    "description": data['description'],
-                    "price": price
-                }
-            )
-            response.raise_for_status()
-            
-            await message.answer("✅ Услуга успешно создана")
-            await state.clear()
-            
-            # Возвращаемся к списку услуг
-            await command_services(message)
+        await api.create_service({
+            "name": data['name'],
+            "description": data['description'],
+            "price": data['price'],
+            "duration": duration
+        })
+        catalog.invalidate("services")
+        
+        await message.answer("✅ Услуга успешно создана")
+        await state.clear()
+        
+        # Возвращаемся к списку услуг
+        await command_services(message)
     except ValueError:
-        await message.answer("❌ Пожалуйста, введите корректное число")
+        await message.answer("❌ Пожалуйста, введите целое число минут больше нуля")
     except Exception as e:
         logger.error(f"Ошибка при создании услуги: {e}")
         await message.answer("❌ Произошла ошибка при создании услуги") 
\ No newline at end of file
@@ -4,14 +4,16 @@ from aiogram.fsm.context import FSMContext
 from aiogram.fsm.state import StatesGroup, State
 from aiogram.types import Message, CallbackQuery, InlineKeyboardMarkup, InlineKeyboardButton
 from aiogram.filters.callback_data import CallbackData
-import httpx
 import logging
 from datetime import datetime, timedelta
 import calendar
 from typing import List, Dict, Optional
 from zoneinfo import ZoneInfo
 
-from ..config import API_URL
+from api_client.models import WorkingPeriod
+
+from ..services.catalog import catalog, get_working_periods
+from ..services.http_client import api
 from .profile import get_admin_timezone
 
 logger = logging.getLogger(__name__)
@@ -38,6 +40,13 @@ class WorkingPeriodCallback(CallbackData, prefix="working_period"):
 class ViewSlotsCallback(CallbackData, prefix="view_slots"):
     date: str
 
+async def get_period(period_id: int) -> WorkingPeriod:
+    """Рабочий период по id; ValueError, если такого периода нет"""
+    period = await api.get_working_period(period_id)
+    if period is None:
+        raise ValueError(f"Рабочий период {period_id} не найден")
+    return period
+
 @router.message(Command("time_slots"))
 async def command_time_slots(message: Message):
     """Обработчик команды /time_slots"""
@@ -71,78 +80,75 @@ async def show_working_periods(callback: CallbackQuery):
         admin_timezone = get_admin_timezone(callback.from_user.id)
         
         # Получаем список рабочих периодов
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.get(f"{API_URL}/working_periods")
-            response.raise_for_status()
-            periods = response.json()
+        periods = await get_working_periods()
+        
+        if not periods:
+            # Если периодов нет, предлагаем создать их
+            keyboard = InlineKeyboardMarkup(inline_keyboard=[
+                [InlineKeyboardButton(text="➕ Создать рабочий период", callback_data="create_working_period")],
+                [InlineKeyboardButton(text="◀️ Назад", callback_data="time_slots")],
+                [InlineKeyboardButton(text="🏠 Главное меню", callback_data="main_menu")]
+            ])
+            await callback.message.answer("❌ Нет рабочих периодов", reply_markup=keyboard)
+            await callback.answer()
+            return
+        
+        # Формируем сообщение с рабочими периодами
+        message_text = "📅 Рабочие периоды:\n\n"
+        
+        # Создаем кнопки для каждого периода
+        keyboard = []
+        
+        for period in periods:
+            # Форматируем даты с учетом часового пояса администратора
+            start_date = datetime.fromisoformat(period['start_date'].replace('Z', '+00:00')).replace(tzinfo=ZoneInfo("UTC"))
+            end_date = datetime.fromisoformat(period['end_date'].replace('Z', '+00:00')).replace(tzinfo=ZoneInfo("UTC"))
+            
+            # Конвертируем в часовой пояс администратора
+            start_date_local = start_date.astimezone(ZoneInfo(admin_timezone))
+            end_date_local = end_date.astimezone(ZoneInfo(admin_timezone))
+            
+            # Форматируем для отображения
+            start_date_formatted = start_date_local.strftime("%d.%m.%Y")
+            end_date_formatted = end_date_local.strftime("%d.%m.%Y")
+            
+            # Преобразуем время в местное время
+            start_time_parts = period['start_time'].split(':')
+            end_time_parts = period['end_time'].split(':')
             
-            if not periods:
-                # Если периодов нет, предлагаем создать их
-                keyboard = InlineKeyboardMarkup(inline_keyboard=[
-                    [InlineKeyboardButton(text="➕ Создать рабочий период", callback_data="create_working_period")],
-                    [InlineKeyboardButton(text="◀️ Назад", callback_data="time_slots")],
-                    [InlineKeyboardButton(text="🏠 Главное меню", callback_data="main_menu")]
-                ])
-                await callback.message.answer("❌ Нет рабочих периодов", reply_markup=keyboard)
-                await callback.answer()
-                return
+            # Создаем временные объекты datetime с сегодняшней датой для преобразования времени
+            today_utc = datetime.now(ZoneInfo("UTC")).replace(hour=int(start_time_parts[0]), minute=int(start_time_parts[1]), second=0, microsecond=0)
+            today_utc_end = datetime.now(ZoneInfo("UTC")).replace(hour=int(end_time_parts[0]), minute=int(end_time_parts[1]), second=0, microsecond=0)
+            
+            # Конвертируем в местное время
+            today_local = today_utc.astimezone(ZoneInfo(admin_timezone))
+            today_local_end = today_utc_end.astimezone(ZoneInfo(admin_timezone))
             
-            # Формируем сообщение с рабочими периодами
-            message_text = "📅 Рабочие периоды:\n\n"
+            # Получаем отформатированное время
+            start_time_formatted = today_local.strftime("%H:%M")
+            end_time_formatted = today_local_end.strftime("%H:%M")
             
-            # Создаем кнопки для каждого периода
-            keyboard = []
+            status = "🟢 Активен" if period['is_active'] == 1 else "🔴 Не активен"
             
-            for period in periods:
-                # Форматируем даты с учетом часового пояса администратора
-                start_date = datetime.fromisoformat(period['start_date'].replace('Z', '+00:00')).replace(tzinfo=ZoneInfo("UTC"))
-                end_date = datetime.fromisoformat(period['end_date'].replace('Z', '+00:00')).replace(tzinfo=ZoneInfo("UTC"))
-                
-                # Конвертируем в часовой пояс администратора
-                start_date_local = start_date.astimezone(ZoneInfo(admin_timezone))
-                end_date_local = end_date.astimezone(ZoneInfo(admin_timezone))
-                
-                # Форматируем для отображения
-                start_date_formatted = start_date_local.strftime("%d.%m.%Y")
-                end_date_formatted = end_date_local.strftime("%d.%m.%Y")
-                
-                # Преобразуем время в местное время
-                start_time_parts = period['start_time'].split(':')
-                end_time_parts = period['end_time'].split(':')
-                
-                # Создаем временные объекты datetime с сегодняшней датой для преобразования времени
-                today_utc = datetime.now(ZoneInfo("UTC")).replace(hour=int(start_time_parts[0]), minute=int(start_time_parts[1]), second=0, microsecond=0)
-                today_utc_end = datetime.now(ZoneInfo("UTC")).replace(hour=int(end_time_parts[0]), minute=int(end_time_parts[1]), second=0, microsecond=0)
-                
-                # Конвертируем в местное время
-                today_local = today_utc.astimezone(ZoneInfo(admin_timezone))
-                today_local_end = today_utc_end.astimezone(ZoneInfo(admin_timezone))
-                
-                # Получаем отформатированное время
-                start_time_formatted = today_local.strftime("%H:%M")
-                end_time_formatted = today_local_end.strftime("%H:%M")
-                
-                status = "🟢 Активен" if period['is_active'] == 1 else "🔴 Не активен"
-                
-                # Добавляем информацию о периоде в сообщение с конвертированным временем
-                message_text += f"• {start_date_formatted} - {end_date_formatted}: {start_time_formatted}-{end_time_formatted}, {period['slot_duration']} мин. {status}\n"
-                
-                # Добавляем кнопку
-                keyboard.append([
-                    InlineKeyboardButton(
-                        text=f"✏️ {start_date_formatted} - {end_date_formatted}",
-                        callback_data=WorkingPeriodCallback(id=period['id'], action="edit").pack()
-                    )
-                ])
+            # Добавляем информацию о периоде в сообщение с конвертированным временем
+            message_text += f"• {start_date_formatted} - {end_date_formatted}: {start_time_formatted}-{end_time_formatted}, {period['slot_duration']} мин. {status}\n"
             
-            # Добавляем кнопки управления
-            keyboard.extend([
-                [InlineKeyboardButton(text="➕ Создать рабочий период", callback_data="create_working_period")],
-                [InlineKeyboardButton(text="◀️ Назад", callback_data="time_slots")]
+            # Добавляем кнопку
+            keyboard.append([
+                InlineKeyboardButton(
+                    text=f"✏️ {start_date_formatted} - {end_date_formatted}",
+                    callback_data=WorkingPeriodCallback(id=period['id'], action="edit").pack()
+                )
             ])
-            
-            markup = InlineKeyboardMarkup(inline_keyboard=keyboard)
-            await callback.message.answer(message_text, reply_markup=markup)
+        
+        # Добавляем кнопки управления
+        keyboard.extend([
+            [InlineKeyboardButton(text="➕ Создать рабочий период", callback_data="create_working_period")],
+            [InlineKeyboardButton(text="◀️ Назад", callback_data="time_slots")]
+        ])
+        
+        markup = InlineKeyboardMarkup(inline_keyboard=keyboard)
+        await callback.message.answer(message_text, reply_markup=markup)
         
     except Exception as e:
         logger.error(f"Ошибка при получении списка рабочих периодов: {e}")
@@ -159,17 +165,25 @@ async def view_time_slots_dates(callback: CallbackQuery):
     # Получаем текущую дату в часовом поясе администратора
     now = datetime.now(ZoneInfo(admin_timezone))
     
-    # Создаем кнопки для следующих 7 дней
+    # Сводка по следующим 7 дням одним запросом: показываем только рабочие дни
+    try:
+        availability = await api.availability(now.date(), (now + timedelta(days=6)).date())
+        days = [day for day in availability if day["total"] > 0]
+    except Exception as e:
+        logger.error(f"Ошибка при получении сводки по слотам: {e}")
+        await callback.message.answer("❌ Произошла ошибка при получении списка дат")
+        await callback.answer()
+        return
+    
     keyboard = []
-    for i in range(7):
-        date = now + timedelta(days=i)
-        date_str = date.strftime("%Y-%m-%d")
+    for day in days:
+        date = datetime.strptime(day["date"], "%Y-%m-%d")
         display_date = date.strftime("%d.%m.%Y (%a)")
         
         keyboard.append([
             InlineKeyboardButton(
-                text=display_date,
-                callback_data=ViewSlotsCallback(date=date_str).pack()
+                text=f"{display_date} - свободно {day['free']} из {day['total']}",
+                callback_data=ViewSlotsCallback(date=day["date"]).pack()
             )
         ])
     
@@ -178,7 +192,8 @@ async def view_time_slots_dates(callback: CallbackQuery):
     keyboard.append([InlineKeyboardButton(text="🏠 Главное меню", callback_data="main_menu")])
     
     markup = InlineKeyboardMarkup(inline_keyboard=keyboard)
-    await callback.message.answer("📅 Выберите дату для просмотра слотов:", reply_markup=markup)
+    text = "📅 Выберите дату для просмотра слотов:" if days else "📅 На ближайшие 7 дней нет рабочих периодов"
+    await callback.message.answer(text, reply_markup=markup)
     
     await callback.answer()
 
@@ -192,56 +207,50 @@ async def view_slots_for_date(callback: CallbackQuery, callback_data: ViewSlotsC
         admin_timezone = get_admin_timezone(callback.from_user.id)
         
         # Получаем слоты для выбранной даты
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.get(
-                f"{API_URL}/working_periods/time_slots",
-                params={"date": selected_date}
-            )
-            response.raise_for_status()
-            slots = response.json()
-            
-            if not slots:
-                # Если слотов на эту дату нет
-                keyboard = InlineKeyboardMarkup(inline_keyboard=[
-                    [InlineKeyboardButton(text="◀️ Назад к выбору даты", callback_data="view_time_slots")],
-                    [InlineKeyboardButton(text="🏠 Главное меню", callback_data="main_menu")]
-                ])
-                await callback.message.answer("❌ Нет слотов на выбранную дату", reply_markup=keyboard)
-                await callback.answer()
-                return
-            
-            # Форматируем дату для отображения с учетом часового пояса
-            display_date = datetime.strptime(selected_date, "%Y-%m-%d").strftime("%d.%m.%Y")
+        slots = await api.time_slots(datetime.strptime(selected_date, "%Y-%m-%d").date())
+        
+        if not slots:
+            # Если слотов на эту дату нет
+            keyboard = InlineKeyboardMarkup(inline_keyboard=[
+                [InlineKeyboardButton(text="◀️ Назад к выбору даты", callback_data="view_time_slots")],
+                [InlineKeyboardButton(text="🏠 Главное меню", callback_data="main_menu")]
+            ])
+            await callback.message.answer("❌ Нет слотов на выбранную дату", reply_markup=keyboard)
+            await callback.answer()
+            return
+        
+        # Форматируем дату для отображения с учетом часового пояса
+        display_date = datetime.strptime(selected_date, "%Y-%m-%d").strftime("%d.%m.%Y")
+        
+        # Формируем сообщение со списком слотов
+        message_text = f"📅 Слоты на {display_date}:\n\n"
+        
+        for slot in slots:
+            # Форматируем время с учетом часового пояса администратора
+            start_time_utc = datetime.fromisoformat(slot['start_time'].replace('Z', '+00:00')).replace(tzinfo=ZoneInfo("UTC"))
+            end_time_utc = datetime.fromisoformat(slot['end_time'].replace('Z', '+00:00')).replace(tzinfo=ZoneInfo("UTC"))
             
-            # Формируем сообщение со списком слотов
-            message_text = f"📅 Слоты на {display_date}:\n\n"
+            # Конвертируем в часовой пояс администратора
+            start_time_local = start_time_utc.astimezone(ZoneInfo(admin_timezone))
+            end_time_local = end_time_utc.astimezone(ZoneInfo(admin_timezone))
             
-            for slot in slots:
-                # Форматируем время с учетом часового пояса администратора
-                start_time_utc = datetime.fromisoformat(slot['start_time'].replace('Z', '+00:00')).replace(tzinfo=ZoneInfo("UTC"))
-                end_time_utc = datetime.fromisoformat(slot['end_time'].replace('Z', '+00:00')).replace(tzinfo=ZoneInfo("UTC"))
-                
-                # Конвертируем в часовой пояс администратора
-                start_time_local = start_time_utc.astimezone(ZoneInfo(admin_timezone))
-                end_time_local = end_time_utc.astimezone(ZoneInfo(admin_timezone))
-                
-                start_time = start_time_local.strftime("%H:%M")
-                end_time = end_time_local.strftime("%H:%M")
-                
-                time_range = f"{start_time} - {end_time}"
-                status = "🟢 Свободен" if slot['is_available'] else "🔴 Занят"
-                
-                # Добавляем информацию о слоте в сообщение
-                message_text += f"• {time_range}: {status}\n"
+            start_time = start_time_local.strftime("%H:%M")
+            end_time = end_time_local.strftime("%H:%M")
             
-            # Создаем клавиатуру
-            keyboard = [
-                [InlineKeyboardButton(text="◀️ Назад к выбору даты", callback_data="view_time_slots")],
-                [InlineKeyboardButton(text="🏠 Главное меню", callback_data="main_menu")]
-            ]
+            time_range = f"{start_time} - {end_time}"
+            status = "🟢 Свободен" if slot['is_available'] else "🔴 Занят"
             
-            markup = InlineKeyboardMarkup(inline_keyboard=keyboard)
-            await callback.message.answer(message_text, reply_markup=markup)
+            # Добавляем информацию о слоте в сообщение
+            message_text += f"• {time_range}: {status}\n"
+        
+        # Создаем клавиатуру
+        keyboard = [
+            [InlineKeyboardButton(text="◀️ Назад к выбору даты", callback_data="view_time_slots")],
+            [InlineKeyboardButton(text="🏠 Главное меню", callback_data="main_menu")]
+        ]
+        
+        markup = InlineKeyboardMarkup(inline_keyboard=keyboard)
+        await callback.message.answer(message_text, reply_markup=markup)
         
     except Exception as e:
         logger.error(f"Ошибка при получении слотов для даты {callback_data.date}: {e}")
@@ -259,73 +268,70 @@ async def edit_working_period(callback: CallbackQuery, callback_data: WorkingPer
         admin_timezone = get_admin_timezone(callback.from_user.id)
         
         # Получаем информацию о периоде
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.get(f"{API_URL}/working_periods/{period_id}")
-            response.raise_for_status()
-            period = response.json()
-            
-            # Форматируем даты с учетом часового пояса администратора
-            start_date = datetime.fromisoformat(period['start_date'].replace('Z', '+00:00')).replace(tzinfo=ZoneInfo("UTC"))
-            end_date = datetime.fromisoformat(period['end_date'].replace('Z', '+00:00')).replace(tzinfo=ZoneInfo("UTC"))
-            
-            # Конвертируем в часовой пояс администратора
-            start_date_local = start_date.astimezone(ZoneInfo(admin_timezone))
-            end_date_local = end_date.astimezone(ZoneInfo(admin_timezone))
-            
-            # Форматируем для отображения
-            start_date_formatted = start_date_local.strftime("%d.%m.%Y")
-            end_date_formatted = end_date_local.strftime("%d.%m.%Y")
-            
-            # Преобразуем время в местное время
-            start_time_parts = period['start_time'].split(':')
-            end_time_parts = period['end_time'].split(':')
-            
-            # Создаем временные объекты datetime с сегодняшней датой для преобразования времени
-            today_utc = datetime.now(ZoneInfo("UTC")).replace(hour=int(start_time_parts[0]), minute=int(start_time_parts[1]), second=0, microsecond=0)
-            today_utc_end = datetime.now(ZoneInfo("UTC")).replace(hour=int(end_time_parts[0]), minute=int(end_time_parts[1]), second=0, microsecond=0)
-            
-            # Конвертируем в местное время
-            today_local = today_utc.astimezone(ZoneInfo(admin_timezone))
-            today_local_end = today_utc_end.astimezone(ZoneInfo(admin_timezone))
-            
-            # Получаем отформатированное время
-            start_time_formatted = today_local.strftime("%H:%M")
-            end_time_formatted = today_local_end.strftime("%H:%M")
-            
-            # Формируем сообщение о периоде
-            message_text = f"📅 Рабочий период:\n\n"
-            message_text += f"Начало: {start_date_formatted}\n"
-            message_text += f"Окончание: {end_date_formatted}\n"
-            message_text += f"Время работы: {start_time_formatted} - {end_time_formatted}\n"
-            message_text += f"Длительность слота: {period['slot_duration']} мин.\n"
-            message_text += f"Статус: {'🟢 Активен' if period['is_active'] == 1 else '🔴 Не активен'}\n"
-            
-            # Создаем клавиатуру для редактирования
-            keyboard = InlineKeyboardMarkup(inline_keyboard=[
-                [InlineKeyboardButton(text="✏️ Изменить даты", callback_data=WorkingPeriodCallback(id=period_id, action="edit_dates").pack())],
-                [InlineKeyboardButton(text="✏️ Изменить время", callback_data=WorkingPeriodCallback(id=period_id, action="edit_times").pack())],
-                [InlineKeyboardButton(text="✏️ Изменить длительность слота", callback_data=WorkingPeriodCallback(id=period_id, action="edit_duration").pack())],
-                [
-                    InlineKeyboardButton(
-                        text="🟢 Активировать" if period['is_active'] == 0 else "🔴 Деактивировать",
-                        callback_data=WorkingPeriodCallback(id=period_id, action="toggle_active").pack()
-                    )
-                ],
-                [
-                    InlineKeyboardButton(
-                        text="❌ Удалить",
-                        callback_data=WorkingPeriodCallback(id=period_id, action="delete").pack()
-                    )
-                ],
-                [
-                    InlineKeyboardButton(text="◀️ Назад", callback_data="working_periods"),
-                    InlineKeyboardButton(text="🏠 Главное меню", callback_data="main_menu")
-                ]
-            ])
-            
-            await callback.message.edit_text(message_text, reply_markup=keyboard)
-            await callback.answer()
-            
+        period = await get_period(period_id)
+        
+        # Форматируем даты с учетом часового пояса администратора
+        start_date = datetime.fromisoformat(period['start_date'].replace('Z', '+00:00')).replace(tzinfo=ZoneInfo("UTC"))
+        end_date = datetime.fromisoformat(period['end_date'].replace('Z', '+00:00')).replace(tzinfo=ZoneInfo("UTC"))
+        
+        # Конвертируем в часовой пояс администратора
+        start_date_local = start_date.astimezone(ZoneInfo(admin_timezone))
+        end_date_local = end_date.astimezone(ZoneInfo(admin_timezone))
+        
+        # Форматируем для отображения
+        start_date_formatted = start_date_local.strftime("%d.%m.%Y")
+        end_date_formatted = end_date_local.strftime("%d.%m.%Y")
+        
+        # Преобразуем время в местное время
+        start_time_parts = period['start_time'].split(':')
+        end_time_parts = period['end_time'].split(':')
+        
+        # Создаем временные объекты datetime с сегодняшней датой для преобразования времени
+        today_utc = datetime.now(ZoneInfo("UTC")).replace(hour=int(start_time_parts[0]), minute=int(start_time_parts[1]), second=0, microsecond=0)
+        today_utc_end = datetime.now(ZoneInfo("UTC")).replace(hour=int(end_time_parts[0]), minute=int(end_time_parts[1]), second=0, microsecond=0)
+        
+        # Конвертируем в местное время
+        today_local = today_utc.astimezone(ZoneInfo(admin_timezone))
+        today_local_end = today_utc_end.astimezone(ZoneInfo(admin_timezone))
+        
+        # Получаем отформатированное время
+        start_time_formatted = today_local.strftime("%H:%M")
+        end_time_formatted = today_local_end.strftime("%H:%M")
+        
+        # Формируем сообщение о периоде
+        message_text = f"📅 Рабочий период:\n\n"
+        message_text += f"Начало: {start_date_formatted}\n"
+        message_text += f"Окончание: {end_date_formatted}\n"
+        message_text += f"Время работы: {start_time_formatted} - {end_time_formatted}\n"
+        message_text += f"Длительность слота: {period['slot_duration']} мин.\n"
+        message_text += f"Статус: {'🟢 Активен' if period['is_active'] == 1 else '🔴 Не активен'}\n"
+        
+        # Создаем клавиатуру для редактирования
+        keyboard = InlineKeyboardMarkup(inline_keyboard=[
+            [InlineKeyboardButton(text="✏️ Изменить даты", callback_data=WorkingPeriodCallback(id=period_id, action="edit_dates").pack())],
+            [InlineKeyboardButton(text="✏️ Изменить время", callback_data=WorkingPeriodCallback(id=period_id, action="edit_times").pack())],
+            [InlineKeyboardButton(text="✏️ Изменить длительность слота", callback_data=WorkingPeriodCallback(id=period_id, action="edit_duration").pack())],
+            [
+                InlineKeyboardButton(
+                    text="🟢 Активировать" if period['is_active'] == 0 else "🔴 Деактивировать",
+                    callback_data=WorkingPeriodCallback(id=period_id, action="toggle_active").pack()
+                )
+            ],
+            [
+                InlineKeyboardButton(
+                    text="❌ Удалить",
+                    callback_data=WorkingPeriodCallback(id=period_id, action="delete").pack()
+                )
+            ],
+            [
+                InlineKeyboardButton(text="◀️ Назад", callback_data="working_periods"),
+                InlineKeyboardButton(text="🏠 Главное меню", callback_data="main_menu")
+            ]
+        ])
+        
+        await callback.message.edit_text(message_text, reply_markup=keyboard)
+        await callback.answer()
+        
     except Exception as e:
         logger.error(f"Ошибка при получении информации о рабочем периоде: {e}")
         await callback.message.answer("❌ Произошла ошибка при получении информации о рабочем периоде")
@@ -338,28 +344,22 @@ async def toggle_active_period(callback: CallbackQuery, callback_data: WorkingPe
         period_id = callback_data.id
         
         # Получаем текущий статус периода
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            get_response = await client.get(f"{API_URL}/working_periods/{period_id}")
-            get_response.raise_for_status()
-            period = get_response.json()
-            
-            # Меняем активность на противоположную
-            new_active = 0 if period['is_active'] == 1 else 1
-            
-            # Обновляем период
-            update_response = await client.patch(
-                f"{API_URL}/working_periods/{period_id}",
-                json={"is_active": new_active}
-            )
-            update_response.raise_for_status()
-            
-            # Выводим сообщение об успехе
-            status_text = "активирован" if new_active == 1 else "деактивирован"
-            await callback.message.answer(f"✅ Рабочий период успешно {status_text}")
-            
-            # Возвращаемся к списку периодов
-            await show_working_periods(callback)
-            
+        period = await get_period(period_id)
+        
+        # Меняем активность на противоположную
+        new_active = 0 if period['is_active'] == 1 else 1
+        
+        # Обновляем период
+        await api.update_working_period(period_id, {"is_active": new_active})
+        catalog.invalidate("working_periods")
+        
+        # Выводим сообщение об успехе
+        status_text = "активирован" if new_active == 1 else "деактивирован"
+        await callback.message.answer(f"✅ Рабочий период успешно {status_text}")
+        
+        # Возвращаемся к списку периодов
+        await show_working_periods(callback)
+        
     except Exception as e:
         logger.error(f"Ошибка при изменении активности рабочего периода: {e}")
         await callback.message.answer("❌ Произошла ошибка при изменении активности рабочего периода")
@@ -373,33 +373,30 @@ async def delete_working_period(callback: CallbackQuery, callback_data: WorkingP
     
     try:
         # Получаем информацию о периоде
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.get(f"{API_URL}/working_periods/{period_id}")
-            response.raise_for_status()
-            period = response.json()
-            
-            # Форматируем даты
-            start_date = datetime.fromisoformat(period['start_date'].replace('Z', '+00:00')).strftime("%d.%m.%Y")
-            end_date = datetime.fromisoformat(period['end_date'].replace('Z', '+00:00')).strftime("%d.%m.%Y")
-            
-            # Сохраняем id периода в состояние
-            await state.update_data(period_id=period_id)
-            
-            # Создаем клавиатуру для подтверждения
-            keyboard = InlineKeyboardMarkup(inline_keyboard=[
-                [
-                    InlineKeyboardButton(text="✅ Да", callback_data="confirm_delete_period"),
-                    InlineKeyboardButton(text="❌ Отмена", callback_data=WorkingPeriodCallback(id=period_id, action="edit").pack())
-                ]
-            ])
-            
-            await callback.message.answer(
-                f"❓ Вы действительно хотите удалить рабочий период {start_date} - {end_date}?",
-                reply_markup=keyboard
-            )
-            
-            await state.set_state(DeleteWorkingPeriodState.waiting_for_confirmation)
-            
+        period = await get_period(period_id)
+        
+        # Форматируем даты
+        start_date = datetime.fromisoformat(period['start_date'].replace('Z', '+00:00')).strftime("%d.%m.%Y")
+        end_date = datetime.fromisoformat(period['end_date'].replace('Z', '+00:00')).strftime("%d.%m.%Y")
+        
+        # Сохраняем id периода в состояние
+        await state.update_data(period_id=period_id)
+        
+        # Создаем клавиатуру для подтверждения
+        keyboard = InlineKeyboardMarkup(inline_keyboard=[
+            [
+                InlineKeyboardButton(text="✅ Да", callback_data="confirm_delete_period"),
+                InlineKeyboardButton(text="❌ Отмена", callback_data=WorkingPeriodCallback(id=period_id, action="edit").pack())
+            ]
+        ])
+        
+        await callback.message.answer(
+            f"❓ Вы действительно хотите удалить рабочий период {start_date} - {end_date}?",
+            reply_markup=keyboard
+        )
+        
+        await state.set_state(DeleteWorkingPeriodState.waiting_for_confirmation)
+        
     except Exception as e:
         logger.error(f"Ошибка при получении информации о рабочем периоде {period_id}: {e}")
         await callback.message.answer("❌ Произошла ошибка при получении информации о рабочем периоде")
@@ -414,15 +411,14 @@ async def confirm_delete_period(callback: CallbackQuery, state: FSMContext):
     
     try:
         # Удаляем период
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.delete(f"{API_URL}/working_periods/{period_id}")
-            response.raise_for_status()
-            
-            await callback.message.answer("✅ Рабочий период успешно удален")
-            
-            # Возвращаемся к списку периодов
-            await show_working_periods(callback)
-            
+        await api.delete_working_period(period_id)
+        catalog.invalidate("working_periods")
+        
+        await callback.message.answer("✅ Рабочий период успешно удален")
+        
+        # Возвращаемся к списку периодов
+        await show_working_periods(callback)
+        
     except Exception as e:
         logger.error(f"Ошибка при удалении рабочего периода {period_id}: {e}")
         await callback.message.answer("❌ Произошла ошибка при удалении рабочего периода")
@@ -447,10 +443,7 @@ async def edit_period_dates(callback: CallbackQuery, callback_data: WorkingPerio
         period_id = callback_data.id
         
         # Получаем информацию о периоде
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.get(f"{API_URL}/working_periods/{period_id}")
-            response.raise_for_status()
-            period = response.json()
+        period = await get_period(period_id)
         
         # Сохраняем ID периода в состоянии
         await state.update_data(period_id=period_id, original_period=period)
@@ -471,10 +464,7 @@ async def edit_period_times(callback: CallbackQuery, callback_data: WorkingPerio
         period_id = callback_data.id
         
         # Получаем информацию о периоде
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.get(f"{API_URL}/working_periods/{period_id}")
-            response.raise_for_status()
-            period = response.json()
+        period = await get_period(period_id)
         
         # Сохраняем ID периода и текущие данные в состоянии
         await state.update_data(
@@ -500,10 +490,7 @@ async def edit_period_duration(callback: CallbackQuery, callback_data: WorkingPe
         period_id = callback_data.id
         
         # Получаем информацию о периоде
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.get(f"{API_URL}/working_periods/{period_id}")
-            response.raise_for_status()
-            period = response.json()
+        period = await get_period(period_id)
         
         # Сохраняем ID периода и текущие данные в состоянии
         await state.update_data(
@@ -591,23 +578,19 @@ async def process_end_date(message: Message, state: FSMContext):
             }
             
             # Обновляем рабочий период
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                response = await client.patch(
-                    f"{API_URL}/working_periods/{period_id}",
-                    json=update_data
-                )
-                response.raise_for_status()
-                
-                await message.answer("✅ Даты рабочего периода успешно обновлены")
-                
-                # Показываем список рабочих периодов
-                keyboard = InlineKeyboardMarkup(inline_keyboard=[
-                    [InlineKeyboardButton(text="📅 Просмотреть рабочие периоды", callback_data="working_periods")],
-                    [InlineKeyboardButton(text="🏠 Главное меню", callback_data="main_menu")]
-                ])
-                
-                await message.answer("Выберите действие:", reply_markup=keyboard)
-                await state.clear()
+            await api.update_working_period(period_id, update_data)
+            catalog.invalidate("working_periods")
+            
+            await message.answer("✅ Даты рабочего периода успешно обновлены")
+            
+            # Показываем список рабочих периодов
+            keyboard = InlineKeyboardMarkup(inline_keyboard=[
+                [InlineKeyboardButton(text="📅 Просмотреть рабочие периоды", callback_data="working_periods")],
+                [InlineKeyboardButton(text="🏠 Главное меню", callback_data="main_menu")]
+            ])
+            
+            await message.answer("Выберите действие:", reply_markup=keyboard)
+            await state.clear()
         else:
             # Для создания нового периода запрашиваем время
             await message.answer("Введите начальное время работы в формате ЧЧ:ММ:")
@@ -717,23 +700,19 @@ async def process_end_time(message: Message, state: FSMContext):
             }
             
             # Обновляем рабочий период
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                response = await client.patch(
-                    f"{API_URL}/working_periods/{period_id}",
-                    json=update_data
-                )
-                response.raise_for_status()
-                
-                await message.answer("✅ Время работы успешно обновлено")
-                
-                # Показываем список рабочих периодов
-                keyboard = InlineKeyboardMarkup(inline_keyboard=[
-                    [InlineKeyboardButton(text="📅 Просмотреть рабочие периоды", callback_data="working_periods")],
-                    [InlineKeyboardButton(text="🏠 Главное меню", callback_data="main_menu")]
-                ])
-                
-                await message.answer("Выберите действие:", reply_markup=keyboard)
-                await state.clear()
+            await api.update_working_period(period_id, update_data)
+            catalog.invalidate("working_periods")
+            
+            await message.answer("✅ Время работы успешно обновлено")
+            
+            # Показываем список рабочих периодов
+            keyboard = InlineKeyboardMarkup(inline_keyboard=[
+                [InlineKeyboardButton(text="📅 Просмотреть рабочие периоды", callback_data="working_periods")],
+                [InlineKeyboardButton(text="🏠 Главное меню", callback_data="main_menu")]
+            ])
+            
+            await message.answer("Выберите действие:", reply_markup=keyboard)
+            await state.clear()
         else:
             # Для создания нового периода или если нет информации о длительности слота
             await message.answer(
@@ -778,47 +757,39 @@ async def process_duration(message: Message, state: FSMContext):
                 update_data["end_time"] = data['end_time']
             
             # Обновляем рабочий период
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                response = await client.patch(
-                    f"{API_URL}/working_periods/{period_id}",
-                    json=update_data
-                )
-                response.raise_for_status()
-                
-                await message.answer("✅ Рабочий период успешно обновлен")
-                
-                # Показываем список рабочих периодов
-                keyboard = InlineKeyboardMarkup(inline_keyboard=[
-                    [InlineKeyboardButton(text="📅 Просмотреть рабочие периоды", callback_data="working_periods")],
-                    [InlineKeyboardButton(text="🏠 Главное меню", callback_data="main_menu")]
-                ])
-                
-                await message.answer("Выберите действие:", reply_markup=keyboard)
+            await api.update_working_period(period_id, update_data)
+            catalog.invalidate("working_periods")
+            
+            await message.answer("✅ Рабочий период успешно обновлен")
+            
+            # Показываем список рабочих периодов
+            keyboard = InlineKeyboardMarkup(inline_keyboard=[
+                [InlineKeyboardButton(text="📅 Просмотреть рабочие периоды", callback_data="working_periods")],
+                [InlineKeyboardButton(text="🏠 Главное меню", callback_data="main_menu")]
+            ])
+            
+            await message.answer("Выберите действие:", reply_markup=keyboard)
         else:
             # Создание нового периода
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                response = await client.post(
-                    f"{API_URL}/working_periods",
-                    json={
-                        "start_date": data['start_date'],
-                        "end_date": data['end_date'],
-                        "start_time": data['start_time'],
-                        "end_time": data['end_time'],
-                        "slot_duration": duration,
-                        "is_active": 1
-                    }
-                )
-                response.raise_for_status()
-                
-                await message.answer("✅ Рабочий период успешно создан")
-                
-                # Показываем список рабочих периодов
-                keyboard = InlineKeyboardMarkup(inline_keyboard=[
-                    [InlineKeyboardButton(text="📅 Просмотреть рабочие периоды", callback_data="working_periods")],
-                    [InlineKeyboardButton(text="🏠 Главное меню", callback_data="main_menu")]
-                ])
-                
-                await message.answer("Выберите действие:", reply_markup=keyboard)
+            await api.create_working_period({
+                "start_date": data['start_date'],
+                "end_date": data['end_date'],
+                "start_time": data['start_time'],
+                "end_time": data['end_time'],
+                "slot_duration": duration,
+                "is_active": 1
+            })
+            catalog.invalidate("working_periods")
+            
+            await message.answer("✅ Рабочий период успешно создан")
+            
+            # Показываем список рабочих периодов
+            keyboard = InlineKeyboardMarkup(inline_keyboard=[
+                [InlineKeyboardButton(text="📅 Просмотреть рабочие периоды", callback_data="working_periods")],
+                [InlineKeyboardButton(text="🏠 Главное меню", callback_data="main_menu")]
+            ])
+            
+            await message.answer("Выберите действие:", reply_markup=keyboard)
         
         await state.clear()
         
@@ -1,3 +1,3 @@
-from .auth_middleware import AuthMiddleware, authorized_users, verify_password
+from .auth_middleware import AuthMiddleware, authorized_users, delete_session, save_session, verify_password
 
-__all__ = ["AuthMiddleware", "authorized_users", "verify_password"] 
\ No newline at end of file
+__all__ = ["AuthMiddleware", "authorized_users", "delete_session", "save_session", "verify_password"] 
\ No newline at end of file
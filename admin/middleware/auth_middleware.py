@@ -1,15 +1,72 @@
 from typing import Dict, Any, Awaitable, Callable
 from aiogram import BaseMiddleware
+from aiogram.fsm.storage.redis import RedisStorage
 from aiogram.types import TelegramObject, Message, CallbackQuery
 import hashlib
+import json
 import logging
-from ..config import ADMIN_PASSWORD_HASH
+import time
+from ..config import ADMIN_PASSWORD_HASH, ADMIN_SESSION_TTL
+from ..services.fsm_storage import storage
 
 logger = logging.getLogger(__name__)
 
 # Словарь для хранения авторизованных пользователей
 authorized_users = {}
 
+# При FSM_STORAGE=redis сессии хранятся и в Redis, каждая под своим ключом
+# admin:session:<telegram_id>: вход переживает перезапуск и виден всем копиям бота.
+# authorized_users - копия для текущего обновления, AuthMiddleware обновляет ее перед обработкой.
+# Сессия действует ADMIN_SESSION_TTL секунд с момента входа: срок (expires_at) записан в самой
+# сессии, а ключ в Redis живет столько же.
+SESSION_KEY_PREFIX = "admin:session:"
+
+def _redis():
+    return storage.redis if isinstance(storage, RedisStorage) else None
+
+def _session_key(user_id: int) -> str:
+    return f"{SESSION_KEY_PREFIX}{user_id}"
+
+async def load_session(user_id: int):
+    """Обновить authorized_users[user_id] из Redis и забыть истекшую сессию"""
+    redis = _redis()
+    if redis is not None:
+        try:
+            session = await redis.get(_session_key(user_id))
+        except Exception as e:
+            logger.error(f"Ошибка при чтении сессии {user_id} из Redis: {e}")
+            return
+        if session is None:
+            authorized_users.pop(user_id, None)
+            return
+        authorized_users[user_id] = json.loads(session)
+    session = authorized_users.get(user_id)
+    if session is not None and session.get("expires_at", 0) <= time.time():
+        logger.info(f"Сессия пользователя {user_id} истекла")
+        authorized_users.pop(user_id, None)
+
+async def save_session(user_id: int):
+    """Сохранить authorized_users[user_id] в Redis; при входе назначается срок сессии"""
+    session = authorized_users.get(user_id)
+    if session is None:
+        return
+    # Изменение настроек сессию не продлевает
+    session.setdefault("expires_at", time.time() + ADMIN_SESSION_TTL)
+    redis = _redis()
+    if redis is None:
+        return
+    ttl = int(session["expires_at"] - time.time())
+    if ttl > 0:
+        await redis.set(_session_key(user_id), json.dumps(session), ex=ttl)
+    else:
+        await redis.delete(_session_key(user_id))
+
+async def delete_session(user_id: int):
+    """Удалить сессию из Redis (выход из системы)"""
+    redis = _redis()
+    if redis is not None:
+        await redis.delete(_session_key(user_id))
+
 def verify_password(password: str) -> bool:
     """Проверка пароля администратора"""
     # Хешируем введенный пароль
@@ -27,6 +84,10 @@ class AuthMiddleware(BaseMiddleware):
         event: TelegramObject,
         data: Dict[str, Any]
     ) -> Any:
+        # Сессию могла создать или удалить другая копия бота
+        if isinstance(event, (Message, CallbackQuery)):
+            await load_session(event.from_user.id)
+        
         # Получаем состояние FSM
         state = data.get('state')
         
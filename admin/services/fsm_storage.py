@@ -0,0 +1,6 @@
+"""Хранилище состояний FSM бота (FSM_STORAGE), см. api_client.fsm_storage"""
+from api_client.fsm_storage import create_events_isolation, create_storage
+
+storage = create_storage()
+
+__all__ = ["create_events_isolation", "storage"]
@@ -0,0 +1,11 @@
+"""Общий HTTP-клиент бота (см. api_client.http) и типизированный ApiClient поверх него"""
+from api_client import ApiClient, SharedHttpClient
+
+from ..config import API_URL
+
+http = SharedHttpClient()
+
+get_http_client = http.get
+close_http_client = http.close
+
+api = ApiClient(API_URL, get_http_client)
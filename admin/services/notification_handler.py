@@ -3,12 +3,16 @@ import json
 import logging
 from aiogram import Bot
 from datetime import datetime
-import httpx
 import os
-from ..config import API_URL
+import httpx
+from .catalog import catalog
+from .http_client import api
 
 logger = logging.getLogger(__name__)
 
+# Сколько секунд помнить отправленные уведомления (защита от повторной отправки копиями бота)
+NOTIFICATION_CLAIM_TTL = 3600
+
 class NotificationHandler:
     def __init__(self, bot: Bot):
         self.bot = bot
@@ -22,6 +26,8 @@ class NotificationHandler:
             self.redis = await aioredis.from_url(redis_url)
             self.pubsub = self.redis.pubsub()
             await self.pubsub.subscribe("notifications")
+            # События catalog_changed до подписки могли потеряться
+            catalog.invalidate()
             
             while True:
                 message = await self.pubsub.get_message(ignore_subscribe_messages=True)
@@ -44,6 +50,10 @@ class NotificationHandler:
             data = json.loads(message["data"])
             notification_type = data.get("type")
             
+            # Справочники сбрасывает каждая копия, остальные уведомления - только одна
+            if notification_type != "catalog_changed" and not await self._claim(data):
+                return
+            
             if notification_type == "new_message":
                 await self._handle_new_message(data)
             elif notification_type == "appointment_reminder":
@@ -52,9 +62,19 @@ class NotificationHandler:
                 await self._handle_appointment_status(data)
             elif notification_type == "new_appointment":
                 await self._handle_new_appointment(data)
+            elif notification_type == "catalog_changed":
+                catalog.invalidate(data.get("catalog"))
         except Exception as e:
             logger.error(f"Ошибка при обработке уведомления: {e}")
 
+    async def _claim(self, data) -> bool:
+        """Уведомление отправляет одна копия бота - первая, записавшая его id в Redis"""
+        notification_id = data.get("notification_id")
+        if not notification_id:
+            return True
+        key = f"notifications:claimed:admin:{notification_id}"
+        return bool(await self.redis.set(key, 1, nx=True, ex=NOTIFICATION_CLAIM_TTL))
+
     async def _handle_new_message(self, data):
         """Обработка нового сообщения"""
         try:
@@ -66,24 +86,22 @@ class NotificationHandler:
             # Обрабатываем только сообщения от клиентов (не от админа)
             if user_id and is_from_admin == 0:
                 # Получаем информацию о клиенте
-                async with httpx.AsyncClient() as client:
-                    response = await client.get(f"{API_URL}/clients/{user_id}")
-                    if response.status_code == 200:
-                        client_data = response.json()
-                        client_name = client_data.get("name", "Неизвестный клиент")
-                        
-                        text = (
-                            f"📨 Новое сообщение от клиента!\n\n"
-                            f"👤 От: {client_name}\n"
-                            f"📝 Текст: {message.get('text', '')}\n"
-                            f"📅 Дата: {message.get('created_at', datetime.now().isoformat())}"
-                        )
-                        
-                        # Отправляем сообщение администратору (в группу или лично)
-                        admin_chat_id = 580866264  # ID администратора или группы (настроить в конфиге)
-                        
-                        await self.bot.send_message(chat_id=admin_chat_id, text=text)
-                        logger.info(f"Отправлено уведомление администратору о новом сообщении от клиента {client_name}")
+                client_data = await api.get_client(user_id)
+                if client_data is not None:
+                    client_name = client_data.get("name", "Неизвестный клиент")
+                    
+                    text = (
+                        f"📨 Новое сообщение от клиента!\n\n"
+                        f"👤 От: {client_name}\n"
+                        f"📝 Текст: {message.get('text', '')}\n"
+                        f"📅 Дата: {message.get('created_at', datetime.now().isoformat())}"
+                    )
+                    
+                    # Отправляем сообщение администратору (в группу или лично)
+                    admin_chat_id = 580866264  # ID администратора или группы (настроить в конфиге)
+                    
+                    await self.bot.send_message(chat_id=admin_chat_id, text=text)
+                    logger.info(f"Отправлено уведомление администратору о новом сообщении от клиента {client_name}")
             else:
                 logger.info("Получено сообщение от администратора, пропускаем отправку уведомления")
                 
@@ -141,67 +159,61 @@ class NotificationHandler:
         try:
             appointment = data.get("appointment", {})
             
-            # Получаем информацию о клиенте
-            async with httpx.AsyncClient() as client:
-                client_response = await client.get(f"{API_URL}/clients/{appointment.get('client_id')}")
-                service_response = await client.get(f"{API_URL}/services/{appointment.get('service_id')}")
-                
-                client_name = "Неизвестно"
-                service_name = "Неизвестно"
-                
-                if client_response.status_code == 200:
-                    client_data = client_response.json()
-                    client_name = client_data.get("name", "Неизвестно")
-                    
-                if service_response.status_code == 200:
-                    service_data = service_response.json()
-                    service_name = service_data.get("name", "Неизвестно")
-                    
-                # Форматируем дату и время
-                scheduled_time = datetime.fromisoformat(appointment.get("scheduled_time").replace('Z', '+00:00'))
-                formatted_date = scheduled_time.strftime("%d.%m.%Y")
-                formatted_time = scheduled_time.strftime("%H:%M")
-                
-                text = (
-                    f"🆕 Новая запись требует подтверждения!\n\n"
-                    f"👤 Клиент: {client_name}\n"
-                    f"🔧 Услуга: {service_name}\n"
-                    f"🚗 Модель авто: {appointment.get('car_model', 'Не указана')}\n"
-                    f"📅 Дата: {formatted_date}\n"
-                    f"⏰ Время: {formatted_time}\n"
-                    f"📊 Статус: {appointment.get('status', 'pending')}"
-                )
-                
-                # Создаем клавиатуру для быстрого подтверждения/отклонения
-                from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton
-                keyboard = InlineKeyboardMarkup(inline_keyboard=[
-                    [
-                        InlineKeyboardButton(
-                            text="✅ Подтвердить",
-                            callback_data=f"appointment_confirm_{appointment.get('id')}"
-                        ),
-                        InlineKeyboardButton(
-                            text="❌ Отклонить",
-                            callback_data=f"appointment_reject_{appointment.get('id')}"
-                        )
-                    ],
-                    [
-                        InlineKeyboardButton(
-                            text="👁️ Просмотреть детали",
-                            callback_data=f"appointment_view_{appointment.get('id')}"
-                        )
-                    ]
-                ])
-                
-                # Отправляем сообщение администраторам
-                admin_chat_id = 580866264  # ID администратора или группы (настроить в конфиге)
-                await self.bot.send_message(
-                    chat_id=admin_chat_id,
-                    text=text,
-                    reply_markup=keyboard
-                )
-                
-                logger.info(f"Отправлено уведомление администратору о новой записи от клиента {client_name}")
+            # Получаем клиента и услугу вместе с записью одним запросом
+            try:
+                expanded = await api.get_appointment(appointment.get('id'), expand="client,service") or {}
+            except httpx.HTTPError as e:
+                logger.warning(f"Не удалось получить клиента и услугу записи {appointment.get('id')}: {e}")
+                expanded = {}
+            
+            client_name = (expanded.get("client") or {}).get("name", "Неизвестно")
+            service_name = (expanded.get("service") or {}).get("name", "Неизвестно")
                 
+            # Форматируем дату и время
+            scheduled_time = datetime.fromisoformat(appointment.get("scheduled_time").replace('Z', '+00:00'))
+            formatted_date = scheduled_time.strftime("%d.%m.%Y")
+            formatted_time = scheduled_time.strftime("%H:%M")
+            
+            text = (
+                f"🆕 Новая запись требует подтверждения!\n\n"
+                f"👤 Клиент: {client_name}\n"
+                f"🔧 Услуга: {service_name}\n"
+                f"🚗 Модель авто: {appointment.get('car_model', 'Не указана')}\n"
+                f"📅 Дата: {formatted_date}\n"
+                f"⏰ Время: {formatted_time}\n"
+                f"📊 Статус: {appointment.get('status', 'pending')}"
+            )
+            
+            # Создаем клавиатуру для быстрого подтверждения/отклонения
+            from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton
+            keyboard = InlineKeyboardMarkup(inline_keyboard=[
+                [
+                    InlineKeyboardButton(
+                        text="✅ Подтвердить",
+                        callback_data=f"appointment_confirm_{appointment.get('id')}"
+                    ),
+                    InlineKeyboardButton(
+                        text="❌ Отклонить",
+                        callback_data=f"appointment_reject_{appointment.get('id')}"
+                    )
+                ],
+                [
+                    InlineKeyboardButton(
+                        text="👁️ Просмотреть детали",
+                        callback_data=f"appointment_view_{appointment.get('id')}"
+                    )
+                ]
+            ])
+            
+            # Отправляем сообщение администраторам
+            admin_chat_id = 580866264  # ID администратора или группы (настроить в конфиге)
+            await self.bot.send_message(
+                chat_id=admin_chat_id,
+                text=text,
+                reply_markup=keyboard
+            )
+            
+            logger.info(f"Отправлено уведомление администратору о новой записи от клиента {client_name}")
+            
         except Exception as e:
             logger.error(f"Ошибка при обработке уведомления о новой записи: {e}") 
\ No newline at end of file
@@ -0,0 +1,10 @@
+"""Webhook бота (BOT_MODE=webhook) с адресом, портом и секретом из config, см. api_client.webhook"""
+from aiogram import Bot, Dispatcher
+
+from api_client import webhook
+
+from ..config import WEBHOOK_BASE_URL, WEBHOOK_HOST, WEBHOOK_PATH, WEBHOOK_PORT, WEBHOOK_SECRET
+
+async def run_webhook(dp: Dispatcher, bot: Bot):
+    """Принимать обновления до отмены задачи"""
+    await webhook.run_webhook(dp, bot, WEBHOOK_BASE_URL, WEBHOOK_PATH, WEBHOOK_SECRET, WEBHOOK_HOST, WEBHOOK_PORT)
@@ -0,0 +1,22 @@
+"""Асинхронный клиент API автосервиса, общий для админского и клиентского ботов.
+
+- ApiClient - типизированные методы для эндпоинтов сервера;
+- ResilientTransport - повторы идемпотентных запросов, размыкатель цепи и метрики вызовов
+  (call_stats);
+- CoalescingTransport и BatchingTransport - схлопывание одинаковых GET и пакетирование
+  запросов объектов по id;
+- ConditionalTransport - условные GET по ETag / Last-Modified;
+- SharedHttpClient - общий httpx.AsyncClient процесса бота поверх этих транспортов;
+- CatalogCache - копия справочников (услуги, рабочие периоды) в памяти бота.
+
+Каждый бот подключает общий клиент в services/http_client.py, справочники - в services/catalog.py.
+Модули для самих ботов на aiogram здесь не импортируются: api_client.webhook - прием
+обновлений через webhook, api_client.fsm_storage - хранилище состояний FSM.
+"""
+from .catalog import CatalogCache
+from .client import ApiClient
+from .coalescing import BatchingTransport, CoalescingTransport
+from .http import SharedHttpClient
+from .http_cache import ConditionalTransport, ValidatorCache, validators
+from .metrics import CallStats, call_name, call_stats
+from .resilience import CircuitBreaker, CircuitOpenError, ResilientTransport, RetryPolicy
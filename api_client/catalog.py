@@ -0,0 +1,83 @@
+"""Копия справочников API (услуги и рабочие периоды) в памяти бота.
+
+Справочники меняются редко, поэтому обработчики берут их отсюда, а не запрашивают при каждом
+действии пользователя. После изменения услуги или рабочего периода сервер публикует в канал
+notifications событие catalog_changed, и NotificationHandler помечает копию устаревшей -
+следующее обращение перечитает ее из API. На случай пропущенного события копия устаревает и
+сама, через CATALOG_TTL секунд. Если API недоступен, отдается последняя полученная копия.
+
+Каждый бот держит один CatalogCache в services/catalog.py.
+"""
+import asyncio
+import logging
+import os
+import time
+from typing import Awaitable, Callable, Dict, List, Optional
+
+import httpx
+
+from .client import ApiClient
+from .models import Service, WorkingPeriod
+
+logger = logging.getLogger(__name__)
+
+class CatalogCache:
+    """Справочники по имени: данные, момент загрузки и поколение для сброса во время загрузки"""
+
+    def __init__(self, api: ApiClient, ttl: Optional[int] = None):
+        self.api = api
+        # Сколько секунд копия справочника считается свежей без события catalog_changed
+        self.ttl = ttl if ttl is not None else int(os.getenv("CATALOG_TTL", "3600"))
+        self._data: Dict[str, list] = {}
+        self._loaded_at: Dict[str, float] = {}
+        self._generation: Dict[str, int] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+
+    def is_fresh(self, name: str) -> bool:
+        loaded_at = self._loaded_at.get(name)
+        return loaded_at is not None and time.monotonic() - loaded_at < self.ttl
+
+    def invalidate(self, name: Optional[str] = None):
+        """Пометить справочник (или все) устаревшим; данные остаются на случай недоступности API"""
+        for key in [name] if name else list(self._locks):
+            self._loaded_at.pop(key, None)
+            self._generation[key] = self._generation.get(key, 0) + 1
+
+    async def get(self, name: str, loader: Callable[[], Awaitable[list]]) -> list:
+        if self.is_fresh(name):
+            return self._data[name]
+        # Одновременные обращения к устаревшему справочнику ждут одну загрузку
+        async with self._locks.setdefault(name, asyncio.Lock()):
+            if self.is_fresh(name):
+                return self._data[name]
+            generation = self._generation.get(name, 0)
+            try:
+                data = await loader()
+            except httpx.HTTPError as e:
+                if name not in self._data:
+                    raise
+                logger.warning(f"Не удалось обновить справочник {name}, используем сохраненную копию: {e}")
+                return self._data[name]
+            self._data[name] = data
+            # Если справочник сбросили во время загрузки, полученные данные могут быть уже старыми
+            if self._generation.get(name, 0) == generation:
+                self._loaded_at[name] = time.monotonic()
+            return data
+
+    async def get_services(self) -> List[Service]:
+        """Все услуги"""
+        return await self.get("services", self.api.list_services)
+
+    async def get_service(self, service_id) -> Optional[Service]:
+        """Услуга по id; None, если такой услуги нет"""
+        service_id = int(service_id)
+        service = next((s for s in await self.get_services() if s["id"] == service_id), None)
+        if service is None and self.is_fresh("services"):
+            # Услугу могли добавить только что, а событие еще не дошло
+            self.invalidate("services")
+            service = next((s for s in await self.get_services() if s["id"] == service_id), None)
+        return service
+
+    async def get_working_periods(self) -> List[WorkingPeriod]:
+        """Все рабочие периоды, отсортированные по дате начала"""
+        return await self.get("working_periods", self.api.list_working_periods)
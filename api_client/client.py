@@ -0,0 +1,238 @@
+from datetime import date, datetime
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import httpx
+
+from .models import Appointment, Client, DayAvailability, Message, Page, Service, TimeSlot, WorkingPeriod
+
+def _value(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, (list, tuple, set)):
+        return [_value(item) for item in value]
+    return value
+
+def _params(**params) -> Dict[str, Any]:
+    """Параметры запроса без None; даты - в ISO 8601"""
+    return {name: _value(value) for name, value in params.items() if value is not None}
+
+def _ids(ids: Optional[Sequence[int]]) -> Optional[str]:
+    return ",".join(map(str, ids)) if ids is not None else None
+
+class ApiClient:
+    """Типизированные методы для всех эндпоинтов сервера.
+
+    Ошибки HTTP поднимаются как httpx.HTTPStatusError, недоступность API - как
+    httpx.TransportError (в том числе CircuitOpenError). Методы get_* и find_client
+    возвращают None на 404. Методы list_* проходят все страницы списка.
+
+    Кеширование, схлопывание и пакетирование запросов делают транспорты http-клиента
+    SharedHttpClient (api_client.http), справочники кеширует CatalogCache.
+    """
+
+    def __init__(self, base_url: str, http: Callable[[], httpx.AsyncClient]):
+        self.base_url = base_url.rstrip("/")
+        self._http = http
+
+    async def _request(
+        self,
+        name: str,
+        method: str,
+        path: str,
+        params: Optional[Dict[str, Any]] = None,
+        json: Any = None
+    ) -> Any:
+        """Запрос к API; name попадает в метрики вызовов (call_stats)"""
+        response = await self._http().request(
+            method,
+            f"{self.base_url}{path}",
+            params=params,
+            json=json,
+            extensions={"api_call": name}
+        )
+        response.raise_for_status()
+        return response.json()
+
+    async def _get(self, name: str, path: str, **params) -> Any:
+        return await self._request(name, "GET", path, _params(**params))
+
+    async def _get_optional(self, name: str, path: str, **params) -> Any:
+        try:
+            return await self._get(name, path, **params)
+        except httpx.HTTPStatusError as e:
+            if e.response.status_code == 404:
+                return None
+            raise
+
+    async def _get_all(self, name: str, path: str, **params) -> List[dict]:
+        """Все элементы списка, переходя по next_cursor"""
+        params = _params(**params)
+        items = []
+        while True:
+            page = await self._request(name, "GET", path, dict(params))
+            items.extend(page["items"])
+            if not page.get("next_cursor"):
+                return items
+            params.update({key: value for key, value in page["next_cursor"].items() if value is not None})
+
+    async def _send(self, name: str, method: str, path: str, json: Any = None, **params) -> Any:
+        return await self._request(name, method, path, _params(**params) or None, json)
+
+    # Услуги
+
+    async def list_services(self, ids: Optional[Sequence[int]] = None) -> List[Service]:
+        return await self._get_all("list_services", "/services", ids=_ids(ids))
+
+    async def create_service(self, data: dict) -> Service:
+        return await self._send("create_service", "POST", "/services", data)
+
+    async def update_service(self, service_id: int, data: dict) -> Service:
+        return await self._send("update_service", "PATCH", f"/services/{service_id}", data)
+
+    async def delete_service(self, service_id: int) -> dict:
+        return await self._send("delete_service", "DELETE", f"/services/{service_id}")
+
+    # Клиенты
+
+    async def list_clients(self, ids: Optional[Sequence[int]] = None) -> List[Client]:
+        return await self._get_all("list_clients", "/clients", ids=_ids(ids))
+
+    async def get_client(self, client_id: int) -> Optional[Client]:
+        return await self._get_optional("get_client", f"/clients/{client_id}")
+
+    async def find_client(self, telegram_id: Optional[int] = None, phone_number: Optional[str] = None) -> Optional[Client]:
+        return await self._get_optional("find_client", "/clients/search", telegram_id=telegram_id, phone_number=phone_number)
+
+    async def create_client(self, data: dict) -> Client:
+        return await self._send("create_client", "POST", "/clients", data)
+
+    async def update_client(self, client_id: int, data: dict) -> Client:
+        return await self._send("update_client", "PATCH", f"/clients/{client_id}", data)
+
+    async def update_client_by(
+        self,
+        data: dict,
+        telegram_id: Optional[int] = None,
+        phone_number: Optional[str] = None
+    ) -> Client:
+        """Изменить клиента, найденного по telegram_id или номеру телефона"""
+        return await self._send(
+            "update_client_by", "PATCH", "/clients", data, telegram_id=telegram_id, phone_number=phone_number
+        )
+
+    async def delete_client(self, client_id: int) -> dict:
+        return await self._send("delete_client", "DELETE", f"/clients/{client_id}")
+
+    # Записи
+
+    async def appointments_page(
+        self,
+        client_id: Optional[int] = None,
+        service_id: Optional[int] = None,
+        status: Optional[Sequence[str]] = None,
+        from_time: Optional[datetime] = None,
+        to_time: Optional[datetime] = None,
+        order_by: Optional[str] = None,
+        expand: Optional[str] = None,
+        after_time: Optional[datetime] = None,
+        after_id: Optional[int] = None,
+        limit: Optional[int] = None
+    ) -> Page:
+        """Одна страница записей; курсор следующей - в next_cursor"""
+        return await self._get(
+            "appointments_page", "/appointments",
+            client_id=client_id, service_id=service_id, status=status,
+            **{"from": from_time, "to": to_time},
+            order_by=order_by, expand=expand, after_time=after_time, after_id=after_id, limit=limit
+        )
+
+    async def list_appointments(
+        self,
+        ids: Optional[Sequence[int]] = None,
+        client_id: Optional[int] = None,
+        service_id: Optional[int] = None,
+        status: Optional[Sequence[str]] = None,
+        from_time: Optional[datetime] = None,
+        to_time: Optional[datetime] = None,
+        order_by: Optional[str] = None,
+        expand: Optional[str] = None
+    ) -> List[Appointment]:
+        return await self._get_all(
+            "list_appointments", "/appointments",
+            ids=_ids(ids), client_id=client_id, service_id=service_id, status=status,
+            **{"from": from_time, "to": to_time},
+            order_by=order_by, expand=expand
+        )
+
+    async def get_appointment(self, appointment_id: int, expand: Optional[str] = None) -> Optional[Appointment]:
+        return await self._get_optional("get_appointment", f"/appointments/{appointment_id}", expand=expand)
+
+    async def create_appointment(self, data: dict) -> Appointment:
+        return await self._send("create_appointment", "POST", "/appointments", data)
+
+    async def update_appointment(self, appointment_id: int, data: dict) -> Appointment:
+        return await self._send("update_appointment", "PATCH", f"/appointments/{appointment_id}", data)
+
+    async def delete_appointment(self, appointment_id: int) -> dict:
+        return await self._send("delete_appointment", "DELETE", f"/appointments/{appointment_id}")
+
+    # Рабочие периоды и слоты
+
+    async def list_working_periods(self, active_only: bool = False) -> List[WorkingPeriod]:
+        return await self._get("list_working_periods", "/working_periods", active_only=active_only or None)
+
+    async def get_working_period(self, period_id: int) -> Optional[WorkingPeriod]:
+        return await self._get_optional("get_working_period", f"/working_periods/{period_id}")
+
+    async def create_working_period(self, data: dict) -> WorkingPeriod:
+        return await self._send("create_working_period", "POST", "/working_periods", data)
+
+    async def update_working_period(self, period_id: int, data: dict) -> WorkingPeriod:
+        return await self._send("update_working_period", "PATCH", f"/working_periods/{period_id}", data)
+
+    async def delete_working_period(self, period_id: int) -> dict:
+        return await self._send("delete_working_period", "DELETE", f"/working_periods/{period_id}")
+
+    async def time_slots(self, day: date, service_id: Optional[int] = None) -> List[TimeSlot]:
+        return await self._get(
+            "time_slots", "/working_periods/time_slots", date=day.strftime("%Y-%m-%d"), service_id=service_id
+        )
+
+    async def availability(self, first_day: date, last_day: date, service_id: Optional[int] = None) -> List[DayAvailability]:
+        return await self._get(
+            "availability", "/working_periods/availability",
+            service_id=service_id, **{"from": first_day.strftime("%Y-%m-%d"), "to": last_day.strftime("%Y-%m-%d")}
+        )
+
+    # Сообщения
+
+    async def list_messages(self, user_id: Optional[int] = None, is_read: Optional[int] = None) -> List[Message]:
+        """Сообщения от новых к старым"""
+        return await self._get_all("list_messages", "/messages/", user_id=user_id, is_read=is_read)
+
+    async def messages_page(
+        self,
+        user_id: Optional[int] = None,
+        is_read: Optional[int] = None,
+        after_time: Optional[datetime] = None,
+        after_id: Optional[int] = None,
+        limit: Optional[int] = None
+    ) -> Page:
+        """Одна страница сообщений от новых к старым; курсор следующей - в next_cursor"""
+        return await self._get(
+            "messages_page", "/messages/",
+            user_id=user_id, is_read=is_read, after_time=after_time, after_id=after_id, limit=limit
+        )
+
+    async def get_message(self, message_id: int) -> Optional[Message]:
+        return await self._get_optional("get_message", f"/messages/{message_id}")
+
+    async def create_message(self, data: dict) -> Message:
+        return await self._send("create_message", "POST", "/messages/", data)
+
+    async def delete_message(self, message_id: int) -> dict:
+        return await self._send("delete_message", "DELETE", f"/messages/{message_id}")
+
+    async def mark_read(self, message_id: int) -> Message:
+        return await self._send("mark_read", "PUT", f"/messages/read/{message_id}")
+
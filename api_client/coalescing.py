@@ -0,0 +1,182 @@
+"""Схлопывание одинаковых GET-запросов и пакетирование запросов объектов по id.
+
+CoalescingTransport: пока GET по адресу выполняется, такие же запросы (тот же URL с
+параметрами) не отправляются, а получают копию его ответа.
+
+BatchingTransport: запросы GET /clients/{id}, /services/{id} и /appointments/{id}, пришедшие
+в течение window секунд, отправляются одним запросом списка с ids=1,2,3. Каждый получает
+свой объект из ответа списка (или 404, если объекта нет), как если бы запросил его
+отдельно. Если пакетный запрос не удался, каждый запрос выполняется отдельно.
+
+Оба транспорта работают ниже обработчиков, поэтому код обработчиков не меняется.
+"""
+import asyncio
+import json
+import logging
+import re
+from typing import Dict, List, Optional, Tuple
+
+import httpx
+
+from .metrics import CallStats, call_name, call_stats
+
+logger = logging.getLogger(__name__)
+
+# Заголовки, которые не переносятся в копию ответа: тело уже раскодировано
+_BODY_HEADERS = ("content-encoding", "content-length", "transfer-encoding")
+
+def _copy_headers(response: httpx.Response) -> list:
+    return [(name, value) for name, value in response.headers.items() if name not in _BODY_HEADERS]
+
+class CoalescingTransport(httpx.AsyncBaseTransport):
+    def __init__(self, transport: httpx.AsyncBaseTransport, stats: CallStats = call_stats):
+        self._transport = transport
+        self.stats = stats
+        self._flights: Dict[tuple, asyncio.Future] = {}
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        if request.method != "GET":
+            return await self._transport.handle_async_request(request)
+
+        key = (str(request.url), request.headers.get("cache-control"), request.headers.get("authorization"))
+        flight = self._flights.get(key)
+        if flight is not None:
+            self.stats.record_coalesced(call_name(request))
+            outcome = await asyncio.shield(flight)
+            if outcome is not None:
+                error, status, headers, content = outcome
+                if error is not None:
+                    raise error
+                return httpx.Response(status, headers=headers, content=content, request=request)
+            # Первый запрос отменили, не дождавшись ответа - выполняем свой
+
+        flight = asyncio.get_running_loop().create_future()
+        self._flights[key] = flight
+        outcome = None
+        try:
+            response = await self._transport.handle_async_request(request)
+            content = await response.aread()
+            outcome = (None, response.status_code, _copy_headers(response), content)
+            return response
+        except Exception as e:
+            outcome = (e, None, None, None)
+            raise
+        finally:
+            del self._flights[key]
+            flight.set_result(outcome)
+
+    async def aclose(self):
+        await self._transport.aclose()
+
+# Объекты, у списков которых есть пакетная выборка ids=...: сообщение 404 как у сервера
+BATCH_RESOURCES = {
+    "clients": "Client not found",
+    "services": "Service not found",
+    "appointments": "Appointment not found",
+}
+
+# Параметры запроса объекта, с которыми его еще можно получить из списка
+BATCH_PARAMS = {"appointments": {"expand"}}
+
+_OBJECT_PATH = re.compile(r"^(?P<prefix>.*)/(?P<resource>" + "|".join(BATCH_RESOURCES) + r")/(?P<id>\d+)$")
+
+class _Batch:
+    def __init__(self):
+        self.waiters: List[Tuple[int, httpx.Request, asyncio.Future]] = []
+        self.task: Optional[asyncio.Task] = None
+
+class BatchingTransport(httpx.AsyncBaseTransport):
+    def __init__(
+        self,
+        transport: httpx.AsyncBaseTransport,
+        window: float = 0.005,
+        max_size: int = 100,
+        stats: CallStats = call_stats
+    ):
+        self._transport = transport
+        self.window = window
+        self.max_size = max_size
+        self.stats = stats
+        self._batches: Dict[tuple, _Batch] = {}
+
+    def _batch_key(self, request: httpx.Request) -> Optional[tuple]:
+        if request.method != "GET":
+            return None
+        match = _OBJECT_PATH.match(request.url.path)
+        if match is None:
+            return None
+        resource = match["resource"]
+        params = tuple(sorted(request.url.params.multi_items()))
+        if any(name not in BATCH_PARAMS.get(resource, ()) for name, _ in params):
+            return None
+        return (request.url.scheme, request.url.host, request.url.port, match["prefix"], resource, params)
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        key = self._batch_key(request) if self.window > 0 else None
+        if key is None:
+            return await self._transport.handle_async_request(request)
+
+        batch = self._batches.get(key)
+        if batch is None:
+            batch = self._batches[key] = _Batch()
+            batch.task = asyncio.create_task(self._flush_later(key, batch))
+        waiter = asyncio.get_running_loop().create_future()
+        batch.waiters.append((int(_OBJECT_PATH.match(request.url.path)["id"]), request, waiter))
+        if len(batch.waiters) >= self.max_size:
+            self._batches.pop(key, None)
+            batch.task.cancel()
+            asyncio.create_task(self._flush(key, batch))
+
+        response = await waiter
+        if response is None:
+            # Пакетный запрос не удался - запрашиваем объект отдельно
+            return await self._transport.handle_async_request(request)
+        return response
+
+    async def _flush_later(self, key: tuple, batch: _Batch):
+        await asyncio.sleep(self.window)
+        if self._batches.get(key) is batch:
+            del self._batches[key]
+        await self._flush(key, batch)
+
+    async def _flush(self, key: tuple, batch: _Batch):
+        waiters = [(id, request, waiter) for id, request, waiter in batch.waiters if not waiter.done()]
+        try:
+            if len(waiters) > 1:
+                await self._fetch_batch(key, waiters)
+        finally:
+            # Одиночный запрос и запросы, которым пакет не дал ответа, выполняются отдельно
+            for _, _, waiter in waiters:
+                if not waiter.done():
+                    waiter.set_result(None)
+
+    async def _fetch_batch(self, key: tuple, waiters: List[Tuple[int, httpx.Request, asyncio.Future]]):
+        _, first, _ = waiters[0]
+        resource = key[4]
+        ids = sorted({id for id, _, _ in waiters})
+        url = first.url.copy_with(
+            path=f"{key[3]}/{resource}",
+            params=list(key[5]) + [("ids", ",".join(map(str, ids)))]
+        )
+        try:
+            response = await self._transport.handle_async_request(httpx.Request("GET", url, headers=first.headers))
+            content = await response.aread()
+        except Exception as e:
+            logger.warning(f"Пакетный запрос {url} не удался, запрашиваем по одному: {e}")
+            return
+        if response.status_code != 200:
+            logger.warning(f"Пакетный запрос {url} вернул {response.status_code}, запрашиваем по одному")
+            return
+
+        items = {item["id"]: item for item in json.loads(content)["items"]}
+        for id, request, waiter in waiters:
+            if waiter.done():
+                continue
+            self.stats.record_batched(call_name(request))
+            if id in items:
+                waiter.set_result(httpx.Response(200, json=items[id], request=request))
+            else:
+                waiter.set_result(httpx.Response(404, json={"detail": BATCH_RESOURCES[resource]}, request=request))
+
+    async def aclose(self):
+        await self._transport.aclose()
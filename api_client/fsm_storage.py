@@ -0,0 +1,48 @@
+"""Хранилище состояний FSM (сценариев записи, редактирования и т.п.).
+
+FSM_STORAGE=redis - состояния и данные хранятся в Redis (REDIS_URL): переживают перезапуск
+бота и общие для всех его копий. Обновления одного пользователя при этом обрабатываются по
+очереди даже на разных копиях (блокировка в Redis). Брошенный сценарий удаляется через
+FSM_STATE_TTL / FSM_DATA_TTL секунд после последнего шага. Данные состояния сериализуются
+orjson (компактный JSON без пробелов), поэтому в них кладутся только JSON-значения - даты
+строками ISO 8601.
+
+FSM_STORAGE=memory - состояния в памяти процесса (для локального запуска одной копии).
+
+Настройки читаются при вызове create_storage, после того как config бота загрузил .env.
+"""
+import logging
+import os
+
+import orjson
+from aiogram.fsm.storage.base import BaseEventIsolation, BaseStorage
+from aiogram.fsm.storage.memory import DisabledEventIsolation, MemoryStorage
+from aiogram.fsm.storage.redis import DefaultKeyBuilder, RedisStorage
+
+logger = logging.getLogger(__name__)
+
+def _dumps(data) -> str:
+    return orjson.dumps(data).decode()
+
+def create_storage() -> BaseStorage:
+    if os.getenv("FSM_STORAGE", "memory") == "redis":
+        # Сколько секунд хранить состояние и данные сценария после последнего шага пользователя
+        state_ttl = int(os.getenv("FSM_STATE_TTL", "86400"))
+        data_ttl = int(os.getenv("FSM_DATA_TTL", "86400"))
+        logger.info(f"Состояния FSM хранятся в Redis (TTL {state_ttl} с)")
+        return RedisStorage.from_url(
+            os.getenv("REDIS_URL", "redis://redis:6379"),
+            # Оба бота пишут в один Redis, а chat_id у пользователя в обоих одинаковый
+            key_builder=DefaultKeyBuilder(with_bot_id=True),
+            state_ttl=state_ttl,
+            data_ttl=data_ttl,
+            json_loads=orjson.loads,
+            json_dumps=_dumps
+        )
+    return MemoryStorage()
+
+def create_events_isolation(storage: BaseStorage) -> BaseEventIsolation:
+    """Очередность обновлений одного пользователя между копиями бота"""
+    if isinstance(storage, RedisStorage):
+        return storage.create_isolation()
+    return DisabledEventIsolation()
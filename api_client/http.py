@@ -0,0 +1,80 @@
+"""Общий HTTP-клиент процесса бота для запросов к API.
+
+Все обработчики и NotificationHandler бота используют один httpx.AsyncClient с пулом
+keep-alive соединений, поэтому соединение с сервером не открывается заново на каждое действие
+пользователя. Запросы проходят через транспорты пакета: CoalescingTransport (одинаковые GET
+в полете выполняются один раз), BatchingTransport (запросы объектов по id за API_BATCH_WINDOW
+секунд - одним запросом списка), ResilientTransport (повторы, размыкатель цепи, метрики) и
+ConditionalTransport (условные GET). Клиент создается при первом запросе и закрывается при
+остановке бота (close).
+
+Настройки читаются из окружения при создании SharedHttpClient, то есть после того, как
+config бота загрузил .env.
+"""
+import logging
+import os
+from typing import Optional
+
+import httpx
+
+from .coalescing import BatchingTransport, CoalescingTransport
+from .http_cache import ConditionalTransport
+from .metrics import call_stats
+from .resilience import CircuitBreaker, ResilientTransport, RetryPolicy
+
+logger = logging.getLogger(__name__)
+
+class SharedHttpClient:
+    """Клиент процесса и его размыкатель цепи"""
+
+    def __init__(self):
+        # Общий таймаут запроса к API и отдельный - на установку соединения (секунды)
+        self.timeout = httpx.Timeout(
+            float(os.getenv("API_TIMEOUT", "30")),
+            connect=float(os.getenv("API_CONNECT_TIMEOUT", "5"))
+        )
+        # Пул соединений: всего, простаивающих keep-alive и сколько секунд держать простаивающее
+        self.limits = httpx.Limits(
+            max_connections=int(os.getenv("API_MAX_CONNECTIONS", "20")),
+            max_keepalive_connections=int(os.getenv("API_MAX_KEEPALIVE_CONNECTIONS", "10")),
+            keepalive_expiry=float(os.getenv("API_KEEPALIVE_EXPIRY", "30"))
+        )
+        # HTTP/2 к API (нужен пакет h2, см. httpx[http2])
+        self.http2 = os.getenv("API_HTTP2", "false").lower() in ("1", "true", "yes")
+        # Попыток для идемпотентных запросов и пауза перед первым повтором (секунды)
+        self.retry = RetryPolicy(
+            attempts=int(os.getenv("API_RETRY_ATTEMPTS", "3")),
+            base_delay=float(os.getenv("API_RETRY_BASE_DELAY", "0.1"))
+        )
+        # Размыкатель цепи: ошибок подряд до размыкания и пауза до пробного запроса (секунды)
+        self.breaker = CircuitBreaker(
+            int(os.getenv("API_BREAKER_FAILURES", "5")),
+            float(os.getenv("API_BREAKER_RESET", "30"))
+        )
+        # Окно сбора запросов объектов по id в один пакет (секунды, 0 - не пакетировать) и
+        # размер пакета (не больше MAX_PAGE_SIZE сервера)
+        self.batch_window = float(os.getenv("API_BATCH_WINDOW", "0.005"))
+        self.batch_max = int(os.getenv("API_BATCH_MAX", "100"))
+        self._client: Optional[httpx.AsyncClient] = None
+
+    def get(self) -> httpx.AsyncClient:
+        """Клиент процесса; создается при первом обращении"""
+        if self._client is None or self._client.is_closed:
+            # Лимиты пула и HTTP/2 задаются у транспорта: переданный транспорт клиент не настраивает
+            transport = httpx.AsyncHTTPTransport(limits=self.limits, http2=self.http2)
+            self._client = httpx.AsyncClient(
+                transport=CoalescingTransport(BatchingTransport(
+                    ResilientTransport(ConditionalTransport(transport), self.retry, self.breaker),
+                    window=self.batch_window,
+                    max_size=self.batch_max
+                )),
+                timeout=self.timeout
+            )
+        return self._client
+
+    async def close(self):
+        """Закрыть клиент и его соединения (при остановке бота)"""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+        logger.info(f"Вызовы API за время работы: {call_stats.snapshot()}")
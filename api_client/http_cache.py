@@ -0,0 +1,75 @@
+from collections import OrderedDict
+from typing import NamedTuple, Optional
+
+import httpx
+
+# Сколько GET-ответов с валидаторами держать в памяти бота
+MAX_ENTRIES = 1000
+
+class CachedResponse(NamedTuple):
+    etag: str
+    last_modified: Optional[str]
+    headers: list
+    content: bytes
+
+class ValidatorCache:
+    """Последние ответы GET с ETag по полному URL (LRU)"""
+
+    def __init__(self, max_entries: int = MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, CachedResponse]" = OrderedDict()
+
+    def get(self, url: str) -> Optional[CachedResponse]:
+        entry = self._entries.get(url)
+        if entry is not None:
+            self._entries.move_to_end(url)
+        return entry
+
+    def set(self, url: str, entry: CachedResponse):
+        self._entries[url] = entry
+        self._entries.move_to_end(url)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+validators = ValidatorCache()
+
+class ConditionalTransport(httpx.AsyncBaseTransport):
+    """Транспорт, отправляющий If-None-Match / If-Modified-Since для уже полученных GET-ответов.
+
+    На 304 сервер присылает только заголовки, а вызывающий код получает сохраненный ответ 200.
+    """
+
+    def __init__(self, transport: Optional[httpx.AsyncBaseTransport] = None):
+        self._transport = transport or httpx.AsyncHTTPTransport()
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        if request.method != "GET":
+            return await self._transport.handle_async_request(request)
+
+        url = str(request.url)
+        cached = validators.get(url)
+        if cached is not None and "if-none-match" not in request.headers:
+            request.headers["If-None-Match"] = cached.etag
+            if cached.last_modified:
+                request.headers["If-Modified-Since"] = cached.last_modified
+
+        response = await self._transport.handle_async_request(request)
+        if response.status_code == 304 and cached is not None:
+            await response.aclose()
+            return httpx.Response(200, headers=cached.headers, content=cached.content, request=request)
+
+        if response.status_code == 200 and "etag" in response.headers:
+            content = await response.aread()
+            # Тело уже раскодировано, поэтому заголовки кодирования и длины не сохраняем
+            headers = [
+                (name, value) for name, value in response.headers.items()
+                if name not in ("content-encoding", "content-length", "transfer-encoding")
+            ]
+            validators.set(url, CachedResponse(
+                response.headers["etag"], response.headers.get("last-modified"), headers, content
+            ))
+            return httpx.Response(200, headers=headers, content=content, request=request)
+        return response
+
+    async def aclose(self):
+        await self._transport.aclose()
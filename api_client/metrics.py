@@ -0,0 +1,70 @@
+import re
+import time
+from collections import defaultdict
+from typing import Dict, Optional
+
+import httpx
+
+_ID_SEGMENT = re.compile(r"/\d+(?=/|$)")
+
+def call_name(request: httpx.Request) -> str:
+    """Имя вызова для метрик: метод и путь с {id} вместо числовых сегментов"""
+    return request.extensions.get("api_call") or f"{request.method} {_ID_SEGMENT.sub('/{id}', request.url.path)}"
+
+class CallStats:
+    """Счетчики вызовов API по имени вызова (в пределах процесса бота)"""
+
+    def __init__(self):
+        self._calls = defaultdict(lambda: {
+            "calls": 0,
+            "errors": 0,
+            "retries": 0,
+            "rejected": 0,
+            "coalesced": 0,
+            "batched": 0,
+            "time": 0.0,
+            "max_time": 0.0,
+        })
+        self.started_at = time.time()
+
+    def record(self, name: str, elapsed: float, status: Optional[int]):
+        """Завершенный вызов; status = None - ответа нет (ошибка соединения, таймаут)"""
+        stats = self._calls[name]
+        stats["calls"] += 1
+        stats["time"] += elapsed
+        stats["max_time"] = max(stats["max_time"], elapsed)
+        if status is None or status >= 500:
+            stats["errors"] += 1
+
+    def record_retry(self, name: str):
+        self._calls[name]["retries"] += 1
+
+    def record_rejected(self, name: str):
+        """Вызов не отправлен: цепь разомкнута"""
+        self._calls[name]["rejected"] += 1
+
+    def record_coalesced(self, name: str):
+        """Вызов получил ответ такого же запроса, уже выполнявшегося в этот момент"""
+        self._calls[name]["coalesced"] += 1
+
+    def record_batched(self, name: str):
+        """Вызов получил объект из пакетного запроса списка"""
+        self._calls[name]["batched"] += 1
+
+    def snapshot(self) -> Dict[str, dict]:
+        result = {}
+        for name, stats in sorted(self._calls.items()):
+            calls = stats["calls"]
+            result[name] = {
+                "calls": calls,
+                "errors": stats["errors"],
+                "retries": stats["retries"],
+                "rejected": stats["rejected"],
+                "coalesced": stats["coalesced"],
+                "batched": stats["batched"],
+                "avg_ms": round(stats["time"] / calls * 1000, 3) if calls else 0.0,
+                "max_ms": round(stats["max_time"] * 1000, 3),
+            }
+        return result
+
+call_stats = CallStats()
@@ -0,0 +1,68 @@
+"""Ответы API в том виде, в каком их получают боты: JSON-словари, даты - строки ISO 8601.
+
+Поля совпадают со схемами *Out в server/models.py.
+"""
+from typing import List, Optional, TypedDict
+
+class Cursor(TypedDict):
+    after_id: int
+    after_time: Optional[str]
+
+class Service(TypedDict):
+    id: int
+    name: str
+    description: Optional[str]
+    price: float
+    duration: int
+
+class Client(TypedDict):
+    id: int
+    name: str
+    phone_number: Optional[str]
+    telegram_id: Optional[int]
+    timezone: Optional[str]
+
+class Appointment(TypedDict):
+    id: int
+    client_id: int
+    service_id: int
+    car_model: Optional[str]
+    scheduled_time: str
+    status: str
+    created_at: str
+    # Заполняются при expand=client / expand=service
+    client: Optional[Client]
+    service: Optional[Service]
+
+class WorkingPeriod(TypedDict):
+    id: int
+    start_date: str
+    end_date: str
+    start_time: str
+    end_time: str
+    slot_duration: int
+    is_active: int
+    created_at: str
+
+class TimeSlot(TypedDict):
+    id: str
+    start_time: str
+    end_time: str
+    is_available: bool
+
+class DayAvailability(TypedDict):
+    date: str
+    free: int
+    total: int
+
+class Message(TypedDict):
+    id: int
+    text: str
+    user_id: int
+    is_from_admin: int
+    is_read: int
+    created_at: str
+
+class Page(TypedDict):
+    items: List[dict]
+    next_cursor: Optional[Cursor]
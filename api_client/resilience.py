@@ -0,0 +1,130 @@
+"""Повторы и размыкатель цепи (circuit breaker) для запросов к API.
+
+Идемпотентные запросы (GET, HEAD, OPTIONS, PUT, DELETE) при ошибке соединения, таймауте или
+ответе 502/503/504 повторяются с экспоненциальной задержкой со случайным разбросом (full
+jitter), чтобы повторы нескольких обработчиков не приходили на сервер одновременно.
+POST и PATCH не повторяются: сервер мог уже выполнить запрос.
+
+После failure_threshold таких ошибок подряд цепь размыкается: запросы сразу завершаются
+CircuitOpenError, не дожидаясь таймаутов. Через reset_timeout секунд пропускается один
+пробный запрос; успешный замыкает цепь, неудачный размыкает ее снова.
+"""
+import asyncio
+import logging
+import random
+import time
+from typing import NamedTuple, Optional
+
+import httpx
+
+from .metrics import CallStats, call_name, call_stats
+
+logger = logging.getLogger(__name__)
+
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+
+# Ответы, после которых запрос имеет смысл повторить: сервер временно недоступен
+RETRY_STATUSES = frozenset({502, 503, 504})
+
+class RetryPolicy(NamedTuple):
+    attempts: int = 3
+    base_delay: float = 0.1
+    max_delay: float = 2.0
+
+    def delay(self, attempt: int) -> float:
+        """Пауза перед повтором номер attempt + 1 (full jitter)"""
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+class CircuitOpenError(httpx.TransportError):
+    """Запрос не отправлен: API считается недоступным"""
+
+class CircuitBreaker:
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._probing = False
+
+    @property
+    def state(self) -> str:
+        if self._opened_at is None:
+            return "closed"
+        return "half_open" if self._probing else "open"
+
+    def allow(self) -> bool:
+        if self._opened_at is None:
+            return True
+        if not self._probing and time.monotonic() - self._opened_at >= self.reset_timeout:
+            self._probing = True
+            return True
+        return False
+
+    def record_success(self):
+        if self._opened_at is not None:
+            logger.info("API снова доступен, цепь замкнута")
+        self._failures = 0
+        self._opened_at = None
+        self._probing = False
+
+    def record_failure(self):
+        self._failures += 1
+        if self._probing or (self._opened_at is None and self._failures >= self.failure_threshold):
+            if not self._probing:
+                logger.warning(f"API недоступен ({self._failures} ошибок подряд), запросы приостановлены на {self.reset_timeout} с")
+            self._opened_at = time.monotonic()
+            self._probing = False
+
+    def release_probe(self):
+        """Пробный запрос отменен, не дойдя до результата - следующий запрос сможет стать пробным"""
+        self._probing = False
+
+class ResilientTransport(httpx.AsyncBaseTransport):
+    """Транспорт с повторами, размыкателем цепи и метриками вызовов"""
+
+    def __init__(
+        self,
+        transport: httpx.AsyncBaseTransport,
+        retry: RetryPolicy = RetryPolicy(),
+        breaker: Optional[CircuitBreaker] = None,
+        stats: CallStats = call_stats
+    ):
+        self._transport = transport
+        self.retry = retry
+        self.breaker = breaker or CircuitBreaker()
+        self.stats = stats
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        name = call_name(request)
+        attempts = self.retry.attempts if request.method in IDEMPOTENT_METHODS else 1
+        start = time.perf_counter()
+        for attempt in range(attempts):
+            if attempt:
+                self.stats.record_retry(name)
+                await asyncio.sleep(self.retry.delay(attempt - 1))
+            if not self.breaker.allow():
+                self.stats.record_rejected(name)
+                raise CircuitOpenError(f"API недоступен, запрос {name} не отправлен", request=request)
+            try:
+                response = await self._transport.handle_async_request(request)
+            except httpx.TransportError:
+                self.breaker.record_failure()
+                if attempt + 1 == attempts:
+                    self.stats.record(name, time.perf_counter() - start, None)
+                    raise
+                continue
+            except BaseException:
+                self.breaker.release_probe()
+                raise
+            if response.status_code not in RETRY_STATUSES:
+                self.breaker.record_success()
+                break
+            self.breaker.record_failure()
+            if attempt + 1 == attempts:
+                break
+            await response.aclose()
+        self.stats.record(name, time.perf_counter() - start, response.status_code)
+        return response
+
+    async def aclose(self):
+        await self._transport.aclose()
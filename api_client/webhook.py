@@ -0,0 +1,66 @@
+"""Получение обновлений бота через webhook (BOT_MODE=webhook).
+
+Telegram присылает обновления POST-запросами на base_url + path. Встроенный aiohttp-сервер
+проверяет секрет (заголовок X-Telegram-Bot-Api-Secret-Token), сразу отвечает Telegram и
+передает обновление Dispatcher отдельной задачей, поэтому обновления обрабатываются
+одновременно. Копий бота может быть несколько за балансировщиком; GET /health - проверка для
+балансировщика. При остановке webhook не удаляется: остальные копии продолжают работать.
+
+Адрес, путь, порт и секрет у каждого бота свои, см. services/webhook.py ботов.
+"""
+import asyncio
+import logging
+
+from aiogram import Bot, Dispatcher
+from aiogram.webhook.aiohttp_server import SimpleRequestHandler, setup_application
+from aiohttp import web
+
+logger = logging.getLogger(__name__)
+
+async def health(request: web.Request) -> web.Response:
+    return web.json_response({"status": "ok"})
+
+def create_app(dp: Dispatcher, bot: Bot, path: str, secret: str = "") -> web.Application:
+    """aiohttp-приложение, принимающее обновления бота на path"""
+    app = web.Application()
+    SimpleRequestHandler(
+        dispatcher=dp,
+        bot=bot,
+        handle_in_background=True,
+        secret_token=secret or None
+    ).register(app, path=path)
+    app.router.add_get("/health", health)
+    # Запуск и остановка приложения вызывают startup / shutdown Dispatcher
+    setup_application(app, dp, bot=bot)
+    return app
+
+async def run_webhook(
+    dp: Dispatcher,
+    bot: Bot,
+    base_url: str,
+    path: str,
+    secret: str = "",
+    host: str = "0.0.0.0",
+    port: int = 8080
+):
+    """Принимать обновления на host:port до отмены задачи"""
+    if not secret:
+        logger.warning("WEBHOOK_SECRET не задан: запросы на webhook не проверяются")
+    
+    runner = web.AppRunner(create_app(dp, bot, path, secret))
+    await runner.setup()
+    try:
+        await web.TCPSite(runner, host, port).start()
+        
+        url = f"{base_url.rstrip('/')}{path}"
+        await bot.set_webhook(
+            url,
+            secret_token=secret or None,
+            allowed_updates=dp.resolve_used_update_types()
+        )
+        logger.info(f"Webhook {url}, принимаем обновления на {host}:{port}{path}")
+        
+        await asyncio.Event().wait()
+    finally:
+        await runner.cleanup()
+        await bot.session.close()
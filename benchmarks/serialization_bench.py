@@ -0,0 +1,90 @@
+"""Процессорное время на запрос к спискам: json (JsonCoder + JSONResponse) против orjson (ORJSONCoder + ORJSONResponse).
+
+Для каждой страницы измеряется путь ответа, который зависит от сериализации:
+- промах: кодирование страницы в кеш, приведение к response_model и рендер ответа;
+- попадание: разбор записи из кеша, приведение к response_model и рендер ответа.
+
+Запуск из корня репозитория:
+    python -m benchmarks.serialization_bench [--items 20 100 500] [--repeat 200]
+"""
+import argparse
+import random
+import time
+import timeit
+from datetime import datetime, timedelta
+
+from fastapi.responses import JSONResponse, ORJSONResponse
+from fastapi_cache.coder import JsonCoder
+from pydantic import TypeAdapter
+
+from server.cache import ORJSONCoder
+from server.models import AppointmentExpandedOut, ClientOut, Cursor, Page, ServiceOut
+
+START = datetime(2030, 1, 1, 9)
+
+def make_clients(count: int, rng: random.Random):
+    return [
+        ClientOut(
+            id=i + 1,
+            name=f"Клиент {i + 1}",
+            phone_number=f"+7900{rng.randrange(10 ** 7):07d}",
+            telegram_id=rng.randrange(10 ** 9, 10 ** 10),
+            timezone="Europe/Moscow"
+        )
+        for i in range(count)
+    ]
+
+def make_appointments(count: int, rng: random.Random):
+    clients = make_clients(max(1, count // 4), rng)
+    services = [ServiceOut(id=i + 1, name=f"Услуга {i + 1}", description="Описание услуги", price=1500.0 + i * 100, duration=60) for i in range(10)]
+    appointments = []
+    for i in range(count):
+        client, service = rng.choice(clients), rng.choice(services)
+        appointments.append(AppointmentExpandedOut(
+            id=i + 1,
+            client_id=client.id,
+            service_id=service.id,
+            car_model="Lada Vesta",
+            scheduled_time=START + timedelta(minutes=30 * i),
+            status=rng.choice(["pending", "confirmed", "completed"]),
+            created_at=START - timedelta(days=7, seconds=rng.randrange(86400)),
+            client=client,
+            service=service
+        ))
+    return appointments
+
+def request_cpu(page, adapter, coder, response_class, repeat: int):
+    """Минимальное процессорное время (мс) промаха и попадания"""
+    def respond(content):
+        # Как FastAPI: проверка по response_model, приведение к JSON-типам и рендер ответа
+        return response_class(adapter.dump_python(adapter.validate_python(content), mode="json")).body
+
+    cached = coder.encode(page)
+    miss = min(timeit.repeat(lambda: (coder.encode(page), respond(page)), timer=time.process_time, number=10, repeat=repeat)) / 10
+    hit = min(timeit.repeat(lambda: respond(coder.decode(cached)), timer=time.process_time, number=10, repeat=repeat)) / 10
+    return miss * 1000, hit * 1000, len(cached)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--items", type=int, nargs="+", default=[20, 100, 500])
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    lists = [
+        ("/appointments?expand=client,service", make_appointments, TypeAdapter(Page[AppointmentExpandedOut])),
+        ("/clients", make_clients, TypeAdapter(Page[ClientOut])),
+    ]
+    print(f"{'список':<37} {'элементов':>9} {'промах json/orjson, мс':>23} {'попадание json/orjson, мс':>26} {'ускорение':>10}")
+    for name, make_items, adapter in lists:
+        for count in args.items:
+            items = make_items(count, random.Random(42))
+            page = adapter.validate_python({"items": items, "next_cursor": Cursor(after_id=count, after_time=START)})
+            json_miss, json_hit, _ = request_cpu(page, adapter, JsonCoder, JSONResponse, args.repeat)
+            orjson_miss, orjson_hit, _ = request_cpu(page, adapter, ORJSONCoder, ORJSONResponse, args.repeat)
+            print(
+                f"{name:<37} {count:>9} {json_miss:>11.3f}/{orjson_miss:<11.3f} {json_hit:>13.3f}/{orjson_hit:<12.3f}"
+                f" {json_miss / orjson_miss:>4.1f}x/{json_hit / orjson_hit:.1f}x"
+            )
+
+if __name__ == "__main__":
+    main()
@@ -3,7 +3,12 @@ from aiogram.filters import Command
 from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton
 import asyncio
 import logging
-from .config import TOKEN
+from aiogram.client.session.aiohttp import AiohttpSession
+from aiogram.client.telegram import TelegramAPIServer
+from .config import BOT_MODE, TELEGRAM_API_URL, TOKEN
+from .services.fsm_storage import create_events_isolation, storage
+from .services.http_client import close_http_client
+from .services.webhook import run_webhook
 from .services.notification_handler import NotificationHandler
 
 # Настройка логирования
@@ -11,8 +16,16 @@ logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 # Инициализация бота и диспетчера
-bot = Bot(token=TOKEN)
-dp = Dispatcher()
+# TELEGRAM_API_URL - другой адрес Bot API (локальный сервер или имитация в тестах)
+session = AiohttpSession(api=TelegramAPIServer.from_base(TELEGRAM_API_URL)) if TELEGRAM_API_URL else None
+bot = Bot(token=TOKEN, session=session)
+# Состояния FSM - в памяти или в Redis (FSM_STORAGE), см. services/fsm_storage.py
+dp = Dispatcher(storage=storage, events_isolation=create_events_isolation(storage))
+
+# Клиент пользователя находится один раз на обновление и передается обработчикам
+from .middleware import ClientIdentityMiddleware
+dp.message.middleware(ClientIdentityMiddleware())
+dp.callback_query.middleware(ClientIdentityMiddleware())
 
 # Регистрация всех роутеров
 from .handlers import main_menu, registration, appointments, profile, messages
@@ -31,7 +44,12 @@ async def main():
     notification_task = asyncio.create_task(notification_handler.start_listening())
     
     try:
-        await dp.start_polling(bot)
+        if BOT_MODE == "webhook":
+            await run_webhook(dp, bot)
+        else:
+            # Пока у бота установлен webhook, getUpdates не работает
+            await bot.delete_webhook()
+            await dp.start_polling(bot)
     finally:
         # Останавливаем обработчик уведомлений
         notification_task.cancel()
@@ -40,6 +58,8 @@ async def main():
         except asyncio.CancelledError:
             pass
         await notification_handler.stop()
+        # Закрываем общий HTTP-клиент и его соединения с API
+        await close_http_client()
 
 if __name__ == "__main__":
     asyncio.run(main())
@@ -20,6 +20,24 @@ API_URL = os.getenv("API_URL", "http://localhost:8000")
 if not API_URL.startswith(('http://', 'https://')):
     raise ValueError("API_URL должен начинаться с http:// или https://")
 
+# Режим получения обновлений: polling (по умолчанию) или webhook
+BOT_MODE = os.getenv("BOT_MODE", "polling")
+if BOT_MODE not in ("polling", "webhook"):
+    raise ValueError("BOT_MODE должен быть polling или webhook")
+
+# Webhook: Telegram присылает обновления на WEBHOOK_BASE_URL + WEBHOOK_PATH с секретом
+# WEBHOOK_SECRET в заголовке; бот слушает WEBHOOK_HOST:WEBHOOK_PORT (обычно за балансировщиком)
+WEBHOOK_BASE_URL = os.getenv("WEBHOOK_BASE_URL", "")
+if BOT_MODE == "webhook" and not WEBHOOK_BASE_URL.startswith(('http://', 'https://')):
+    raise ValueError("Для BOT_MODE=webhook нужен WEBHOOK_BASE_URL (https://... для api.telegram.org)")
+WEBHOOK_PATH = os.getenv("CLIENT_WEBHOOK_PATH", "/webhook/client")
+WEBHOOK_SECRET = os.getenv("CLIENT_WEBHOOK_SECRET", "")
+WEBHOOK_HOST = os.getenv("WEBHOOK_HOST", "0.0.0.0")
+WEBHOOK_PORT = int(os.getenv("CLIENT_WEBHOOK_PORT", "8080"))
+
+# Адрес Bot API (пусто - api.telegram.org): локальный Bot API сервер или его имитация в тестах
+TELEGRAM_API_URL = os.getenv("TELEGRAM_API_URL", "")
+
 # Настройки логирования
 LOG_LEVEL = "INFO"
 LOG_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
@@ -4,12 +4,11 @@ from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton, CallbackQu
 from aiogram.fsm.context import FSMContext
 from aiogram.fsm.state import State, StatesGroup
 import logging
-import httpx
 from datetime import datetime
 import json
-from typing import Union
+from typing import Optional, Union
 
-from ..config import API_URL
+from ..services.http_client import api
 
 router = Router()
 logger = logging.getLogger(__name__)
@@ -82,17 +81,13 @@ def get_messages_keyboard(messages_list, client_id):
     return keyboard
 
 @router.message(Command("messages"))
-async def show_messages(message: types.Message):
+async def show_messages(message: types.Message, client_id: Optional[int]):
     """Показать список сообщений"""
-    await show_messages_list(message)
+    await show_messages_list(message, client_id)
 
-async def show_messages_list(message_or_callback: Union[types.Message, CallbackQuery]):
-    """Общая функция для отображения списка сообщений"""
+async def show_messages_list(message_or_callback: Union[types.Message, CallbackQuery], client_id: Optional[int]):
+    """Общая функция для отображения списка сообщений (client_id - от ClientIdentityMiddleware)"""
     try:
-        # Получаем telegram_id пользователя
-        user_id = message_or_callback.from_user.id
-        client_id = await get_client_id_by_telegram(user_id)
-        
         if not client_id:
             text = "Вы не зарегистрированы. Пожалуйста, пройдите регистрацию."
             if isinstance(message_or_callback, types.Message):
@@ -101,39 +96,29 @@ async def show_messages_list(message_or_callback: Union[types.Message, CallbackQ
                 await message_or_callback.message.edit_text(text)
             return
         
-        async with httpx.AsyncClient() as client:
-            # Запрашиваем список сообщений для данного пользователя
-            response = await client.get(f"{API_URL}/messages/?user_id={client_id}")
-            
-            if response.status_code == 200:
-                messages = response.json()
-                
-                if not messages:
-                    text = "У вас нет сообщений"
-                    keyboard = InlineKeyboardMarkup(inline_keyboard=[
-                        [InlineKeyboardButton(
-                            text="✉️ Написать сообщение", 
-                            callback_data=MessageCallback(action="create").pack()
-                        )],
-                        [InlineKeyboardButton(
-                            text="🏠 В главное меню", 
-                            callback_data="main_menu"
-                        )]
-                    ])
-                else:
-                    text = "📬 Ваши сообщения:"
-                    keyboard = get_messages_keyboard(messages, client_id)
-                
-                if isinstance(message_or_callback, types.Message):
-                    await message_or_callback.answer(text, reply_markup=keyboard)
-                else:
-                    await message_or_callback.message.edit_text(text, reply_markup=keyboard)
-            else:
-                error_text = "Ошибка при получении списка сообщений"
-                if isinstance(message_or_callback, types.Message):
-                    await message_or_callback.answer(error_text)
-                else:
-                    await message_or_callback.message.edit_text(error_text)
+        # Запрашиваем список сообщений для данного пользователя
+        messages = await api.list_messages(user_id=client_id)
+        
+        if not messages:
+            text = "У вас нет сообщений"
+            keyboard = InlineKeyboardMarkup(inline_keyboard=[
+                [InlineKeyboardButton(
+                    text="✉️ Написать сообщение", 
+                    callback_data=MessageCallback(action="create").pack()
+                )],
+                [InlineKeyboardButton(
+                    text="🏠 В главное меню", 
+                    callback_data="main_menu"
+                )]
+            ])
+        else:
+            text = "📬 Ваши сообщения:"
+            keyboard = get_messages_keyboard(messages, client_id)
+        
+        if isinstance(message_or_callback, types.Message):
+            await message_or_callback.answer(text, reply_markup=keyboard)
+        else:
+            await message_or_callback.message.edit_text(text, reply_markup=keyboard)
     except Exception as e:
         logger.error(f"Ошибка при получении списка сообщений: {e}")
         error_text = "Произошла ошибка при получении списка сообщений"
@@ -144,12 +129,12 @@ async def show_messages_list(message_or_callback: Union[types.Message, CallbackQ
 
 # Добавляем обработчик для колбэка из главного меню        
 @router.callback_query(F.data == "messages")
-async def handle_message_menu(callback: CallbackQuery):
+async def handle_message_menu(callback: CallbackQuery, client_id: Optional[int]):
     """Обработка перехода в раздел сообщений из главного меню"""
-    await show_messages_list(callback)
+    await show_messages_list(callback, client_id)
         
 @router.callback_query(lambda c: c.data.startswith("{"))
-async def process_message_callback(callback: CallbackQuery, state: FSMContext):
+async def process_message_callback(callback: CallbackQuery, state: FSMContext, client_id: Optional[int]):
     """Обработка callback-запросов связанных с сообщениями"""
     try:
         # Распаковываем данные callback
@@ -157,90 +142,78 @@ async def process_message_callback(callback: CallbackQuery, state: FSMContext):
         
         # Различные действия в зависимости от типа callback
         if cb_data.action == "view":
-            await view_message(callback, cb_data.message_id)
+            await view_message(callback, cb_data.message_id, client_id)
         elif cb_data.action == "create":
             await start_create_message(callback, state)
         elif cb_data.action == "reply":
             await start_reply_message(callback, cb_data.message_id, state)
         elif cb_data.action == "delete":
-            await delete_message(callback, cb_data.message_id)
+            await delete_message(callback, cb_data.message_id, client_id)
         elif cb_data.action == "back":
-            await show_messages_list(callback)
+            await show_messages_list(callback, client_id)
     except Exception as e:
         logger.error(f"Ошибка при обработке callback сообщения: {e}")
         await callback.message.edit_text("Произошла ошибка. Пожалуйста, попробуйте позже.")
 
-async def view_message(callback: CallbackQuery, message_id: int):
+async def view_message(callback: CallbackQuery, message_id: int, client_id: Optional[int]):
     """Просмотр детальной информации о сообщении и истории переписки"""
     try:
-        # Получаем telegram_id пользователя
-        user_id = callback.from_user.id
-        client_id = await get_client_id_by_telegram(user_id)
-        
         if not client_id:
             await callback.message.edit_text("Вы не зарегистрированы. Пожалуйста, пройдите регистрацию.")
             return
             
-        async with httpx.AsyncClient() as client:
-            # Получаем информацию о сообщении
-            response = await client.get(f"{API_URL}/messages/{message_id}")
+        # Получаем информацию о сообщении
+        message_data = await api.get_message(message_id)
+        if message_data is None:
+            await callback.message.edit_text("Ошибка при получении информации о сообщении")
+            return
+        
+        # Получаем историю переписки
+        messages_history = await api.list_messages(user_id=client_id)
+        
+        # Сортируем сообщения по дате (от старых к новым)
+        messages_history.sort(key=lambda x: x["created_at"])
+        
+        # Формируем текст с историей переписки
+        history_text = f"💬 Переписка с администратором:\n\n"
+        
+        for hist_msg in messages_history:
+            # Определяем направление сообщения
+            direction = "➡️ Вы:" if hist_msg["is_from_admin"] == 0 else "⬅️ Администратор:"
             
-            if response.status_code == 200:
-                message_data = response.json()
-                
-                # Получаем историю переписки
-                history_response = await client.get(f"{API_URL}/messages/?user_id={client_id}")
+            # Форматируем дату
+            created_at = datetime.fromisoformat(hist_msg["created_at"])
+            date_str = created_at.strftime("%d.%m.%Y %H:%M")
+            
+            # Добавляем сообщение в историю
+            msg_text = hist_msg["text"]
+            # Выделяем текущее сообщение
+            if hist_msg["id"] == message_id:
+                msg_text = f"➤ {msg_text}"
                 
-                if history_response.status_code == 200:
-                    messages_history = history_response.json()
-                    
-                    # Сортируем сообщения по дате (от старых к новым)
-                    messages_history.sort(key=lambda x: x["created_at"])
-                    
-                    # Формируем текст с историей переписки
-                    history_text = f"💬 Переписка с администратором:\n\n"
-                    
-                    for hist_msg in messages_history:
-                        # Определяем направление сообщения
-                        direction = "➡️ Вы:" if hist_msg["is_from_admin"] == 0 else "⬅️ Администратор:"
-                        
-                        # Форматируем дату
-                        created_at = datetime.fromisoformat(hist_msg["created_at"])
-                        date_str = created_at.strftime("%d.%m.%Y %H:%M")
-                        
-                        # Добавляем сообщение в историю
-                        msg_text = hist_msg["text"]
-                        # Выделяем текущее сообщение
-                        if hist_msg["id"] == message_id:
-                            msg_text = f"➤ {msg_text}"
-                            
-                        history_text += f"{direction} ({date_str})\n{msg_text}\n\n"
-                    
-                    # Создаем клавиатуру
-                    keyboard = InlineKeyboardMarkup(inline_keyboard=[
-                        [InlineKeyboardButton(
-                            text="↩️ Ответить", 
-                            callback_data=MessageCallback(action="reply", message_id=message_id).pack()
-                        )],
-                        [InlineKeyboardButton(
-                            text="❌ Удалить", 
-                            callback_data=MessageCallback(action="delete", message_id=message_id).pack()
-                        )],
-                        [InlineKeyboardButton(
-                            text="🔙 Назад к списку", 
-                            callback_data=MessageCallback(action="back").pack()
-                        )]
-                    ])
-                    
-                    await callback.message.edit_text(history_text, reply_markup=keyboard)
-                    
-                    # Если сообщение не прочитано и это входящее сообщение, помечаем его как прочитанное
-                    if message_data["is_read"] == 0 and message_data["is_from_admin"] == 1:
-                        await client.put(f"{API_URL}/messages/read/{message_id}")
-                else:
-                    await callback.message.edit_text("Ошибка при получении истории переписки")
-            else:
-                await callback.message.edit_text("Ошибка при получении информации о сообщении")
+            history_text += f"{direction} ({date_str})\n{msg_text}\n\n"
+        
+        # Создаем клавиатуру
+        keyboard = InlineKeyboardMarkup(inline_keyboard=[
+            [InlineKeyboardButton(
+                text="↩️ Ответить", 
+                callback_data=MessageCallback(action="reply", message_id=message_id).pack()
+            )],
+            [InlineKeyboardButton(
+                text="❌ Удалить", 
+                callback_data=MessageCallback(action="delete", message_id=message_id).pack()
+            )],
+            [InlineKeyboardButton(
+                text="🔙 Назад к списку", 
+                callback_data=MessageCallback(action="back").pack()
+            )]
+        ])
+        
+        await callback.message.edit_text(history_text, reply_markup=keyboard)
+        
+        # Если сообщение не прочитано и это входящее сообщение, помечаем его как прочитанное
+        if message_data["is_read"] == 0 and message_data["is_from_admin"] == 1:
+            await api.mark_read(message_id)
     except Exception as e:
         logger.error(f"Ошибка при просмотре сообщения: {e}")
         await callback.message.edit_text("Произошла ошибка при просмотре сообщения")
@@ -253,48 +226,39 @@ async def start_create_message(callback: CallbackQuery, state: FSMContext):
 async def start_reply_message(callback: CallbackQuery, message_id: int, state: FSMContext):
     """Начать ответ на сообщение"""
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(f"{API_URL}/messages/{message_id}")
-            
-            if response.status_code == 200:
-                message_data = response.json()
-                
-                # Сохраняем информацию для последующего использования
-                await state.update_data(
-                    reply_to_id=message_id
-                )
-                
-                await callback.message.edit_text("Введите текст сообщения:")
-                await state.set_state(MessageState.waiting_for_text)
-            else:
-                await callback.message.edit_text("Ошибка при получении информации о сообщении")
+        if await api.get_message(message_id) is None:
+            await callback.message.edit_text("Ошибка при получении информации о сообщении")
+            return
+        
+        # Сохраняем информацию для последующего использования
+        await state.update_data(
+            reply_to_id=message_id
+        )
+        
+        await callback.message.edit_text("Введите текст сообщения:")
+        await state.set_state(MessageState.waiting_for_text)
     except Exception as e:
         logger.error(f"Ошибка при начале ответа на сообщение: {e}")
         await callback.message.edit_text("Произошла ошибка при начале ответа на сообщение")
 
-async def delete_message(callback: CallbackQuery, message_id: int):
+async def delete_message(callback: CallbackQuery, message_id: int, client_id: Optional[int]):
     """Удалить сообщение"""
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.delete(f"{API_URL}/messages/{message_id}")
-            
-            if response.status_code == 200:
-                await callback.message.edit_text("✅ Сообщение успешно удалено")
-                
-                # Показываем список сообщений
-                await show_messages_list(callback)
-            else:
-                await callback.message.edit_text("Ошибка при удалении сообщения")
+        await api.delete_message(message_id)
+        await callback.message.edit_text("✅ Сообщение успешно удалено")
+        
+        # Показываем список сообщений
+        await show_messages_list(callback, client_id)
     except Exception as e:
         logger.error(f"Ошибка при удалении сообщения: {e}")
         await callback.message.edit_text("Произошла ошибка при удалении сообщения")
 
 @router.message(MessageState.waiting_for_text)
-async def process_text(message: types.Message, state: FSMContext):
+async def process_text(message: types.Message, state: FSMContext, client_id: Optional[int]):
     """Обработать текст сообщения и отправить его"""
     try:
         data = await state.get_data()
-        from_user_id = await get_client_id_by_telegram(message.from_user.id)
+        from_user_id = client_id
         
         if not from_user_id:
             await message.answer("Вы не зарегистрированы. Пожалуйста, пройдите регистрацию.")
@@ -308,31 +272,13 @@ async def process_text(message: types.Message, state: FSMContext):
             "is_read": 0
         }
         
-        async with httpx.AsyncClient() as client:
-            response = await client.post(f"{API_URL}/messages/", json=message_data)
-            if response.status_code == 200:
-                await message.answer("✅ Сообщение успешно отправлено")
-                
-                # Показываем список сообщений
-                await show_messages(message)
-            else:
-                await message.answer("Ошибка при отправке сообщения")
+        await api.create_message(message_data)
+        await message.answer("✅ Сообщение успешно отправлено")
+        
+        # Показываем список сообщений
+        await show_messages(message, client_id)
     except Exception as e:
         logger.error(f"Ошибка при отправке сообщения: {e}")
         await message.answer("Произошла ошибка при отправке сообщения")
     finally:
         await state.clear()
-
-async def get_client_id_by_telegram(telegram_id: int) -> int:
-    """Получить ID клиента по Telegram ID"""
-    try:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(f"{API_URL}/clients/search", params={"telegram_id": str(telegram_id)})
-            if response.status_code == 200:
-                client_data = response.json()
-                return client_data.get("id")
-            else:
-                logger.error(f"Ошибка при получении ID клиента: {response.status_code} - {response.text}")
-    except Exception as e:
-        logger.error(f"Ошибка при получении ID клиента: {e}")
-    return None 
\ No newline at end of file
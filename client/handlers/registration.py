@@ -3,7 +3,6 @@ from aiogram.filters import Command
 from aiogram.fsm.context import FSMContext
 from aiogram.types import Message, InlineKeyboardMarkup, InlineKeyboardButton, CallbackQuery
 from aiogram.filters.callback_data import CallbackData
-import httpx
 import logging
 from datetime import datetime, timedelta
 import calendar
@@ -11,7 +10,10 @@ from typing import List, Dict, Optional
 
 from aiogram.fsm.state import StatesGroup, State
 
-from ..config import API_URL
+from api_client.models import Client
+
+from ..services.http_client import api
+from ..services.identity import identities
 from .main_menu import keyboard as main_menu_keyboard
 
 logger = logging.getLogger(__name__)
@@ -29,39 +31,23 @@ class RegistrationCallback(CallbackData, prefix="registration"):
     action: str
 
 @router.message(Command("start"))
-async def command_start(message: Message, state: FSMContext):
+async def command_start(message: Message, state: FSMContext, current_client: Optional[Client]):
     """Обработчик команды /start"""
     try:
-        # Проверяем, есть ли пользователь в базе данных
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"{API_URL}/clients/search",
-                params={"telegram_id": message.from_user.id}
+        # Клиента пользователя (если он зарегистрирован) передает ClientIdentityMiddleware
+        if current_client:
+            await message.answer(
+                f"Добро пожаловать, {current_client['name']}!\n"
+                "👋 Добро пожаловать в бот автосервиса!\n\n"
+                "Выберите действие:",
+                reply_markup=main_menu_keyboard
             )
-            
-            if response.status_code == 200:
-                # Пользователь уже зарегистрирован
-                client_data = response.json()
-                await message.answer(
-                    f"Добро пожаловать, {client_data['name']}!\n"
-                    "👋 Добро пожаловать в бот автосервиса!\n\n"
-                    "Выберите действие:",
-                    reply_markup=main_menu_keyboard
-                )
-                return
-            
-            # Если пользователь не найден, начинаем регистрацию
-            await message.answer("Добро пожаловать! Для начала работы нужно зарегистрироваться.\nВведите ваше имя:")
-            await state.set_state(ClientRegistrationState.waiting_for_name)
-            
-    except httpx.HTTPStatusError as e:
-        if e.response.status_code == 404:
-            # Пользователь не найден, начинаем регистрацию
-            await message.answer("Добро пожаловать! Для начала работы нужно зарегистрироваться.\nВведите ваше имя:")
-            await state.set_state(ClientRegistrationState.waiting_for_name)
-        else:
-            logger.error(f"Ошибка при проверке регистрации клиента: {e}")
-            await message.answer("❌ Произошла ошибка при проверке регистрации. Пожалуйста, попробуйте позже.")
+            return
+        
+        # Если пользователь не найден, начинаем регистрацию
+        await message.answer("Добро пожаловать! Для начала работы нужно зарегистрироваться.\nВведите ваше имя:")
+        await state.set_state(ClientRegistrationState.waiting_for_name)
+        
     except Exception as e:
         logger.error(f"Ошибка при проверке регистрации клиента: {e}")
         await message.answer("❌ Произошла ошибка при проверке регистрации. Пожалуйста, попробуйте позже.")
@@ -122,27 +108,25 @@ async def register_client(message: Message, state: FSMContext):
     
     try:
         # Регистрируем клиента в API
-        async with httpx.AsyncClient() as client:
-            client_data = {
-                "name": user_data['name'],
-                "phone_number": user_data['phone'],
-                "car_model": "Не указано", # Устанавливаем дефолтное значение
-                "telegram_id": message.from_user.id
-            }
-            
-            response = await client.post(f"{API_URL}/clients", json=client_data)
-            response.raise_for_status()
-            
-            # Очищаем состояние
-            await state.clear()
-            
-            # Показываем главное меню
-            await message.answer(
-                f"Регистрация успешно завершена, {user_data['name']}!\n\n"
-                "👋 Добро пожаловать в бот автосервиса!\n\n"
-                "Выберите действие:",
-                reply_markup=main_menu_keyboard
-            )
+        client_data = {
+            "name": user_data['name'],
+            "phone_number": user_data['phone'],
+            "car_model": "Не указано", # Устанавливаем дефолтное значение
+            "telegram_id": message.from_user.id
+        }
+        
+        identities.set(message.from_user.id, await api.create_client(client_data))
+        
+        # Очищаем состояние
+        await state.clear()
+        
+        # Показываем главное меню
+        await message.answer(
+            f"Регистрация успешно завершена, {user_data['name']}!\n\n"
+            "👋 Добро пожаловать в бот автосервиса!\n\n"
+            "Выберите действие:",
+            reply_markup=main_menu_keyboard
+        )
     except Exception as e:
         logger.error(f"Ошибка при регистрации клиента: {e}")
         await message.answer("❌ Произошла ошибка при регистрации. Пожалуйста, попробуйте позже.")
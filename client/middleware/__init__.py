@@ -0,0 +1,3 @@
+from .identity_middleware import ClientIdentityMiddleware
+
+__all__ = ["ClientIdentityMiddleware"]
@@ -0,0 +1,34 @@
+from typing import Dict, Any, Awaitable, Callable
+from aiogram import BaseMiddleware
+from aiogram.types import TelegramObject
+import httpx
+import logging
+from ..services.identity import client_timezone, identities
+
+logger = logging.getLogger(__name__)
+
+class ClientIdentityMiddleware(BaseMiddleware):
+    """Middleware, которое находит клиента пользователя один раз на обновление.
+
+    Обработчики получают в параметрах current_client (запись клиента или None, если
+    пользователь не зарегистрирован), client_id и timezone.
+    """
+    
+    async def __call__(
+        self, 
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any]
+    ) -> Any:
+        current_client = None
+        user = data.get("event_from_user")
+        if user is not None:
+            try:
+                current_client = await identities.get(user.id)
+            except httpx.HTTPError as e:
+                logger.error(f"Ошибка при получении клиента {user.id}: {e}")
+        
+        data["current_client"] = current_client
+        data["client_id"] = current_client["id"] if current_client else None
+        data["timezone"] = client_timezone(current_client)
+        return await handler(event, data)
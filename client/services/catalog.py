@@ -0,0 +1,10 @@
+"""Копия справочников API в памяти бота (см. api_client.catalog)"""
+from api_client import CatalogCache
+
+from .http_client import api
+
+catalog = CatalogCache(api)
+
+get_services = catalog.get_services
+get_service = catalog.get_service
+get_working_periods = catalog.get_working_periods
@@ -0,0 +1,76 @@
+"""Клиент API, соответствующий пользователю Telegram.
+
+Почти каждому обработчику клиентского бота нужен клиент пользователя: его id и часовой пояс.
+ClientIdentityMiddleware находит клиента один раз на обновление и передает обработчикам в
+current_client, client_id и timezone. Найденные клиенты хранятся CLIENT_IDENTITY_TTL секунд;
+после изменения профиля обработчик кладет в кеш обновленную запись (identities.set).
+Незарегистрированный пользователь не кешируется - после регистрации он найдется сразу.
+"""
+import logging
+import os
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+import httpx
+
+from api_client.models import Client
+
+from .http_client import api
+
+logger = logging.getLogger(__name__)
+
+# Сколько секунд найденный клиент используется без повторного запроса к API и сколько
+# пользователей хранить (дольше всех не обращавшиеся вытесняются)
+CLIENT_IDENTITY_TTL = int(os.getenv("CLIENT_IDENTITY_TTL", "300"))
+CLIENT_IDENTITY_MAX = int(os.getenv("CLIENT_IDENTITY_MAX", "10000"))
+
+# Часовой пояс, если он у клиента не указан или клиент не найден
+DEFAULT_TIMEZONE = "Europe/Moscow"
+
+class ClientIdentityCache:
+    """Клиенты по telegram_id: момент получения и запись клиента"""
+
+    def __init__(self, ttl: int = CLIENT_IDENTITY_TTL, max_size: int = CLIENT_IDENTITY_MAX):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._entries: "OrderedDict[int, Tuple[float, Client]]" = OrderedDict()
+
+    def set(self, telegram_id: int, client: Client):
+        """Запомнить клиента пользователя (например, ответ API после изменения профиля)"""
+        self._entries[telegram_id] = (time.monotonic(), client)
+        self._entries.move_to_end(telegram_id)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, telegram_id: Optional[int] = None):
+        """Забыть клиента пользователя (или всех)"""
+        if telegram_id is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(telegram_id, None)
+
+    async def get(self, telegram_id: int) -> Optional[Client]:
+        """Клиент пользователя или None, если пользователь не зарегистрирован"""
+        entry = self._entries.get(telegram_id)
+        if entry is not None and time.monotonic() - entry[0] < self.ttl:
+            self._entries.move_to_end(telegram_id)
+            return entry[1]
+        try:
+            client = await api.find_client(telegram_id=telegram_id)
+        except httpx.HTTPError as e:
+            if entry is None:
+                raise
+            logger.warning(f"Не удалось обновить клиента {telegram_id}, используем сохраненного: {e}")
+            return entry[1]
+        if client is None:
+            self._entries.pop(telegram_id, None)
+        else:
+            self.set(telegram_id, client)
+        return client
+
+identities = ClientIdentityCache()
+
+def client_timezone(client: Optional[Client]) -> str:
+    """Часовой пояс клиента (DEFAULT_TIMEZONE, если не указан)"""
+    return (client or {}).get("timezone") or DEFAULT_TIMEZONE
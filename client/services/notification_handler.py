@@ -4,16 +4,19 @@ import logging
 from datetime import datetime
 from zoneinfo import ZoneInfo
 
-import httpx
 import aioredis
 import os
 from aiogram import Bot
 from typing import Dict, Any, Optional
 
-from ..config import API_URL
+from .catalog import catalog
+from .http_client import api
 
 logger = logging.getLogger(__name__)
 
+# Сколько секунд помнить отправленные уведомления (защита от повторной отправки копиями бота)
+NOTIFICATION_CLAIM_TTL = 3600
+
 class NotificationHandler:
     """Обработчик уведомлений для клиентского бота"""
     
@@ -36,6 +39,8 @@ class NotificationHandler:
         self.redis_conn = await aioredis.from_url(redis_url)
         self.pubsub = self.redis_conn.pubsub()
         await self.pubsub.subscribe("notifications")
+        # События catalog_changed до подписки могли потеряться
+        catalog.invalidate()
         
         while True:
             try:
@@ -54,6 +59,13 @@ class NotificationHandler:
         """
         try:
             payload = json.loads(data)
+            if payload.get("type") == "catalog_changed":
+                # Изменились услуги или рабочие периоды - перечитаем их при следующем обращении
+                catalog.invalidate(payload.get("catalog"))
+                return
+            # Уведомление получают все копии бота, а отправляет одна
+            if not await self._claim(payload):
+                return
             await self._send_telegram_notification(payload)
                 
         except json.JSONDecodeError as e:
@@ -61,6 +73,14 @@ class NotificationHandler:
         except Exception as e:
             logger.error(f"Ошибка при обработке уведомления: {e}")
             
+    async def _claim(self, payload: Dict[str, Any]) -> bool:
+        """Уведомление отправляет одна копия бота - первая, записавшая его id в Redis"""
+        notification_id = payload.get("notification_id")
+        if not notification_id:
+            return True
+        key = f"notifications:claimed:client:{notification_id}"
+        return bool(await self.redis_conn.set(key, 1, nx=True, ex=NOTIFICATION_CLAIM_TTL))
+            
     async def _send_telegram_notification(self, payload: Dict[str, Any]) -> None:
         """Отправляет уведомление в Telegram
         
@@ -68,79 +88,73 @@ class NotificationHandler:
             payload (Dict[str, Any]): Данные уведомления
         """
         try:
-            async with httpx.AsyncClient() as client:
-                logger.info(f"payload = {payload}")
-                
-                # Определение типа уведомления
-                notification_type = payload.get("type")
+            logger.info(f"payload = {payload}")
+            
+            # Определение типа уведомления
+            notification_type = payload.get("type")
+            
+            if notification_type == "new_message":
+                # Обработка нового сообщения
+                message_data = payload.get("message", {})
+                user_id = message_data.get("user_id")
+                is_from_admin = message_data.get("is_from_admin")
+                message_text = message_data.get("text", "Новое сообщение")
                 
-                if notification_type == "new_message":
-                    # Обработка нового сообщения
-                    message_data = payload.get("message", {})
-                    user_id = message_data.get("user_id")
-                    is_from_admin = message_data.get("is_from_admin")
-                    message_text = message_data.get("text", "Новое сообщение")
+                if is_from_admin == 1 and user_id:
+                    # Сообщение от администратора - отправляем клиенту
+                    client_data = await api.get_client(user_id)
+                    chat_id = (client_data or {}).get("telegram_id")
                     
-                    if is_from_admin == 1 and user_id:
-                        # Сообщение от администратора - отправляем клиенту
-                        response = await client.get(f"{API_URL}/clients/{user_id}")
-                        response.raise_for_status()
-                        client_data = response.json()
-                        chat_id = client_data.get("telegram_id")
-                        
-                        if chat_id:
-                            await self.bot.send_message(
-                                chat_id=chat_id,
-                                text=f"📩 Новое сообщение от администратора:\n\n{message_text}"
-                            )
-                            logger.info(f"Отправлено уведомление о сообщении для клиента с chat_id: {chat_id}")
-                    elif is_from_admin == 0 and user_id:
-                        # Сообщение от клиента - оно должно обрабатываться обработчиком уведомлений администратора
-                        logger.info(f"Сообщение от клиента (id={user_id}), будет обработано в админском боте")
-                    else:
-                        logger.warning("Некорректные данные сообщения, уведомление не отправлено")
-                    return
+                    if chat_id:
+                        await self.bot.send_message(
+                            chat_id=chat_id,
+                            text=f"📩 Новое сообщение от администратора:\n\n{message_text}"
+                        )
+                        logger.info(f"Отправлено уведомление о сообщении для клиента с chat_id: {chat_id}")
+                elif is_from_admin == 0 and user_id:
+                    # Сообщение от клиента - оно должно обрабатываться обработчиком уведомлений администратора
+                    logger.info(f"Сообщение от клиента (id={user_id}), будет обработано в админском боте")
+                else:
+                    logger.warning("Некорректные данные сообщения, уведомление не отправлено")
+                return
+            
+            # Обработка уведомлений о записях (старый код)
+            client_id = payload.get("client_id")
+            if not client_id:
+                logger.error("Отсутствует client_id в payload")
+                return
                 
-                # Обработка уведомлений о записях (старый код)
-                client_id = payload.get("client_id")
-                if not client_id:
-                    logger.error("Отсутствует client_id в payload")
+            appointment_id = payload.get("appointment_id")
+            if appointment_id:
+                # Запись вместе с клиентом и услугой - одним запросом
+                appointment = await api.get_appointment(appointment_id, expand="client,service")
+                if appointment is None:
+                    logger.error(f"Запись {appointment_id} не найдена")
                     return
-                    
-                response = await client.get(f"{API_URL}/clients/{client_id}")
-                response.raise_for_status()
-                chat_id = response.json()["telegram_id"]
-                appointment_id = payload.get("appointment_id")
-                if appointment_id:
-                    response = await client.get(f"{API_URL}/appointments/{appointment_id}")
-                    response.raise_for_status()
-                    appointment = response.json()
-                    response = await client.get(f"{API_URL}/services/{appointment['service_id']}")
-                    response.raise_for_status()
-                    service = response.json()
-                    response = await client.get(
-                        f"{API_URL}/clients/search",
-                        params={"telegram_id": str(chat_id)}
-                    )
-                    response.raise_for_status()
-                    current_client = response.json()
-                    client_timezone = current_client.get('timezone', 'Europe/Moscow')
-                    scheduled_time = datetime.fromisoformat(appointment['scheduled_time'].replace('Z', '+00:00')).replace(tzinfo=ZoneInfo("UTC"))
-                    local_time = scheduled_time.astimezone(ZoneInfo(client_timezone))
-                    message = f"Вы записаны на услугу {service['name']} {local_time.strftime('%d.%m.%Y')} в {local_time.strftime('%H:%M')}"
-                else:
-                    message = payload.get("text")
-
-                if not message:
-                    logger.error("Отсутствует текст сообщения в payload")
+                service = appointment['service']
+                chat_id = appointment['client']['telegram_id']
+                client_timezone = appointment['client'].get('timezone') or 'Europe/Moscow'
+                scheduled_time = datetime.fromisoformat(appointment['scheduled_time'].replace('Z', '+00:00')).replace(tzinfo=ZoneInfo("UTC"))
+                local_time = scheduled_time.astimezone(ZoneInfo(client_timezone))
+                message = f"Вы записаны на услугу {service['name']} {local_time.strftime('%d.%m.%Y')} в {local_time.strftime('%H:%M')}"
+            else:
+                client_data = await api.get_client(client_id)
+                if client_data is None:
+                    logger.error(f"Клиент {client_id} не найден")
                     return
-                
-                await self.bot.send_message(
-                    chat_id=chat_id,
-                    text=message
-                )
+                chat_id = client_data["telegram_id"]
+                message = payload.get("text")
+
+            if not message:
+                logger.error("Отсутствует текст сообщения в payload")
+                return
+            
+            await self.bot.send_message(
+                chat_id=chat_id,
+                text=message
+            )
             
-                logger.info(f"Отправлено уведомление в Telegram для chat_id: {chat_id}")
+            logger.info(f"Отправлено уведомление в Telegram для chat_id: {chat_id}")
             
         except Exception as e:
             logger.error(f"Ошибка при отправке уведомления в Telegram: {e}")
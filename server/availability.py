@@ -0,0 +1,76 @@
+"""Сетка слотов и занятые интервалы дня - исходные данные индекса доступности.
+
+Рабочие периоды дня сводятся к непересекающимся интервалам и сетке слотов, записи - к
+отсортированному списку непересекающихся занятых интервалов. Доступность слотов по ним
+отмечает availability_index (evaluate) через битовую карту занятости.
+"""
+from datetime import datetime, timedelta
+from itertools import groupby
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+Interval = Tuple[datetime, datetime]
+
+# Длительность записи, если у услуги она не указана
+DEFAULT_BOOKING_MINUTES = 60
+
+class Slot(NamedTuple):
+    start: datetime
+    end: datetime
+    is_available: bool
+
+def at_time(day: datetime, hhmm: str) -> datetime:
+    """Момент HH:MM в указанный день"""
+    hour, minute = map(int, hhmm.split(":"))
+    return day.replace(hour=hour, minute=minute, second=0, microsecond=0)
+
+def merge_intervals(intervals: Iterable[Interval]) -> List[Interval]:
+    """Объединить пересекающиеся и смежные интервалы; результат отсортирован по началу"""
+    merged: List[Interval] = []
+    for start, end in sorted(intervals):
+        if end <= start:
+            continue
+        if merged and start <= merged[-1][1]:
+            if end > merged[-1][1]:
+                merged[-1] = (merged[-1][0], end)
+        else:
+            merged.append((start, end))
+    return merged
+
+def working_intervals(periods: Iterable, day: datetime) -> Dict[int, List[Interval]]:
+    """Рабочие интервалы дня, сгруппированные по длительности слота.
+
+    periods - объекты с полями start_time, end_time (HH:MM) и slot_duration (минуты).
+    Пересекающиеся периоды с одинаковой сеткой сливаются, поэтому слоты не дублируются.
+    """
+    key = lambda period: period.slot_duration
+    return {
+        duration: merge_intervals((at_time(day, p.start_time), at_time(day, p.end_time)) for p in group)
+        for duration, group in groupby(sorted(periods, key=key), key=key)
+    }
+
+def busy_intervals(bookings: Iterable[Tuple[datetime, Optional[int]]]) -> List[Interval]:
+    """Занятые интервалы по записям (начало, длительность услуги в минутах)"""
+    return merge_intervals(
+        (start, start + timedelta(minutes=minutes or DEFAULT_BOOKING_MINUTES))
+        for start, minutes in bookings
+    )
+
+def slot_grid(periods: Sequence, day: datetime) -> List[Tuple[datetime, datetime, datetime]]:
+    """Сетка слотов дня: (начало, конец слота, конец рабочего интервала), по возрастанию начала.
+
+    Зависит только от рабочих периодов, поэтому ее можно хранить отдельно от записей.
+    """
+    grid = []
+    seen = set()
+    for slot_duration, intervals in sorted(working_intervals(periods, day).items()):
+        step = timedelta(minutes=slot_duration)
+        for window_start, window_end in intervals:
+            start = window_start
+            while start + step <= window_end:
+                # Слоты с одинаковым началом из периодов с разной сеткой показываем один раз
+                if start not in seen:
+                    seen.add(start)
+                    grid.append((start, start + step, window_end))
+                start += step
+    grid.sort()
+    return grid
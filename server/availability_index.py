@@ -0,0 +1,290 @@
+"""Индекс доступности в Redis.
+
+Для каждого дня хранятся:
+- сетка слотов (JSON [[начало, конец, конец рабочего интервала], ...] в минутах от полуночи) -
+  зависит только от рабочих периодов;
+- битовая карта занятости на 1440 бит (1 бит = 1 минута, 180 байт), старший бит первого
+  байта - 00:00, как в GETBIT/SETBIT.
+
+Ключи версионируются общим поколением availability:gen: изменение рабочих периодов или
+длительности услуги увеличивает его, и весь индекс перестраивается лениво при следующем чтении.
+Записи обновляют только затронутые дни. Чтобы перестроение по старому снимку базы не затерло
+более свежие данные, у каждого дня есть счетчик версии: запись увеличивает его после commit,
+а карта хранится вместе с версией, прочитанной до обращения к базе, - карта с устаревшей
+версией при чтении считается отсутствующей.
+
+Полная перестройка: python -m server.availability_index rebuild [--days N]
+"""
+import argparse
+import asyncio
+import json
+import logging
+import math
+import os
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import redis.asyncio as redis
+from redis.exceptions import RedisError
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from server.availability import Slot, busy_intervals, slot_grid
+from server.cache import REDIS_URL, invalidate_tags
+from server.models import Appointment, Service, WorkingPeriod
+
+logger = logging.getLogger(__name__)
+
+redis_client = redis.Redis.from_url(REDIS_URL)
+
+# Время жизни ключей индекса; после него день перестраивается из базы
+AVAILABILITY_INDEX_TTL = int(os.getenv("AVAILABILITY_INDEX_TTL", "86400"))
+
+MINUTES_PER_DAY = 24 * 60
+BITMAP_BYTES = MINUTES_PER_DAY // 8
+
+GEN_KEY = "availability:gen"
+
+Grid = List[Tuple[int, int, int]]
+
+def _day_id(day: datetime) -> str:
+    return day.strftime("%Y-%m-%d")
+
+def grid_key(gen: int, day: datetime) -> str:
+    return f"availability:{gen}:grid:{_day_id(day)}"
+
+def busy_key(gen: int, day: datetime) -> str:
+    return f"availability:{gen}:busy:{_day_id(day)}"
+
+def version_key(day: datetime) -> str:
+    return f"availability:version:{_day_id(day)}"
+
+def _minute(day: datetime, moment: datetime) -> int:
+    return int((moment - day).total_seconds() // 60)
+
+def day_grid(periods: Sequence, day: datetime) -> Grid:
+    """Сетка слотов дня в минутах от полуночи"""
+    return [
+        (_minute(day, start), _minute(day, end), _minute(day, window_end))
+        for start, end, window_end in slot_grid(periods, day)
+    ]
+
+def busy_mask(busy: Iterable[Tuple[datetime, datetime]], day: datetime) -> int:
+    """Битовая карта занятости дня; интервалы обрезаются границами суток.
+
+    Начало округляется вниз до минуты, конец - вверх, чтобы запись с секундами не освобождала
+    лишнюю минуту.
+    """
+    mask = 0
+    for start, end in busy:
+        a = max(0, math.floor((start - day).total_seconds() / 60))
+        b = min(MINUTES_PER_DAY, math.ceil((end - day).total_seconds() / 60))
+        if a < b:
+            mask |= ((1 << (b - a)) - 1) << (MINUTES_PER_DAY - b)
+    return mask
+
+def is_busy(mask: int, start: int, end: int) -> bool:
+    """Есть ли занятые минуты в полуинтервале [start, end)"""
+    return bool((mask >> (MINUTES_PER_DAY - end)) & ((1 << (end - start)) - 1))
+
+def evaluate(day: datetime, grid: Grid, mask: int, now: datetime, duration: Optional[int] = None) -> List[Slot]:
+    """Слоты дня по сетке и карте занятости.
+
+    duration - длительность выбранной услуги: слот доступен, только если услуга целиком
+    помещается в рабочий интервал и не пересекается с другими записями.
+    """
+    slots = []
+    for start_min, end_min, window_end in grid:
+        start = day + timedelta(minutes=start_min)
+        check_end = start_min + duration if duration else end_min
+        is_available = start > now and check_end <= window_end and not is_busy(mask, start_min, check_end)
+        slots.append(Slot(start, day + timedelta(minutes=end_min), is_available))
+    return slots
+
+def compute_slots(
+    periods: Sequence,
+    day: datetime,
+    bookings: Iterable[Tuple[datetime, Optional[int]]],
+    now: datetime,
+    duration: Optional[int] = None
+) -> List[Slot]:
+    """Слоты дня напрямую по рабочим периодам и записям (начало, длительность услуги), без Redis"""
+    return evaluate(day, day_grid(periods, day), busy_mask(busy_intervals(bookings), day), now, duration)
+
+def _days(first_day: datetime, last_day: datetime) -> List[datetime]:
+    return [first_day + timedelta(days=i) for i in range((last_day - first_day).days + 1)]
+
+async def load_periods(db: AsyncSession, first_day: datetime, last_day: datetime):
+    """Активные рабочие периоды, пересекающие диапазон"""
+    return (await db.execute(select(WorkingPeriod).where(
+        WorkingPeriod.is_active == 1,
+        WorkingPeriod.start_date <= last_day,
+        WorkingPeriod.end_date >= first_day
+    ))).scalars().all()
+
+async def load_busy(db: AsyncSession, first_day: datetime, last_day: datetime):
+    """Занятые интервалы диапазона.
+
+    Запись, начатая накануне вечером, тоже может занимать утро, поэтому берем и предыдущий
+    день. Отмененные записи время не занимают.
+    """
+    bookings = (await db.execute(
+        select(Appointment.scheduled_time, Service.duration)
+        .join(Service, Service.id == Appointment.service_id)
+        .where(
+            Appointment.scheduled_time >= first_day - timedelta(days=1),
+            Appointment.scheduled_time < last_day + timedelta(days=1),
+            Appointment.status != "cancelled"
+        )
+    )).all()
+    return busy_intervals(bookings)
+
+def _encode_busy(version: int, mask: int) -> bytes:
+    return f"{version}:".encode() + mask.to_bytes(BITMAP_BYTES, "big")
+
+def _decode_busy(value: Optional[bytes], version: int) -> Optional[int]:
+    if value is None:
+        return None
+    stored_version, _, bitmap = value.partition(b":")
+    if int(stored_version) != version:
+        return None
+    return int.from_bytes(bitmap, "big")
+
+async def _read_index(days: List[datetime]):
+    """Поколение, сетки и карты занятости дней за два обращения к Redis"""
+    gen = int(await redis_client.get(GEN_KEY) or 0)
+    async with redis_client.pipeline(transaction=False) as pipe:
+        for day in days:
+            pipe.get(grid_key(gen, day))
+            pipe.get(busy_key(gen, day))
+            pipe.get(version_key(day))
+        values = await pipe.execute()
+    grids, masks, versions = {}, {}, {}
+    for i, day in enumerate(days):
+        grid, busy, version = values[3 * i:3 * i + 3]
+        versions[day] = int(version or 0)
+        grids[day] = [tuple(slot) for slot in json.loads(grid)] if grid is not None else None
+        masks[day] = _decode_busy(busy, versions[day])
+    return gen, grids, masks, versions
+
+async def _store(gen: int, grids: Dict[datetime, Grid], masks: Dict[datetime, int], versions: Dict[datetime, int]):
+    async with redis_client.pipeline(transaction=False) as pipe:
+        for day, grid in grids.items():
+            pipe.set(grid_key(gen, day), json.dumps(grid), ex=AVAILABILITY_INDEX_TTL)
+        for day, mask in masks.items():
+            pipe.set(busy_key(gen, day), _encode_busy(versions[day], mask), ex=AVAILABILITY_INDEX_TTL)
+        await pipe.execute()
+
+async def day_slots(
+    db: AsyncSession,
+    first_day: datetime,
+    last_day: datetime,
+    duration: Optional[int] = None,
+    now: Optional[datetime] = None
+) -> Dict[datetime, List[Slot]]:
+    """Слоты каждого дня диапазона [first_day, last_day].
+
+    Недостающие в индексе дни достраиваются из базы (не больше двух запросов на весь диапазон)
+    и сохраняются. Если Redis недоступен, слоты считаются напрямую по базе.
+    Слоты, начинающиеся не позже now (по умолчанию - текущего момента), недоступны.
+    """
+    days = _days(first_day, last_day)
+    try:
+        gen, grids, masks, versions = await _read_index(days)
+    except RedisError as e:
+        logger.warning(f"Индекс доступности недоступен, считаем слоты по базе: {e}")
+        gen, versions = None, {}
+        grids = dict.fromkeys(days)
+        masks = dict.fromkeys(days)
+
+    missing_grids = [day for day in days if grids[day] is None]
+    missing_masks = [day for day in days if masks[day] is None]
+    built_grids, built_masks = {}, {}
+    if missing_grids:
+        periods = await load_periods(db, missing_grids[0], missing_grids[-1])
+        for day in missing_grids:
+            built_grids[day] = day_grid([p for p in periods if p.start_date <= day <= p.end_date], day)
+    if missing_masks:
+        busy = await load_busy(db, missing_masks[0], missing_masks[-1])
+        for day in missing_masks:
+            built_masks[day] = busy_mask(busy, day)
+
+    if gen is not None and (built_grids or built_masks):
+        try:
+            await _store(gen, built_grids, built_masks, versions)
+        except RedisError as e:
+            logger.warning(f"Не удалось сохранить индекс доступности: {e}")
+    grids.update(built_grids)
+    masks.update(built_masks)
+
+    now = now or datetime.now()
+    return {day: evaluate(day, grids[day], masks[day], now, duration) for day in days}
+
+def booking_days(*times: Optional[datetime]) -> List[datetime]:
+    """Дни, занятость которых зависит от записей с указанным началом (запись может перейти за полночь)"""
+    days = set()
+    for moment in times:
+        if moment is None:
+            continue
+        day = moment.replace(hour=0, minute=0, second=0, microsecond=0, tzinfo=None)
+        days.update((day, day + timedelta(days=1)))
+    return sorted(days)
+
+async def refresh_days(db: AsyncSession, days: List[datetime]):
+    """Перестроить карты занятости дней после изменения записей (вызывается после commit)"""
+    if not days:
+        return
+    try:
+        gen = int(await redis_client.get(GEN_KEY) or 0)
+        async with redis_client.pipeline(transaction=False) as pipe:
+            for day in days:
+                pipe.incr(version_key(day))
+                pipe.expire(version_key(day), AVAILABILITY_INDEX_TTL * 2)
+            versions = dict(zip(days, (await pipe.execute())[::2]))
+        busy = await load_busy(db, days[0], days[-1])
+        await _store(gen, {}, {day: busy_mask(busy, day) for day in days}, versions)
+    except RedisError as e:
+        logger.warning(f"Не удалось обновить индекс доступности за {', '.join(map(_day_id, days))}: {e}")
+    # Кешированные ответы /working_periods/time_slots за эти дни
+    await invalidate_tags(*(f"time_slots:date:{_day_id(day)}" for day in days))
+
+async def invalidate():
+    """Сбросить весь индекс (изменились рабочие периоды или длительность услуги)"""
+    try:
+        await redis_client.incr(GEN_KEY)
+    except RedisError as e:
+        logger.warning(f"Не удалось сбросить индекс доступности: {e}")
+    await invalidate_tags("time_slots")
+
+async def rebuild(db: AsyncSession, first_day: datetime, last_day: datetime):
+    """Полная перестройка: новое поколение и заполнение индекса на диапазон дней"""
+    await redis_client.incr(GEN_KEY)
+    await day_slots(db, first_day, last_day)
+    await invalidate_tags("time_slots")
+
+async def _main(days: int):
+    from fastapi_cache import FastAPICache
+    from fastapi_cache.backends.redis import RedisBackend
+
+    from server.cache import CACHE_PREFIX
+    from server.database import AsyncSessionLocal, async_engine
+
+    # Для сброса кешированных ответов со слотами
+    FastAPICache.init(RedisBackend(redis_client), prefix=CACHE_PREFIX)
+    today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    try:
+        async with AsyncSessionLocal() as db:
+            await rebuild(db, today, today + timedelta(days=days - 1))
+        logger.info(f"Индекс доступности перестроен на {days} дн. начиная с {_day_id(today)}")
+    finally:
+        await redis_client.close()
+        await async_engine.dispose()
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="Обслуживание индекса доступности в Redis")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    rebuild_parser = subparsers.add_parser("rebuild", help="Сбросить индекс и заполнить его заново")
+    rebuild_parser.add_argument("--days", type=int, default=60, help="Сколько дней вперед заполнить")
+    args = parser.parse_args()
+    asyncio.run(_main(args.days))
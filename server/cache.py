@@ -0,0 +1,523 @@
+"""Ключи кеша FastAPICache, инвалидация по тегам, метрики и заполнение кеша отдельных объектов.
+
+Ключ строится по каноническому виду запроса: путь без завершающего "/" и отсортированные
+параметры (хост, порт и порядок параметров на ключ не влияют), и хранится как
+<prefix>:<namespace>:<хеш>.
+
+Кешированный ответ зависит от набора тегов (client:42, appointments:client:42,
+appointments:date:2026-10-17, ...), которые эндпоинт объявляет через cache_tags. Для каждого
+тега в Redis хранится счетчик поколения, и текущие поколения тегов входят в ключ кеша.
+Запись увеличивает счетчики затронутых тегов (invalidate_tags): старые ключи больше никто
+не читает, и они истекают сами по TTL - без SCAN и удаления по всему namespace. Рядом со
+счетчиком хранится момент последнего сброса тега; самый поздний из них по тегам ответа -
+Last-Modified этого ответа (см. server/conditional.py).
+
+Для редко меняющихся данных (LOCAL_CACHE_NAMESPACES) перед Redis стоит второй уровень - LRU
+в памяти процесса с коротким TTL; в нем же кешируются поколения тегов, так что горячие
+чтения обслуживаются без обращения к сети. Сброс тегов рассылается через Redis pub/sub,
+и каждый воркер удаляет у себя устаревшие поколения. Пока подписка не работает,
+локальный уровень не используется.
+
+Промахи по одному ключу схлопываются (single-flight): пересчитывает ответ только первый
+запрос, остальные в пределах SINGLE_FLIGHT_TIMEOUT ждут его результат, а по истечении
+ожидания считают сами. Для этого эндпоинты и вспомогательные функции кешируются декоратором
+cache отсюда, а не из fastapi_cache.decorator.
+
+Ответы хранятся в формате ORJSONCoder: обычный JSON, в котором даты - строки ISO 8601
+(при попадании их разбирает response_model эндпоинта).
+"""
+import asyncio
+import functools
+import hashlib
+import json
+import logging
+import os
+import time
+import uuid
+from collections import OrderedDict, defaultdict
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from datetime import date
+from urllib.parse import parse_qsl, urlencode
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import orjson
+from fastapi import Request
+from fastapi.encoders import jsonable_encoder
+from fastapi_cache import FastAPICache
+from fastapi_cache.backends.redis import RedisBackend
+from fastapi_cache.coder import Coder
+from fastapi_cache.decorator import cache as fastapi_cache
+from pydantic import BaseModel
+from starlette.datastructures import URL
+from starlette.responses import Response
+
+logger = logging.getLogger(__name__)
+
+# Адрес Redis сервера: кеш ответов, индекс доступности и очередь уведомлений
+REDIS_URL = os.getenv("REDIS_URL", "redis://redis:6379")
+
+# Префикс всех ключей FastAPICache
+CACHE_PREFIX = "fast_api"
+
+# Время жизни счетчиков поколений тегов; должно быть больше срока жизни любой записи кеша,
+# иначе сброшенный в ноль счетчик снова откроет старые ключи
+CACHE_TAG_TTL = int(os.getenv("CACHE_TAG_TTL", "86400"))
+
+# Локальный уровень кеша: размер, время жизни записей и namespace, для которых он включен
+LOCAL_CACHE_MAX_ENTRIES = int(os.getenv("LOCAL_CACHE_MAX_ENTRIES", "10000"))
+LOCAL_CACHE_TTL = int(os.getenv("LOCAL_CACHE_TTL", "30"))
+LOCAL_CACHE_NAMESPACES = {
+    namespace.strip()
+    for namespace in os.getenv("LOCAL_CACHE_NAMESPACES", "services,working_periods,clients,time_slots").split(",")
+    if namespace.strip()
+}
+
+# Формат сохраненных ответов; входит в ключ, чтобы после смены кодировщика не читать чужие записи
+CACHE_FORMAT = "orjson"
+
+# Канал, по которому воркеры узнают о сброшенных тегах
+CACHE_INVALIDATION_CHANNEL = "cache_invalidation"
+
+# Сколько секунд запрос ждет, пока другой запрос пересчитает тот же ключ, прежде чем считать сам
+SINGLE_FLIGHT_TIMEOUT = float(os.getenv("SINGLE_FLIGHT_TIMEOUT", "5"))
+
+def _orjson_default(value):
+    # Модели pydantic, объекты SQLAlchemy, Decimal - так же, как их отдал бы FastAPI
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    return jsonable_encoder(value)
+
+class ORJSONCoder(Coder):
+    """Кодировщик кеша на orjson: datetime, date и UUID сериализуются без обращения к Python-коду"""
+
+    @classmethod
+    def encode(cls, value) -> bytes:
+        if isinstance(value, Response):
+            return value.body
+        return orjson.dumps(value, default=_orjson_default, option=orjson.OPT_NON_STR_KEYS)
+
+    @classmethod
+    def decode(cls, value: bytes):
+        return orjson.loads(value)
+
+    @classmethod
+    def decode_as_type(cls, value: bytes, *, type_=None):
+        # Приведение к типу ответа выполняет response_model эндпоинта
+        return cls.decode(value)
+
+class CacheStats:
+    """Счетчики обращений к кешу по namespace (в пределах процесса)"""
+
+    def __init__(self):
+        self._namespaces = defaultdict(lambda: {
+            "hits": 0,
+            "local_hits": 0,
+            "misses": 0,
+            "errors": 0,
+            "coalesced": 0,
+            "flight_fallbacks": 0,
+            "lookup_time": 0.0,
+            "max_lookup_time": 0.0,
+            "stores": 0,
+            "stored_bytes": 0,
+        })
+
+    def record_lookup(self, namespace: str, elapsed: float, hit: Optional[bool], local: bool = False):
+        stats = self._namespaces[namespace]
+        if local:
+            stats["local_hits"] += 1
+        if hit is None:
+            stats["errors"] += 1
+        else:
+            stats["hits" if hit else "misses"] += 1
+        stats["lookup_time"] += elapsed
+        stats["max_lookup_time"] = max(stats["max_lookup_time"], elapsed)
+
+    def record_flight(self, namespace: str, coalesced: bool):
+        self._namespaces[namespace]["coalesced" if coalesced else "flight_fallbacks"] += 1
+
+    def record_store(self, namespace: str, size: int):
+        stats = self._namespaces[namespace]
+        stats["stores"] += 1
+        stats["stored_bytes"] += size
+
+    def snapshot(self) -> Dict[str, dict]:
+        result = {}
+        for namespace, stats in sorted(self._namespaces.items()):
+            lookups = stats["hits"] + stats["misses"] + stats["errors"]
+            result[namespace] = {
+                "hits": stats["hits"],
+                "local_hits": stats["local_hits"],
+                "misses": stats["misses"],
+                "errors": stats["errors"],
+                "coalesced": stats["coalesced"],
+                "flight_fallbacks": stats["flight_fallbacks"],
+                "hit_ratio": round(stats["hits"] / lookups, 4) if lookups else 0.0,
+                "avg_lookup_ms": round(stats["lookup_time"] / lookups * 1000, 3) if lookups else 0.0,
+                "max_lookup_ms": round(stats["max_lookup_time"] * 1000, 3),
+                "stores": stats["stores"],
+                "stored_bytes": stats["stored_bytes"],
+                "avg_entry_bytes": stats["stored_bytes"] // stats["stores"] if stats["stores"] else 0,
+            }
+        return result
+
+cache_stats = CacheStats()
+
+def key_namespace(key: str) -> str:
+    # <prefix>:<namespace>:<хеш>
+    parts = key.split(":")
+    return parts[1] if len(parts) > 2 else key
+
+class LocalCache:
+    """LRU с TTL в памяти процесса: ответы и поколения тегов"""
+
+    def __init__(self, max_entries: int, ttl: int):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, Tuple[float, bytes]]" = OrderedDict()
+        self._versions: Dict[str, Tuple[float, int, Optional[float]]] = {}
+        # Увеличивается при каждом сбросе тегов: поколения, прочитанные из Redis до сброса,
+        # сохранять уже нельзя
+        self.epoch = 0
+        # Подписка на сбросы активна; без нее локальные данные могли устареть
+        self.live = False
+
+    def get(self, key: str) -> Tuple[int, Optional[bytes]]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return 0, None
+        expires_at, value = entry
+        ttl = expires_at - time.monotonic()
+        if ttl <= 0:
+            del self._entries[key]
+            return 0, None
+        self._entries.move_to_end(key)
+        return int(ttl), value
+
+    def set(self, key: str, value: bytes, expire: Optional[int] = None):
+        ttl = min(expire, self.ttl) if expire else self.ttl
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def get_versions(self, tags: List[str]) -> Optional[Tuple[Dict[str, int], Dict[str, Optional[float]]]]:
+        """Поколения и моменты сброса тегов, если все они есть локально и не истекли"""
+        now = time.monotonic()
+        versions = {}
+        modified = {}
+        for tag in tags:
+            entry = self._versions.get(tag)
+            if entry is None or entry[0] <= now:
+                return None
+            versions[tag], modified[tag] = entry[1], entry[2]
+        return versions, modified
+
+    def set_versions(self, versions: Dict[str, int], modified: Dict[str, Optional[float]], epoch: int):
+        if epoch != self.epoch:
+            return
+        expires_at = time.monotonic() + self.ttl
+        for tag, version in versions.items():
+            self._versions[tag] = (expires_at, version, modified[tag])
+        if len(self._versions) > self.max_entries:
+            self._versions.clear()
+
+    def drop_tags(self, tags: Iterable[str]):
+        self.epoch += 1
+        for tag in tags:
+            self._versions.pop(tag, None)
+
+    def clear(self):
+        self.epoch += 1
+        self._entries.clear()
+        self._versions.clear()
+
+local_cache = LocalCache(LOCAL_CACHE_MAX_ENTRIES, LOCAL_CACHE_TTL)
+
+def uses_local_cache(namespace: str) -> bool:
+    return local_cache.live and namespace in LOCAL_CACHE_NAMESPACES
+
+# Ключи, которые пересчитывает текущее вычисление под декоратором cache
+_led_flights: ContextVar[Optional[List[str]]] = ContextVar("led_flights", default=None)
+
+class SingleFlight:
+    """Ожидающие пересчета ключи: первый промах становится ведущим, остальные ждут его результат"""
+
+    def __init__(self):
+        self._flights: Dict[str, asyncio.Future] = {}
+
+    def join(self, key: str) -> Optional[asyncio.Future]:
+        """Future ведущего запроса или None, если ведущим становится текущий запрос"""
+        flight = self._flights.get(key)
+        if flight is not None and not flight.done():
+            return flight
+        led = _led_flights.get()
+        # Вне leading_flights ключ некому отпустить, если вычисление упадет до записи
+        if led is not None:
+            self._flights[key] = asyncio.get_running_loop().create_future()
+            led.append(key)
+        return None
+
+    def resolve(self, key: str, result: Optional[Tuple[int, bytes]]):
+        flight = self._flights.pop(key, None)
+        if flight is not None and not flight.done():
+            flight.set_result(result)
+
+single_flight = SingleFlight()
+
+@asynccontextmanager
+async def leading_flights():
+    """Отпускает ключи, которые вычисление взялось пересчитать, но не записало (ошибка, 404),
+    чтобы ожидающие не ждали до таймаута"""
+    led = []
+    token = _led_flights.set(led)
+    try:
+        yield
+    finally:
+        _led_flights.reset(token)
+        for key in led:
+            single_flight.resolve(key, None)
+
+def cache(expire: Optional[int] = None, namespace: str = ""):
+    """@cache из fastapi-cache, вычисление которого ведет свои ключи single-flight.
+
+    Подходит и для эндпоинтов, и для функций, вызываемых вне HTTP-запроса.
+    """
+    def decorator(func):
+        cached = fastapi_cache(expire=expire, namespace=namespace)(func)
+
+        @functools.wraps(cached)
+        async def wrapper(*args, **kwargs):
+            async with leading_flights():
+                return await cached(*args, **kwargs)
+        return wrapper
+    return decorator
+
+class InstrumentedRedisBackend(RedisBackend):
+    """Redis-бэкенд FastAPICache с локальным уровнем перед Redis для LOCAL_CACHE_NAMESPACES.
+
+    Считает попадания (в том числе локальные), промахи, время чтения и объем записей.
+    """
+
+    async def get_with_ttl(self, key: str) -> Tuple[int, Optional[bytes]]:
+        namespace = key_namespace(key)
+        start = time.perf_counter()
+        local = uses_local_cache(namespace)
+        if local:
+            ttl, value = local_cache.get(key)
+            if value is not None:
+                cache_stats.record_lookup(namespace, time.perf_counter() - start, True, local=True)
+                return ttl, value
+        try:
+            ttl, value = await super().get_with_ttl(key)
+        except Exception:
+            cache_stats.record_lookup(namespace, time.perf_counter() - start, None)
+            raise
+        cache_stats.record_lookup(namespace, time.perf_counter() - start, value is not None)
+        if value is None:
+            return await self._wait_flight(namespace, key)
+        if local:
+            local_cache.set(key, value, ttl if ttl > 0 else None)
+        return ttl, value
+
+    async def _wait_flight(self, namespace: str, key: str) -> Tuple[int, Optional[bytes]]:
+        flight = single_flight.join(key)
+        if flight is None:
+            return 0, None
+        try:
+            result = await asyncio.wait_for(asyncio.shield(flight), SINGLE_FLIGHT_TIMEOUT)
+        except asyncio.TimeoutError:
+            result = None
+        # Ведущий запрос не записал ответ (ошибка или таймаут) - считаем сами
+        cache_stats.record_flight(namespace, coalesced=result is not None)
+        return result or (0, None)
+
+    async def set(self, key: str, value: bytes, expire: Optional[int] = None) -> None:
+        namespace = key_namespace(key)
+        try:
+            await super().set(key, value, expire)
+            cache_stats.record_store(namespace, len(value))
+        finally:
+            # Ожидающие получают ответ, даже если записать его в Redis не удалось
+            single_flight.resolve(key, (expire or 0, value))
+        if uses_local_cache(namespace):
+            local_cache.set(key, value, expire)
+
+    async def clear(self, namespace: Optional[str] = None, key: Optional[str] = None) -> int:
+        local_cache.clear()
+        return await super().clear(namespace, key)
+
+async def listen_invalidations(redis_client):
+    """Фоновая задача воркера: удалять из локального кеша поколения сброшенных тегов.
+
+    При потере подписки локальный кеш очищается и отключается до переподключения,
+    так как сообщения за это время могли быть потеряны.
+    """
+    while True:
+        pubsub = redis_client.pubsub()
+        try:
+            await pubsub.subscribe(CACHE_INVALIDATION_CHANNEL)
+            async for message in pubsub.listen():
+                if message["type"] == "subscribe":
+                    local_cache.clear()
+                    local_cache.live = True
+                elif message["type"] == "message":
+                    local_cache.drop_tags(json.loads(message["data"]))
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"Подписка на сброс кеша прервана, локальный кеш отключен: {e}")
+        finally:
+            local_cache.live = False
+            local_cache.clear()
+            try:
+                await pubsub.close()
+            except Exception:
+                pass
+        await asyncio.sleep(1)
+
+def cache_tags(builder: Callable[..., Iterable[str]]):
+    """Объявить теги кешированного эндпоинта.
+
+    builder получает аргументы эндпоинта (как именованные) и возвращает теги ответа.
+    Декоратор ставится под @cache, чтобы тот скопировал атрибут в обертку.
+    """
+    def decorator(func):
+        func.cache_tags = builder
+        return func
+    return decorator
+
+def _tag_key(tag: str) -> str:
+    return f"{FastAPICache.get_prefix()}:tag:{tag}"
+
+def _tag_modified_key(tag: str) -> str:
+    return f"{FastAPICache.get_prefix()}:tag_modified:{tag}"
+
+def _last_modified(modified: Dict[str, Optional[float]]) -> Optional[float]:
+    # Тег, который не сбрасывался за CACHE_TAG_TTL, - момент изменения неизвестен
+    if not modified or None in modified.values():
+        return None
+    return max(modified.values())
+
+async def tag_versions(tags: Iterable[str], local: bool = False) -> Tuple[Dict[str, int], Optional[float]]:
+    """Текущие поколения тегов и момент последнего сброса любого из них (unix-время или
+    None, если неизвестен) одним MGET; local - сначала искать в локальном кеше"""
+    tags = sorted(set(tags))
+    if not tags:
+        return {}, None
+    if local:
+        found = local_cache.get_versions(tags)
+        if found is not None:
+            versions, modified = found
+            return versions, _last_modified(modified)
+    epoch = local_cache.epoch
+    values = await FastAPICache.get_backend().redis.mget(
+        [_tag_key(tag) for tag in tags] + [_tag_modified_key(tag) for tag in tags]
+    )
+    versions = {tag: int(value or 0) for tag, value in zip(tags, values)}
+    modified = {tag: float(value) if value else None for tag, value in zip(tags, values[len(tags):])}
+    if local:
+        local_cache.set_versions(versions, modified, epoch)
+    return versions, _last_modified(modified)
+
+async def invalidate_tags(*tags: str):
+    """Сбросить кеш ответов, зависящих от тегов (вызывается после commit)"""
+    tags = sorted(set(tags))
+    if not tags:
+        return
+    now = time.time()
+    try:
+        async with FastAPICache.get_backend().redis.pipeline(transaction=False) as pipe:
+            for tag in tags:
+                pipe.incr(_tag_key(tag))
+                pipe.expire(_tag_key(tag), CACHE_TAG_TTL)
+                pipe.set(_tag_modified_key(tag), now, ex=CACHE_TAG_TTL)
+            pipe.publish(CACHE_INVALIDATION_CHANNEL, json.dumps(tags))
+            await pipe.execute()
+    except Exception as e:
+        logger.warning(f"Не удалось сбросить теги кеша {', '.join(tags)}: {e}")
+    # Свой воркер не ждет сообщения из канала
+    local_cache.drop_tags(tags)
+
+def canonical_request(url: URL) -> str:
+    """Путь без завершающего "/" и отсортированные параметры запроса"""
+    path = url.path.rstrip("/") or "/"
+    return f"{path}?{urlencode(sorted(parse_qsl(url.query, keep_blank_values=True)))}"
+
+def cache_key(
+    namespace: str,
+    func: Callable,
+    url: URL,
+    tags: List[str] = (),
+    versions: Dict[str, int] = None
+) -> str:
+    raw = f"{CACHE_FORMAT}|{func.__module__}.{func.__name__}|{canonical_request(url)}"
+    if tags:
+        raw += "|" + ",".join(f"{tag}={versions[tag]}" for tag in tags)
+    return f"{namespace}:{hashlib.blake2b(raw.encode(), digest_size=16).hexdigest()}"
+
+# Типы аргументов, из которых строится ключ кешируемой функции вне HTTP-запроса
+SIMPLE_TYPES = (str, int, float, bool, date, type(None))
+
+def endpoint_tags(func: Callable, kwargs: dict) -> List[str]:
+    builder = getattr(func, "cache_tags", None)
+    return sorted(set(builder(**kwargs))) if builder else []
+
+async def request_key_builder(
+    func: Callable,
+    namespace: str = "",
+    request: Optional[Request] = None,
+    response=None,
+    args=(),
+    kwargs=None
+) -> str:
+    kwargs = kwargs or {}
+    tags = endpoint_tags(func, kwargs)
+    try:
+        versions, modified = await tag_versions(tags, local=uses_local_cache(namespace.split(":", 1)[-1]))
+    except Exception as e:
+        # Без поколений тегов нельзя гарантировать свежесть: заведомый промах
+        logger.warning(f"Не удалось получить поколения тегов кеша: {e}")
+        return f"{namespace}:nocache:{uuid.uuid4().hex}"
+    if request is None:
+        # Кешируется не эндпоинт, а вспомогательная функция: ключ по ее простым аргументам
+        params = sorted((name, str(value)) for name, value in kwargs.items() if isinstance(value, SIMPLE_TYPES))
+        return cache_key(namespace, func, URL(f"?{urlencode(params)}"), tags, versions)
+    # Поколения, прочитанные до запроса к базе, нужны prime_cache; момент изменения -
+    # ConditionalGetMiddleware для Last-Modified
+    request.state.cache_tag_versions = versions
+    request.state.cache_last_modified = modified
+    return cache_key(namespace, func, request.url, tags, versions)
+
+async def prime_cache(
+    request: Request,
+    namespace: str,
+    endpoint: Callable,
+    items: Dict[int, BaseModel],
+    expire: int
+):
+    """Записать в кеш ответы GET /<объект>/{id} для объектов, полученных одним пакетным запросом.
+
+    Ключ совпадает с тем, который построил бы request_key_builder для прямого запроса,
+    поэтому следующее обращение к /<объект>/{id} будет попаданием в кеш. Используются поколения
+    тегов, прочитанные пакетным запросом до обращения к базе: поколения, прочитанные после,
+    могли уже учесть запись, которой нет в полученных объектах.
+    """
+    backend = FastAPICache.get_backend()
+    coder = FastAPICache.get_coder()
+    namespace = f"{FastAPICache.get_prefix()}:{namespace}"
+    versions = getattr(request.state, "cache_tag_versions", {})
+    tags = {id: endpoint_tags(endpoint, {"id": id}) for id in items}
+    items = {id: item for id, item in items.items() if all(tag in versions for tag in tags[id])}
+    try:
+        await asyncio.gather(*(
+            backend.set(
+                cache_key(namespace, endpoint, request.url_for(endpoint.__name__, id=id), tags[id], versions),
+                coder.encode(item),
+                expire
+            )
+            for id, item in items.items()
+        ))
+    except Exception as e:
+        logger.warning(f"Не удалось заполнить кеш {namespace}: {e}")
@@ -0,0 +1,102 @@
+"""Условные GET-запросы.
+
+Ответы 200 на GET получают ETag, а кешируемые эндпоинты - и Last-Modified: самый поздний
+момент сброса тегов ответа (server/cache.py). У эндпоинтов без тегов реального момента
+изменения нет, и Last-Modified не отдается. ETag и Cache-Control кешируемых ответов ставит
+fastapi-cache; остальным ответам ETag - хеш тела. Если клиент прислал совпадающий
+If-None-Match (или, без него, If-Modified-Since не раньше Last-Modified), вместо тела
+отдается 304.
+"""
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+
+def strong_etag(body: bytes) -> str:
+    return f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    # If-None-Match сравнивается слабо: W/"x" совпадает с "x"
+    if if_none_match.strip() == "*":
+        return True
+    etag = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == etag for tag in if_none_match.split(","))
+
+def not_modified(request_headers: Headers, etag: str, modified: Optional[float]) -> bool:
+    if_none_match = request_headers.get("if-none-match")
+    if if_none_match is not None:
+        return etag_matches(if_none_match, etag)
+    if_modified_since = request_headers.get("if-modified-since")
+    if if_modified_since is not None and modified is not None:
+        try:
+            return int(modified) <= parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+    return False
+
+class ConditionalGetMiddleware:
+    """ASGI-middleware: ETag, Last-Modified и 304 для успешных GET-ответов"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "GET":
+            await self.app(scope, receive, send)
+            return
+
+        start = None
+        # buffer - тело собирается для хеша; skip - отдан 304, тело не отправляется
+        mode = None
+        chunks = []
+
+        async def conditional_send(message):
+            nonlocal start, mode
+            if message["type"] == "http.response.start":
+                start = message
+                if start["status"] != 200:
+                    await send(message)
+                    return
+                headers = MutableHeaders(raw=start["headers"])
+                if "etag" not in headers:
+                    mode = "buffer"
+                    return
+                # Ответ кешируемого эндпоинта: валидаторы уже есть, тело не нужно
+                if await self._send_validated(scope, start, headers["etag"], send):
+                    mode = "skip"
+                return
+            if mode == "skip":
+                return
+            if mode != "buffer" or message["type"] != "http.response.body":
+                await send(message)
+                return
+            # Тело нужно целиком, чтобы посчитать хеш; ответы API небольшие и не потоковые
+            chunks.append(message.get("body", b""))
+            if not message.get("more_body", False):
+                body = b"".join(chunks)
+                headers = MutableHeaders(raw=start["headers"])
+                headers["ETag"] = strong_etag(body)
+                if not await self._send_validated(scope, start, headers["etag"], send):
+                    await send({"type": "http.response.body", "body": body})
+
+        await self.app(scope, receive, conditional_send)
+
+    async def _send_validated(self, scope, start, etag: str, send) -> bool:
+        """Отправить начало ответа или 304; True, если отдан 304"""
+        headers = MutableHeaders(raw=start["headers"])
+        # Момент изменения кладет в состояние запроса request_key_builder кешируемого эндпоинта
+        modified = scope.get("state", {}).get("cache_last_modified")
+        if modified is not None:
+            headers["Last-Modified"] = format_datetime(datetime.fromtimestamp(int(modified), timezone.utc), usegmt=True)
+
+        if not_modified(Headers(scope=scope), etag, modified):
+            del headers["content-length"]
+            del headers["content-type"]
+            await send({"type": "http.response.start", "status": 304, "headers": headers.raw})
+            await send({"type": "http.response.body", "body": b""})
+            return True
+
+        await send(start)
+        return False
@@ -1,11 +1,12 @@
 from fastapi import APIRouter
 
-from . import appointments, clients, messages, notifications, services, working_periods
+from . import appointments, clients, health, messages, notifications, services, working_periods
 
 api_router = APIRouter()
 
 api_router.include_router(appointments.router, prefix="/appointments", tags=["appointments"])
 api_router.include_router(clients.router, prefix="/clients", tags=["clients"])
+api_router.include_router(health.router, prefix="/health", tags=["health"])
 api_router.include_router(messages.router, prefix="/messages", tags=["messages"])
 api_router.include_router(notifications.router, prefix="/notifications", tags=["notifications"])
 api_router.include_router(services.router, prefix="/services", tags=["services"])
@@ -1,16 +1,22 @@
 import logging
-from typing import List, Optional
-from datetime import datetime, timedelta
+from typing import Iterable, List, Literal, Optional, Set, Union
+from datetime import date, datetime, timedelta
 from zoneinfo import ZoneInfo
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request
 from fastapi.params import Depends, Query
-from fastapi_cache import FastAPICache
-from fastapi_cache.decorator import cache
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.orm import joinedload
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from server import availability_index
 from server.database import get_db
-from server.models import Appointment, AppointmentCreate, AppointmentOut, AppointmentUpdate
+from server.models import Appointment, AppointmentCreate, AppointmentExpandedOut, AppointmentOut, AppointmentUpdate
+from server.models import ClientOut, Cursor, Page, ServiceOut
+from server.cache import cache, cache_tags, invalidate_tags, prime_cache
+from server.queries import (
+    DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, apply_keyset, as_utc_naive, build_page, day_bound, id_in, parse_ids
+)
 from .notifications import NotificationPayload, delete_notification, schedule_notification
 from .notifications import send_notification
 
@@ -18,31 +24,162 @@ logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
 router = APIRouter()
 
-@router.get("", response_model=List[AppointmentOut])
+EXPANDABLE = {"client": Appointment.client, "service": Appointment.service}
+
+def parse_expand(expand: Optional[str]) -> Set[str]:
+    """Разобрать параметр expand=client,service"""
+    if not expand:
+        return set()
+    fields = {field.strip() for field in expand.split(",") if field.strip()}
+    unknown = fields - EXPANDABLE.keys()
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown expand fields: {', '.join(sorted(unknown))}")
+    return fields
+
+def with_expand(query, fields: Set[str]):
+    # joinedload подтягивает клиента и услугу тем же SELECT через JOIN
+    return query.options(*(joinedload(EXPANDABLE[field]) for field in sorted(fields)))
+
+# Список за диапазон from/to длиннее этого зависит от общего тега списков, а не от тегов дней
+MAX_DATE_TAGS = 31
+
+def appointment_tags(*appointments) -> List[str]:
+    """Теги, которые затрагивает изменение записи; передаются состояния до и после изменения.
+
+    Тег appointments - списки записей без фильтра по клиенту или дате.
+    """
+    tags = ["appointments"]
+    for appointment in appointments:
+        tags += [
+            f"appointment:{appointment.id}",
+            f"appointments:client:{appointment.client_id}",
+            f"appointments:date:{as_utc_naive(appointment.scheduled_time).date()}",
+        ]
+    return tags
+
+def expand_tags(fields: Set[str], client_id: Optional[int] = None) -> List[str]:
+    # Встроенные клиент и услуга устаревают вместе с ними самими
+    tags = []
+    if "client" in fields:
+        tags.append(f"client:{client_id}" if client_id is not None else "clients")
+    if "service" in fields:
+        tags.append("services")
+    return tags
+
+def date_tags(from_time: Optional[datetime], to_time: Optional[datetime]) -> Optional[List[str]]:
+    """Теги дней полуинтервала [from, to) или None, если диапазон открыт или слишком длинный"""
+    if from_time is None or to_time is None:
+        return None
+    first_day = as_utc_naive(from_time).date()
+    last_day = (as_utc_naive(to_time) - timedelta(microseconds=1)).date()
+    if (last_day - first_day).days >= MAX_DATE_TAGS:
+        return None
+    return [f"appointments:date:{first_day + timedelta(days=i)}" for i in range((last_day - first_day).days + 1)]
+
+def list_tags(
+    ids: Optional[str] = None,
+    client_id: Optional[int] = None,
+    from_time: Union[datetime, date, None] = None,
+    to_time: Union[datetime, date, None] = None,
+    expand: Optional[str] = None,
+    **_
+) -> Iterable[str]:
+    """Теги списка записей: по самому узкому из фильтров ids, client_id, [from, to)"""
+    from_time, to_time = day_bound(from_time), day_bound(to_time, end=True)
+    id_list = parse_ids(ids)
+    if id_list is not None:
+        tags = [f"appointment:{id}" for id in id_list]
+    elif client_id is not None:
+        tags = [f"appointments:client:{client_id}"]
+    else:
+        tags = date_tags(from_time, to_time) or ["appointments"]
+    return tags + expand_tags(parse_expand(expand), client_id)
+
+def serialize_appointment(appointment: Appointment, fields: Set[str]) -> AppointmentExpandedOut:
+    # Связи читаем только если они загружены: ленивая загрузка в асинхронной сессии недоступна
+    result = AppointmentExpandedOut(**AppointmentOut.model_validate(appointment).model_dump())
+    if "client" in fields:
+        result.client = ClientOut.model_validate(appointment.client)
+    if "service" in fields:
+        result.service = ServiceOut.model_validate(appointment.service)
+    return result
+
+@router.get("", response_model=Page[AppointmentExpandedOut])
 @cache(expire=600, namespace="appointments")
-async def get_appointments(client_id: Optional[int] = Query(default=None),
-                           db: Session = Depends(get_db)):
-    print("Берем не из кеша")
-    query = db.query(Appointment)
+@cache_tags(list_tags)
+async def get_appointments(request: Request,
+                           ids: Optional[str] = Query(default=None),
+                           client_id: Optional[int] = Query(default=None),
+                           service_id: Optional[int] = Query(default=None),
+                           status: Optional[List[str]] = Query(default=None),
+                           from_time: Union[datetime, date, None] = Query(default=None, alias="from"),
+                           to_time: Union[datetime, date, None] = Query(default=None, alias="to"),
+                           order_by: Literal["scheduled_time", "-scheduled_time"] = Query(default="scheduled_time"),
+                           after_time: Optional[datetime] = Query(default=None),
+                           after_id: Optional[int] = Query(default=None),
+                           limit: int = Query(default=DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+                           expand: Optional[str] = Query(default=None),
+                           db: AsyncSession = Depends(get_db)):
+    """Записи с фильтрами, постранично по курсору.
+
+    from / to - полуинтервал [from, to) по scheduled_time; дата вместо времени означает день целиком
+    (from=2030-01-04&to=2030-01-05 - записи 4 и 5 января), status можно передать несколько раз,
+    order_by=-scheduled_time - от поздних к ранним (after_time тогда указывает назад по времени),
+    expand=client,service - встроить клиента и услугу в каждую запись,
+    ids=1,2,3 - пакетная выборка по id (курсор и limit при этом не используются).
+    """
+    fields = parse_expand(expand)
+    from_time, to_time = day_bound(from_time), day_bound(to_time, end=True)
+    query = with_expand(select(Appointment), fields)
+    id_list = parse_ids(ids)
     if client_id is not None:
-        query = query.filter(Appointment.client_id == client_id)
-    return query.all()
+        query = query.where(Appointment.client_id == client_id)
+    if service_id is not None:
+        query = query.where(Appointment.service_id == service_id)
+    if status:
+        query = query.where(Appointment.status.in_(status))
+    if from_time is not None:
+        query = query.where(Appointment.scheduled_time >= as_utc_naive(from_time))
+    if to_time is not None:
+        query = query.where(Appointment.scheduled_time < as_utc_naive(to_time))
+    if id_list is not None:
+        query = query.where(id_in(Appointment.id, id_list)).order_by(Appointment.id)
+        rows = (await db.execute(query)).scalars().all()
+        items = [serialize_appointment(row, fields) for row in rows]
+        if not fields:
+            await prime_cache(request, "appointments", get_appointment, {item.id: item for item in items}, expire=600)
+        return Page[AppointmentExpandedOut](items=items)
 
-@router.get("/{id}", response_model=AppointmentOut)
+    query = apply_keyset(
+        query, (Appointment.scheduled_time, Appointment.id), after_id, after_time,
+        descending=order_by.startswith("-")
+    )
+    rows = (await db.execute(query.limit(limit + 1))).scalars().all()
+    return build_page(
+        rows, limit, AppointmentExpandedOut,
+        lambda last: Cursor(after_id=last.id, after_time=last.scheduled_time),
+        lambda appointment: serialize_appointment(appointment, fields)
+    )
+
+@router.get("/{id}", response_model=AppointmentExpandedOut)
 @cache(expire=600, namespace="appointments")
+@cache_tags(lambda id, expand=None, **_: [f"appointment:{id}"] + expand_tags(parse_expand(expand)))
 async def get_appointment(id: int,
-        db: Session = Depends(get_db)):
-    result = db.query(Appointment).filter(Appointment.id == id).first()
+        expand: Optional[str] = Query(default=None),
+        db: AsyncSession = Depends(get_db)):
+    fields = parse_expand(expand)
+    query = with_expand(select(Appointment).where(Appointment.id == id), fields)
+    result = (await db.execute(query)).scalars().first()
     if not result:
         raise HTTPException(status_code=404, detail="Appointment not found")
-    return result
+    return serialize_appointment(result, fields)
 
 @router.patch("/{id}", response_model=AppointmentOut)
 async def patch_appointments(
         id: int,
         update: AppointmentUpdate,
-        db: Session = Depends(get_db)):
-    to_update = db.query(Appointment).filter(Appointment.id == id).first()
+        db: AsyncSession = Depends(get_db)):
+    to_update = await db.get(Appointment, id)
     if not to_update:
         raise HTTPException(status_code=404, detail="Appointment not found")
 
@@ -51,13 +188,19 @@ async def patch_appointments(
     old_scheduled_time = appointment_out.scheduled_time
     new_scheduled_time = update.scheduled_time
 
-    # Обновляем SQLAlchemy модель
-    for key, value in update.model_dump(exclude_unset=True).items():
+    # Обновляем SQLAlchemy модель; время с часовым поясом колонка без пояса не примет
+    values = update.model_dump(exclude_unset=True)
+    if values.get("scheduled_time") is not None:
+        values["scheduled_time"] = as_utc_naive(values["scheduled_time"])
+    for key, value in values.items():
         setattr(to_update, key, value)
 
-    await FastAPICache.clear("appointments")
-    db.commit()
-    db.refresh(to_update)
+    await db.commit()
+    await db.refresh(to_update)
+    await invalidate_tags(*appointment_tags(appointment_out, to_update))
+    # Занятость меняется и в прежнем дне записи, и в новом
+    await availability_index.refresh_days(
+        db, availability_index.booking_days(old_scheduled_time, to_update.scheduled_time))
 
     # Если обновляется scheduled_time, обновляем уведомления
     if new_scheduled_time is not None:
@@ -81,18 +224,19 @@ async def patch_appointments(
 @router.post("", response_model=AppointmentOut)
 async def create_appointment(
         appointment: AppointmentCreate,
-        db: Session = Depends(get_db)
+        db: AsyncSession = Depends(get_db)
 ):
-    db_appointment = Appointment(**appointment.model_dump())
+    # Время храним в наивном UTC: колонка без часового пояса
+    db_appointment = Appointment(**{
+        **appointment.model_dump(), "scheduled_time": as_utc_naive(appointment.scheduled_time)
+    })
     db.add(db_appointment)
-    await FastAPICache.clear("appointments")
-    db.commit()
-    db.refresh(db_appointment)
+    await db.commit()
+    await db.refresh(db_appointment)
+    await invalidate_tags(*appointment_tags(db_appointment))
+    await availability_index.refresh_days(db, availability_index.booking_days(db_appointment.scheduled_time))
     
     # Создаем уведомление
-    from datetime import datetime, timedelta
-    from zoneinfo import ZoneInfo
-    
     # Убедимся, что время в UTC
     scheduled_time = appointment.scheduled_time
     if scheduled_time.tzinfo is None:
@@ -133,12 +277,13 @@ async def create_appointment(
     return db_appointment
 
 @router.delete("/{id}")
-async def delete_appointment(id: int, db: Session = Depends(get_db)):
-    appointment = db.query(Appointment).filter(Appointment.id == id).first()
+async def delete_appointment(id: int, db: AsyncSession = Depends(get_db)):
+    appointment = await db.get(Appointment, id)
     if not appointment:
         raise HTTPException(status_code=404, detail="Appointment not found")
     
-    db.delete(appointment)
-    await FastAPICache.clear("appointments")
-    db.commit()
+    await db.delete(appointment)
+    await db.commit()
+    await invalidate_tags(*appointment_tags(appointment))
+    await availability_index.refresh_days(db, availability_index.booking_days(appointment.scheduled_time))
     return {"message": "Appointment deleted successfully"}
\ No newline at end of file
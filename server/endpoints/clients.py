@@ -1,41 +1,80 @@
 from typing import List, Optional
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request
 from fastapi.params import Depends, Query
-from fastapi_cache import FastAPICache
-from fastapi_cache.decorator import cache
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from server.database import get_db
-from server.models import Client, ClientCreate, ClientOut, ClientUpdate
+from server.models import Appointment, Client, ClientCreate, ClientOut, ClientUpdate, Cursor, Page
+from server.cache import cache, cache_tags, invalidate_tags, prime_cache
+from server.queries import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, apply_keyset, build_page, id_in, parse_ids
 
 router = APIRouter()
 
-@router.get("", response_model=List[ClientOut])
+def client_tags(*clients: Client) -> List[str]:
+    """Теги, которые затрагивает изменение клиента; передаются состояния до и после изменения.
+
+    Тег clients - списки клиентов и записи со встроенным клиентом (expand=client).
+    """
+    tags = ["clients"]
+    for client in clients:
+        tags += [f"client:{client.id}", f"client:telegram:{client.telegram_id}", f"client:phone:{client.phone_number}"]
+    return tags
+
+def search_tags(telegram_id: Optional[int] = None, phone_number: Optional[str] = None, **_) -> List[str]:
+    tags = []
+    if telegram_id is not None:
+        tags.append(f"client:telegram:{telegram_id}")
+    if phone_number is not None:
+        tags.append(f"client:phone:{phone_number}")
+    return tags
+
+def list_tags(ids: Optional[str] = None, **_) -> List[str]:
+    id_list = parse_ids(ids)
+    return ["clients"] if id_list is None else [f"client:{id}" for id in id_list]
+
+@router.get("", response_model=Page[ClientOut])
 @cache(expire=600, namespace="clients")
-async def get_clients(db: Session = Depends(get_db)):
-    print("Берем не из кеша")
-    result = db.query(Client).all()
-    return result
+@cache_tags(list_tags)
+async def get_clients(
+    request: Request,
+    ids: Optional[str] = Query(default=None),
+    after_id: Optional[int] = Query(default=None),
+    limit: int = Query(default=DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: AsyncSession = Depends(get_db)
+):
+    """Клиенты в порядке id, постранично по курсору; ids=1,2,3 - пакетная выборка по id"""
+    id_list = parse_ids(ids)
+    if id_list is not None:
+        query = select(Client).where(id_in(Client.id, id_list)).order_by(Client.id)
+        items = [ClientOut.model_validate(row) for row in (await db.execute(query)).scalars().all()]
+        await prime_cache(request, "clients", get_client, {item.id: item for item in items}, expire=600)
+        return Page[ClientOut](items=items)
+
+    query = apply_keyset(select(Client), (Client.id,), after_id)
+    rows = (await db.execute(query.limit(limit + 1))).scalars().all()
+    return build_page(rows, limit, ClientOut, lambda last: Cursor(after_id=last.id))
 
 @router.get("/search", response_model=ClientOut)
 @cache(expire=600, namespace="clients")
-def search_client(
+@cache_tags(search_tags)
+async def search_client(
     telegram_id: Optional[int] = Query(default=None),
     phone_number: Optional[str] = Query(default=None),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     if not telegram_id and not phone_number:
         raise HTTPException(status_code=400, detail="Need at least one of telegram_id or phone_number")
 
-    query = db.query(Client)
+    query = select(Client)
     if telegram_id is not None:
-        query = query.filter(Client.telegram_id == telegram_id)
+        query = query.where(Client.telegram_id == telegram_id)
     if phone_number is not None:
-        query = query.filter(Client.phone_number == phone_number)
+        query = query.where(Client.phone_number == phone_number)
 
     print(phone_number)
-    client = query.first()
+    client = (await db.execute(query)).scalars().first()
     if not client:
         raise HTTPException(status_code=404, detail="Client not found")
 
@@ -43,10 +82,11 @@ def search_client(
 
 @router.get("/{id}", response_model=ClientOut)
 @cache(expire=600, namespace="clients")
+@cache_tags(lambda id, **_: [f"client:{id}"])
 async def get_client(
         id: int,
-        db: Session = Depends(get_db)):
-    result = db.query(Client).filter(Client.id == id).first()
+        db: AsyncSession = Depends(get_db)):
+    result = await db.get(Client, id)
     if not result:
         raise HTTPException(status_code=404, detail="Client not found")
     return result
@@ -54,13 +94,13 @@ async def get_client(
 @router.post("", response_model=ClientOut)
 async def create_client(
         client: ClientCreate,
-        db: Session = Depends(get_db)
+        db: AsyncSession = Depends(get_db)
 ):
     db_client = Client(**client.model_dump())
     db.add(db_client)
-    await FastAPICache.clear("clients")
-    db.commit()
-    db.refresh(db_client)
+    await db.commit()
+    await db.refresh(db_client)
+    await invalidate_tags(*client_tags(db_client))
 
     return db_client
 
@@ -68,17 +108,18 @@ async def create_client(
 async def update_client(
         id: int,
         update: ClientUpdate,
-        db: Session = Depends(get_db)):
-    to_update = db.query(Client).filter(Client.id == id).first()
+        db: AsyncSession = Depends(get_db)):
+    to_update = await db.get(Client, id)
     if not to_update:
         raise HTTPException(status_code=404, detail="Client not found")
 
+    old_state = ClientOut.model_validate(to_update)
     for key, value in update.model_dump(exclude_unset=True).items():
         setattr(to_update, key, value)
 
-    await FastAPICache.clear("clients")
-    db.commit()
-    db.refresh(to_update)
+    await db.commit()
+    await db.refresh(to_update)
+    await invalidate_tags(*client_tags(old_state, to_update))
     return to_update
 
 @router.patch("", response_model=ClientOut)
@@ -86,42 +127,47 @@ async def patch_clients(update_client: ClientUpdate,
         id: Optional[int] = Query(default=None),
         telegram_id: Optional[int] = Query(default=None),
         phone_number: Optional[str] = Query(default=None),
-        db: Session = Depends(get_db)):
+        db: AsyncSession = Depends(get_db)):
     if not id and not telegram_id and not phone_number:
         raise HTTPException(status_code=400, detail="Need at least one of id, telegram_id or phone_number")
 
-    query = db.query(Client)
+    query = select(Client)
     if id is not None:
-        query = query.filter(Client.id == id)
+        query = query.where(Client.id == id)
     if telegram_id is not None:
-        query = query.filter(Client.telegram_id == telegram_id)
+        query = query.where(Client.telegram_id == telegram_id)
     if phone_number is not None:
-        query = query.filter(Client.phone_number == phone_number)
+        query = query.where(Client.phone_number == phone_number)
 
-    client = query.first()
+    client = (await db.execute(query)).scalars().first()
     if not client:
         raise HTTPException(status_code=404, detail="Client not found")
 
+    old_state = ClientOut.model_validate(client)
     for key, value in update_client.model_dump(exclude_unset=True).items():
         setattr(client, key, value)
 
-    await FastAPICache.clear("clients")
-    db.commit()
-    db.refresh(client)
+    await db.commit()
+    await db.refresh(client)
+    await invalidate_tags(*client_tags(old_state, client))
     return client
 
 @router.delete("/{id}")
-async def delete_client(id: int, db: Session = Depends(get_db)):
-    client = db.query(Client).filter(Client.id == id).first()
+async def delete_client(id: int, db: AsyncSession = Depends(get_db)):
+    client = await db.get(Client, id)
     if not client:
         raise HTTPException(status_code=404, detail="Client not found")
-    if client.appointments:
+    # Ленивая загрузка связей недоступна в асинхронной сессии, проверяем записи отдельным запросом
+    has_appointments = (await db.execute(
+        select(Appointment.id).where(Appointment.client_id == id).limit(1)
+    )).first()
+    if has_appointments:
         raise HTTPException(
             status_code=400, 
             detail="Cannot delete client with existing appointments. Delete appointments first."
         )
     
-    db.delete(client)
-    await FastAPICache.clear("clients")
-    db.commit()
+    await db.delete(client)
+    await db.commit()
+    await invalidate_tags(*client_tags(client))
     return {"message": "Client deleted successfully"}
\ No newline at end of file
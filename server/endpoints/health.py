@@ -0,0 +1,75 @@
+import logging
+import time
+from typing import Dict, Optional
+
+from fastapi import APIRouter, HTTPException
+from fastapi.params import Depends
+from fastapi_cache import FastAPICache
+from pydantic import BaseModel
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from server.cache import cache_stats
+from server.database import get_db, get_pool_status
+
+logger = logging.getLogger(__name__)
+router = APIRouter()
+
+class PoolStatus(BaseModel):
+    pool_size: int
+    max_overflow: int
+    checked_out: int
+    idle: int
+    overflow: int
+    checkouts: int
+    checkout_failures: int
+    avg_wait_ms: float
+    max_wait_ms: float
+    slow_queries: int
+
+class DatabaseHealth(BaseModel):
+    status: str
+    ping_ms: float
+    pool: PoolStatus
+
+class CacheNamespaceStats(BaseModel):
+    hits: int
+    local_hits: int
+    misses: int
+    errors: int
+    coalesced: int
+    flight_fallbacks: int
+    hit_ratio: float
+    avg_lookup_ms: float
+    max_lookup_ms: float
+    stores: int
+    stored_bytes: int
+    avg_entry_bytes: int
+
+class CacheHealth(BaseModel):
+    redis_used_memory_bytes: Optional[int]
+    namespaces: Dict[str, CacheNamespaceStats]
+
+@router.get("/db", response_model=DatabaseHealth)
+async def database_health(db: AsyncSession = Depends(get_db)):
+    """Проверка доступности базы данных и статистика пула соединений"""
+    start = time.perf_counter()
+    try:
+        await db.execute(text("SELECT 1"))
+    except Exception as e:
+        logger.error(f"База данных недоступна: {e}")
+        raise HTTPException(status_code=503, detail="Database unavailable")
+    ping_ms = round((time.perf_counter() - start) * 1000, 3)
+
+    # Снимок пула берем после запроса, чтобы соединение этой проверки уже было учтено
+    return DatabaseHealth(status="ok", ping_ms=ping_ms, pool=PoolStatus(**get_pool_status()))
+
+@router.get("/cache", response_model=CacheHealth)
+async def cache_health():
+    """Попадания, промахи, время чтения и объем записей кеша по namespace (с запуска процесса)"""
+    used_memory = None
+    try:
+        used_memory = (await FastAPICache.get_backend().redis.info("memory")).get("used_memory")
+    except Exception as e:
+        logger.warning(f"Не удалось получить статистику памяти Redis: {e}")
+    return CacheHealth(redis_used_memory_bytes=used_memory, namespaces=cache_stats.snapshot())
@@ -1,26 +1,27 @@
-from typing import List, Optional
+from datetime import datetime
+from typing import Optional
 from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import SQLAlchemyError
-from sqlalchemy import or_, and_
-import json
+from sqlalchemy import func, and_, select
 import logging
 
 from server.database import get_db
-from server.models import Message, MessageCreate, MessageOut, MessageUpdate
+from server.models import Cursor, Message, MessageCreate, MessageOut, MessageUpdate, Page
+from server.queries import apply_keyset, build_page
 from server.endpoints.notifications import send_notification
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
 @router.post("/", response_model=MessageOut)
-async def create_message(message: MessageCreate, db: Session = Depends(get_db)):
+async def create_message(message: MessageCreate, db: AsyncSession = Depends(get_db)):
     """Создать новое сообщение"""
     try:
         db_message = Message(**message.model_dump())
         db.add(db_message)
-        db.commit()
-        db.refresh(db_message)
+        await db.commit()
+        await db.refresh(db_message)
         
         # Отправляем уведомление о новом сообщении
         notification_data = {
@@ -39,42 +40,48 @@ async def create_message(message: MessageCreate, db: Session = Depends(get_db)):
         
         return db_message
     except SQLAlchemyError as e:
-        db.rollback()
+        await db.rollback()
         logger.error(f"Ошибка при создании сообщения: {e}")
         raise HTTPException(status_code=500, detail="Ошибка при создании сообщения")
 
-@router.get("/", response_model=List[MessageOut])
-def get_messages(
+@router.get("/", response_model=Page[MessageOut])
+async def get_messages(
     user_id: Optional[int] = None,
     is_read: Optional[int] = None,
-    skip: int = Query(0, ge=0),
+    after_time: Optional[datetime] = None,
+    after_id: Optional[int] = None,
     limit: int = Query(100, ge=1, le=100),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
-    """Получить список сообщений"""
+    """Получить список сообщений (от новых к старым, постранично по курсору)"""
     try:
-        query = db.query(Message)
+        query = select(Message)
         
         if user_id is not None:
             # Фильтруем сообщения для данного пользователя
-            query = query.filter(Message.user_id == user_id)
+            query = query.where(Message.user_id == user_id)
         
         if is_read is not None:
-            query = query.filter(Message.is_read == is_read)
+            query = query.where(Message.is_read == is_read)
             
-        query = query.order_by(Message.created_at.desc())
-        messages = query.offset(skip).limit(limit).all()
+        query = apply_keyset(
+            query, (Message.created_at, Message.id), after_id, after_time, descending=True
+        )
+        rows = (await db.execute(query.limit(limit + 1))).scalars().all()
         
-        return messages
+        return build_page(
+            rows, limit, MessageOut,
+            lambda last: Cursor(after_id=last.id, after_time=last.created_at)
+        )
     except SQLAlchemyError as e:
         logger.error(f"Ошибка при получении списка сообщений: {e}")
         raise HTTPException(status_code=500, detail="Ошибка при получении списка сообщений")
 
 @router.get("/{message_id}", response_model=MessageOut)
-def get_message(message_id: int, db: Session = Depends(get_db)):
+async def get_message(message_id: int, db: AsyncSession = Depends(get_db)):
     """Получить сообщение по ID"""
     try:
-        message = db.query(Message).filter(Message.id == message_id).first()
+        message = await db.get(Message, message_id)
         if not message:
             raise HTTPException(status_code=404, detail="Сообщение не найдено")
         return message
@@ -83,10 +90,10 @@ def get_message(message_id: int, db: Session = Depends(get_db)):
         raise HTTPException(status_code=500, detail="Ошибка при получении сообщения")
 
 @router.put("/{message_id}", response_model=MessageOut)
-def update_message(message_id: int, message_update: MessageUpdate, db: Session = Depends(get_db)):
+async def update_message(message_id: int, message_update: MessageUpdate, db: AsyncSession = Depends(get_db)):
     """Обновить сообщение"""
     try:
-        db_message = db.query(Message).filter(Message.id == message_id).first()
+        db_message = await db.get(Message, message_id)
         if not db_message:
             raise HTTPException(status_code=404, detail="Сообщение не найдено")
         
@@ -94,59 +101,59 @@ def update_message(message_id: int, message_update: MessageUpdate, db: Session =
         for key, value in update_data.items():
             setattr(db_message, key, value)
             
-        db.commit()
-        db.refresh(db_message)
+        await db.commit()
+        await db.refresh(db_message)
         return db_message
     except SQLAlchemyError as e:
-        db.rollback()
+        await db.rollback()
         logger.error(f"Ошибка при обновлении сообщения: {e}")
         raise HTTPException(status_code=500, detail="Ошибка при обновлении сообщения")
 
 @router.delete("/{message_id}", response_model=dict)
-def delete_message(message_id: int, db: Session = Depends(get_db)):
+async def delete_message(message_id: int, db: AsyncSession = Depends(get_db)):
     """Удалить сообщение"""
     try:
-        db_message = db.query(Message).filter(Message.id == message_id).first()
+        db_message = await db.get(Message, message_id)
         if not db_message:
             raise HTTPException(status_code=404, detail="Сообщение не найдено")
         
-        db.delete(db_message)
-        db.commit()
+        await db.delete(db_message)
+        await db.commit()
         return {"message": "Сообщение успешно удалено"}
     except SQLAlchemyError as e:
-        db.rollback()
+        await db.rollback()
         logger.error(f"Ошибка при удалении сообщения: {e}")
         raise HTTPException(status_code=500, detail="Ошибка при удалении сообщения")
 
 @router.get("/unread/{user_id}", response_model=int)
-def get_unread_count(user_id: int, db: Session = Depends(get_db)):
+async def get_unread_count(user_id: int, db: AsyncSession = Depends(get_db)):
     """Получить количество непрочитанных сообщений"""
     try:
-        count = db.query(Message).filter(
+        count = await db.scalar(select(func.count(Message.id)).where(
             and_(
                 Message.user_id == user_id,
                 Message.is_read == 0,
                 Message.is_from_admin == 1  # Считаем только сообщения от админа
             )
-        ).count()
+        ))
         return count
     except SQLAlchemyError as e:
         logger.error(f"Ошибка при получении количества непрочитанных сообщений: {e}")
         raise HTTPException(status_code=500, detail="Ошибка при получении количества непрочитанных сообщений")
 
 @router.put("/read/{message_id}", response_model=MessageOut)
-def mark_as_read(message_id: int, db: Session = Depends(get_db)):
+async def mark_as_read(message_id: int, db: AsyncSession = Depends(get_db)):
     """Пометить сообщение как прочитанное"""
     try:
-        db_message = db.query(Message).filter(Message.id == message_id).first()
+        db_message = await db.get(Message, message_id)
         if not db_message:
             raise HTTPException(status_code=404, detail="Сообщение не найдено")
         
         db_message.is_read = 1
-        db.commit()
-        db.refresh(db_message)
+        await db.commit()
+        await db.refresh(db_message)
         return db_message
     except SQLAlchemyError as e:
-        db.rollback()
+        await db.rollback()
         logger.error(f"Ошибка при пометке сообщения как прочитанного: {e}")
         raise HTTPException(status_code=500, detail="Ошибка при пометке сообщения как прочитанного") 
\ No newline at end of file
@@ -6,14 +6,14 @@ from typing import Any, List, Optional
 import json
 import redis
 from rq_scheduler import Scheduler
-import os
+import uuid
 from zoneinfo import ZoneInfo
 
+from server.cache import REDIS_URL
+
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
-# Получаем URL Redis из переменной окружения или используем значение по умолчанию
-REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
 redis_conn = redis.Redis.from_url(REDIS_URL)
 scheduler = Scheduler(connection=redis_conn)
 
@@ -138,11 +138,19 @@ async def send_notification_endpoint(payload: dict):
         raise HTTPException(status_code=500, detail=str(e))
 
 def send_notification(payload: dict):
-    """Отправляет уведомление в Redis Pub/Sub канал"""
+    """Отправляет уведомление в Redis Pub/Sub канал.
+
+    notification_id - уникальный id публикации: уведомление получают все копии бота, а
+    отправляет в Telegram только одна из них.
+    """
     try:
-        redis_conn.publish("notifications", json.dumps(payload))
+        redis_conn.publish("notifications", json.dumps({**payload, "notification_id": uuid.uuid4().hex}))
         logger.info(f"Отправил уведомление клиентской части: {payload}")
     except Exception as e:
         logger.error(f"Ошибка при отправке уведомления: {e}")
         
-    return {"status": "sent"} 
\ No newline at end of file
+    return {"status": "sent"}
+
+def notify_catalog_changed(catalog: str):
+    """Сообщает ботам, что изменился справочник (services или working_periods) и их копию нужно перечитать"""
+    send_notification({"type": "catalog_changed", "catalog": catalog})
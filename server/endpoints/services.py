@@ -1,40 +1,71 @@
-from typing import List
+from typing import List, Optional
 
-from fastapi import APIRouter, HTTPException
-from fastapi.params import Depends
-from fastapi_cache import FastAPICache
-from fastapi_cache.decorator import cache
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.params import Depends, Query
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from server import availability_index
 from server.database import get_db
-from server.models import Service, ServiceCreate, ServiceOut, ServiceUpdate
+from server.models import Appointment, Cursor, Page, Service, ServiceCreate, ServiceOut, ServiceUpdate
+from server.cache import cache, cache_tags, invalidate_tags, prime_cache
+from server.endpoints.notifications import notify_catalog_changed
+from server.queries import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, apply_keyset, build_page, id_in, parse_ids
 
 router = APIRouter()
 
-@router.get("", response_model=List[ServiceOut])
+def service_tags(id: int) -> List[str]:
+    """Теги, которые затрагивает изменение услуги.
+
+    Тег services - списки услуг и записи со встроенной услугой (expand=service).
+    """
+    return ["services", f"service:{id}"]
+
+def list_tags(ids: Optional[str] = None, **_) -> List[str]:
+    id_list = parse_ids(ids)
+    return ["services"] if id_list is None else [f"service:{id}" for id in id_list]
+
+@router.get("", response_model=Page[ServiceOut])
 @cache(expire=600, namespace="services")
-async def get_services(db: Session = Depends(get_db)):
-    print("Берем не из кеша")
-    result = db.query(Service).all()
-    return result
+@cache_tags(list_tags)
+async def get_services(
+    request: Request,
+    ids: Optional[str] = Query(default=None),
+    after_id: Optional[int] = Query(default=None),
+    limit: int = Query(default=DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: AsyncSession = Depends(get_db)
+):
+    """Услуги в порядке id, постранично по курсору; ids=1,2,3 - пакетная выборка по id"""
+    id_list = parse_ids(ids)
+    if id_list is not None:
+        query = select(Service).where(id_in(Service.id, id_list)).order_by(Service.id)
+        items = [ServiceOut.model_validate(row) for row in (await db.execute(query)).scalars().all()]
+        await prime_cache(request, "services", get_service, {item.id: item for item in items}, expire=600)
+        return Page[ServiceOut](items=items)
+
+    query = apply_keyset(select(Service), (Service.id,), after_id)
+    rows = (await db.execute(query.limit(limit + 1))).scalars().all()
+    return build_page(rows, limit, ServiceOut, lambda last: Cursor(after_id=last.id))
 
 @router.post("", response_model=ServiceOut)
 async def create_service(
         service: ServiceCreate,
-        db: Session = Depends(get_db)):
+        db: AsyncSession = Depends(get_db)):
     db_service = Service(**service.model_dump())
     db.add(db_service)
-    await FastAPICache.clear("services")
-    db.commit()
-    db.refresh(db_service)
+    await db.commit()
+    await db.refresh(db_service)
+    await invalidate_tags(*service_tags(db_service.id))
+    notify_catalog_changed("services")
     return db_service
 
 @router.get("/{id}", response_model=ServiceOut)
 @cache(expire=600, namespace="services")
+@cache_tags(lambda id, **_: [f"service:{id}"])
 async def get_service(
         id: int,
-        db: Session = Depends(get_db)):
-    result = db.query(Service).filter(Service.id == id).first()
+        db: AsyncSession = Depends(get_db)):
+    result = await db.get(Service, id)
     if not result:
         raise HTTPException(status_code=404, detail="Service not found")
     return result
@@ -43,31 +74,41 @@ async def get_service(
 async def update_service(
         id: int,
         update: ServiceUpdate,
-        db: Session = Depends(get_db)):
-    to_update = db.query(Service).filter(Service.id == id).first()
+        db: AsyncSession = Depends(get_db)):
+    to_update = await db.get(Service, id)
     if not to_update:
         raise HTTPException(status_code=404, detail="Service not found")
 
-    for key, value in update.model_dump(exclude_unset=True).items():
+    update_data = update.model_dump(exclude_unset=True)
+    for key, value in update_data.items():
         setattr(to_update, key, value)
 
-    await FastAPICache.clear("services")
-    db.commit()
-    db.refresh(to_update)
+    await db.commit()
+    await db.refresh(to_update)
+    await invalidate_tags(*service_tags(id))
+    notify_catalog_changed("services")
+    # От длительности услуги зависит занятость всех дней с ее записями
+    if "duration" in update_data:
+        await availability_index.invalidate()
     return to_update
 
 @router.delete("/{id}")
-async def delete_service(id: int, db: Session = Depends(get_db)):
-    service = db.query(Service).filter(Service.id == id).first()
+async def delete_service(id: int, db: AsyncSession = Depends(get_db)):
+    service = await db.get(Service, id)
     if not service:
         raise HTTPException(status_code=404, detail="Service not found")
-    if service.orders:
+    # Ленивая загрузка связей недоступна в асинхронной сессии, проверяем записи отдельным запросом
+    has_orders = (await db.execute(
+        select(Appointment.id).where(Appointment.service_id == id).limit(1)
+    )).first()
+    if has_orders:
         raise HTTPException(
             status_code=400, 
             detail="Cannot delete service with existing appointments. Delete appointments first."
         )
     
-    db.delete(service)
-    await FastAPICache.clear("services")
-    db.commit()
+    await db.delete(service)
+    await db.commit()
+    await invalidate_tags(*service_tags(id))
+    notify_catalog_changed("services")
     return {"message": "Service deleted successfully"}
\ No newline at end of file
@@ -6,9 +6,9 @@ from zoneinfo import ZoneInfo
 from fastapi import APIRouter, HTTPException
 from fastapi.params import Depends, Query
 from fastapi_cache import FastAPICache
-from fastapi_cache.decorator import cache
 from sqlalchemy.orm import Session
 
+from server.cache import cache
 from server.database import get_db
 from server.models import TimeSlot, TimeSlotCreate, TimeSlotOut, TimeSlotUpdate, Appointment
 
@@ -1,17 +1,18 @@
 import logging
 from typing import List, Optional
-from datetime import datetime, timedelta
-from zoneinfo import ZoneInfo
+from datetime import datetime
 
 from fastapi import APIRouter, HTTPException
 from fastapi.params import Depends, Query
-from fastapi_cache import FastAPICache
-from fastapi_cache.decorator import cache
-from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
 
+from server import availability_index
+from server.cache import cache, cache_tags, invalidate_tags
 from server.database import get_db
-from server.models import WorkingPeriod, WorkingPeriodCreate, WorkingPeriodOut, WorkingPeriodUpdate, Appointment, TimeSlot
+from server.endpoints.notifications import notify_catalog_changed
+from server.models import WorkingPeriod, WorkingPeriodCreate, WorkingPeriodOut, WorkingPeriodUpdate, Service, TimeSlot
+from server.models import DayAvailability
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
@@ -19,33 +20,64 @@ router = APIRouter()
 
 @router.get("", response_model=List[WorkingPeriodOut])
 @cache(expire=300, namespace="working_periods")
+@cache_tags(lambda **_: ["working_periods"])
 async def get_working_periods(
     active_only: bool = Query(default=False),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Получить список рабочих периодов.
     Можно фильтровать только активные периоды.
     """
-    query = db.query(WorkingPeriod)
+    query = select(WorkingPeriod)
     
     # Фильтрация по активности
     if active_only:
-        query = query.filter(WorkingPeriod.is_active == 1)
+        query = query.where(WorkingPeriod.is_active == 1)
     
     # Сортировка по дате начала
     query = query.order_by(WorkingPeriod.start_date)
     
-    return query.all()
+    result = await db.execute(query)
+    return result.scalars().all()
+
+@cache(expire=600, namespace="time_slots")
+@cache_tags(lambda day, **_: [f"time_slots:date:{day.strftime('%Y-%m-%d')}", "time_slots"])
+async def day_time_slots(day: datetime, service_id: Optional[int], db: AsyncSession) -> List[dict]:
+    """
+    Слоты дня без учета текущего времени. Кешируются по дате и услуге; кеш дня сбрасывается
+    при изменении его записей, а весь - при изменении рабочих периодов или длительности услуг.
+    Время хранится строками ISO, чтобы из кеша возвращались те же наивные datetime.
+    """
+    duration = None
+    if service_id is not None:
+        duration = await db.scalar(select(Service.duration).where(Service.id == service_id))
+        if duration is None:
+            raise HTTPException(status_code=404, detail="Service not found")
+    
+    # Сетка и занятость дня читаются из индекса в Redis; в базу идем только при промахе
+    slots = (await availability_index.day_slots(db, day, day, duration, now=datetime.min))[day]
+    day_id = day.strftime('%Y-%m-%d')
+    return [
+        {
+            "id": f"{day_id}_{slot.start.strftime('%H-%M')}",
+            "start_time": slot.start.isoformat(),
+            "end_time": slot.end.isoformat(),
+            "is_available": slot.is_available
+        }
+        for slot in slots
+    ]
 
 @router.get("/time_slots", response_model=List[TimeSlot])
 async def get_time_slots(
     date: Optional[str] = Query(default=None),
-    db: Session = Depends(get_db)
+    service_id: Optional[int] = Query(default=None),
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Получить список доступных временных слотов на указанную дату.
     Слоты генерируются на основе рабочих периодов и существующих записей.
+    Если передан service_id, слот доступен только когда в него помещается вся услуга.
     """
     # Проверяем формат даты
     try:
@@ -56,94 +88,61 @@ async def get_time_slots(
     except ValueError:
         raise HTTPException(status_code=400, detail="Invalid date format. Use YYYY-MM-DD")
     
-    # Получаем следующий день
-    next_day = target_date + timedelta(days=1)
-    
-    # Получаем рабочие периоды, которые включают указанную дату
-    working_periods = db.query(WorkingPeriod).filter(
-        WorkingPeriod.is_active == 1,
-        WorkingPeriod.start_date <= target_date,
-        WorkingPeriod.end_date >= target_date
-    ).all()
-    
-    if not working_periods:
-        return []
+    slots = [TimeSlot.model_validate(slot) for slot in await day_time_slots(day=target_date, service_id=service_id, db=db)]
     
-    # Получаем существующие записи на эту дату
-    appointments = db.query(Appointment).filter(
-        Appointment.scheduled_time >= target_date,
-        Appointment.scheduled_time < next_day
-    ).all()
-    
-    # Создаем словарь занятых временных интервалов
-    busy_times = {}
-    for appointment in appointments:
-        # Предполагаем, что каждая запись занимает 1 час (можно настроить в зависимости от услуги)
-        start_time = appointment.scheduled_time
-        end_time = start_time + timedelta(minutes=60)  # Можно настроить в зависимости от услуги
-        
-        # Храним занятые интервалы
-        busy_times[start_time.strftime("%H:%M")] = {
-            "start": start_time,
-            "end": end_time
-        }
-    
-    # Генерируем доступные слоты для каждого рабочего периода
-    available_slots = []
+    # Прошедшие слоты отсекаем при каждом чтении, а не при заполнении кеша
+    now = datetime.now()
+    for slot in slots:
+        slot.is_available = slot.is_available and slot.start_time > now
+    return slots
+
+# Ограничение длины диапазона сводки, чтобы один запрос не генерировал слоты на годы вперед
+MAX_AVAILABILITY_DAYS = 62
+
+@router.get("/availability", response_model=List[DayAvailability])
+async def get_availability(
+    from_date: str = Query(alias="from"),
+    to_date: str = Query(alias="to"),
+    service_id: Optional[int] = Query(default=None),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Количество свободных и всех слотов по дням диапазона [from, to] (даты YYYY-MM-DD).
+    Дни берутся из индекса доступности; недостающие достраиваются двумя запросами на весь диапазон.
+    """
+    try:
+        first_day = datetime.strptime(from_date, "%Y-%m-%d")
+        last_day = datetime.strptime(to_date, "%Y-%m-%d")
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid date format. Use YYYY-MM-DD")
+    if last_day < first_day:
+        raise HTTPException(status_code=400, detail="'to' must not be earlier than 'from'")
+    if (last_day - first_day).days >= MAX_AVAILABILITY_DAYS:
+        raise HTTPException(status_code=400, detail=f"Range is limited to {MAX_AVAILABILITY_DAYS} days")
     
-    for period in working_periods:
-        # Парсим времена начала и окончания
-        start_hour, start_minute = map(int, period.start_time.split(':'))
-        end_hour, end_minute = map(int, period.end_time.split(':'))
-        
-        # Устанавливаем время начала и окончания для текущего дня
-        current_time = target_date.replace(hour=start_hour, minute=start_minute, second=0, microsecond=0)
-        end_time = target_date.replace(hour=end_hour, minute=end_minute, second=0, microsecond=0)
-        
-        # Генерируем слоты с учетом продолжительности
-        while current_time + timedelta(minutes=period.slot_duration) <= end_time:
-            slot_end = current_time + timedelta(minutes=period.slot_duration)
-            current_time_str = current_time.strftime("%H:%M")
-            
-            # Проверяем, не занят ли этот временной слот
-            is_available = True
-            for busy_start, busy_data in busy_times.items():
-                busy_start_time = busy_data["start"]
-                busy_end_time = busy_data["end"]
-                
-                # Проверяем пересечение интервалов
-                if (current_time < busy_end_time and slot_end > busy_start_time):
-                    is_available = False
-                    break
-            
-            # Если текущее время уже прошло, помечаем слот как недоступный
-            if current_time <= datetime.now():
-                is_available = False
-            
-            # Создаем слот и добавляем его в список
-            slot = TimeSlot(
-                id=f"{target_date.strftime('%Y-%m-%d')}_{current_time_str.replace(':', '-')}",
-                start_time=current_time,
-                end_time=slot_end,
-                is_available=is_available
-            )
-            available_slots.append(slot)
-            
-            # Переходим к следующему слоту
-            current_time = slot_end
+    duration = None
+    if service_id is not None:
+        duration = await db.scalar(select(Service.duration).where(Service.id == service_id))
+        if duration is None:
+            raise HTTPException(status_code=404, detail="Service not found")
     
-    return available_slots
+    days = await availability_index.day_slots(db, first_day, last_day, duration)
+    return [
+        {"date": day.date(), "free": sum(slot.is_available for slot in slots), "total": len(slots)}
+        for day, slots in days.items()
+    ]
 
 @router.get("/{id}", response_model=WorkingPeriodOut)
 @cache(expire=300, namespace="working_periods")
+@cache_tags(lambda id, **_: [f"working_period:{id}"])
 async def get_working_period(
     id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Получить информацию о конкретном рабочем периоде
     """
-    period = db.query(WorkingPeriod).filter(WorkingPeriod.id == id).first()
+    period = await db.get(WorkingPeriod, id)
     if not period:
         raise HTTPException(status_code=404, detail="Working period not found")
     return period
@@ -151,7 +150,7 @@ async def get_working_period(
 @router.post("", response_model=WorkingPeriodOut)
 async def create_working_period(
     period: WorkingPeriodCreate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Создать новый рабочий период
@@ -184,9 +183,11 @@ async def create_working_period(
     # Создаем рабочий период
     db_period = WorkingPeriod(**period.model_dump())
     db.add(db_period)
-    await FastAPICache.clear("working_periods")
-    db.commit()
-    db.refresh(db_period)
+    await db.commit()
+    await db.refresh(db_period)
+    await invalidate_tags("working_periods", f"working_period:{db_period.id}")
+    await availability_index.invalidate()
+    notify_catalog_changed("working_periods")
     
     return db_period
 
@@ -194,13 +195,13 @@ async def create_working_period(
 async def update_working_period(
     id: int,
     period_update: WorkingPeriodUpdate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Обновить информацию о рабочем периоде
     """
     # Проверяем существование периода
-    db_period = db.query(WorkingPeriod).filter(WorkingPeriod.id == id).first()
+    db_period = await db.get(WorkingPeriod, id)
     if not db_period:
         raise HTTPException(status_code=404, detail="Working period not found")
     
@@ -245,28 +246,32 @@ async def update_working_period(
     for key, value in update_data.items():
         setattr(db_period, key, value)
     
-    await FastAPICache.clear("working_periods")
-    db.commit()
-    db.refresh(db_period)
+    await db.commit()
+    await db.refresh(db_period)
+    await invalidate_tags("working_periods", f"working_period:{id}")
+    await availability_index.invalidate()
+    notify_catalog_changed("working_periods")
     
     return db_period
 
 @router.delete("/{id}")
 async def delete_working_period(
     id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Удалить рабочий период
     """
     # Проверяем существование периода
-    db_period = db.query(WorkingPeriod).filter(WorkingPeriod.id == id).first()
+    db_period = await db.get(WorkingPeriod, id)
     if not db_period:
         raise HTTPException(status_code=404, detail="Working period not found")
     
     # Удаляем период
-    db.delete(db_period)
-    await FastAPICache.clear("working_periods")
-    db.commit()
+    await db.delete(db_period)
+    await db.commit()
+    await invalidate_tags("working_periods", f"working_period:{id}")
+    await availability_index.invalidate()
+    notify_catalog_changed("working_periods")
     
     return {"message": "Working period deleted successfully"} 
\ No newline at end of file
@@ -0,0 +1,71 @@
+"""Начальная схема: услуги, клиенты, записи, рабочие периоды, сообщения
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_table(
+        "services",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("name", sa.String(), nullable=False, unique=True),
+        sa.Column("description", sa.String(), nullable=True),
+        sa.Column("price", sa.Float(), nullable=False),
+    )
+    op.create_table(
+        "clients",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("telegram_id", sa.BigInteger(), nullable=True),
+        sa.Column("name", sa.String(), nullable=True),
+        sa.Column("phone_number", sa.String(), nullable=True),
+        sa.Column("timezone", sa.String(), nullable=True),
+    )
+    op.create_index("ix_clients_telegram_id", "clients", ["telegram_id"], unique=True)
+    op.create_index("ix_clients_phone_number", "clients", ["phone_number"], unique=True)
+    op.create_table(
+        "appointments",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("client_id", sa.Integer(), sa.ForeignKey("clients.id"), nullable=False),
+        sa.Column("service_id", sa.Integer(), sa.ForeignKey("services.id"), nullable=False),
+        sa.Column("car_model", sa.String(), nullable=True),
+        sa.Column("scheduled_time", sa.DateTime(), nullable=False),
+        sa.Column("status", sa.String(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+    )
+    op.create_table(
+        "working_periods",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("start_date", sa.DateTime(), nullable=False),
+        sa.Column("end_date", sa.DateTime(), nullable=False),
+        sa.Column("start_time", sa.String(), nullable=False),
+        sa.Column("end_time", sa.String(), nullable=False),
+        sa.Column("slot_duration", sa.Integer(), nullable=False),
+        sa.Column("is_active", sa.Integer(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+    )
+    op.create_table(
+        "messages",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("text", sa.Text(), nullable=False),
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("clients.id"), nullable=False),
+        sa.Column("is_from_admin", sa.Integer(), nullable=True),
+        sa.Column("is_read", sa.Integer(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+    )
+
+def downgrade():
+    op.drop_table("messages")
+    op.drop_table("working_periods")
+    op.drop_table("appointments")
+    op.drop_index("ix_clients_phone_number", table_name="clients")
+    op.drop_index("ix_clients_telegram_id", table_name="clients")
+    op.drop_table("clients")
+    op.drop_table("services")
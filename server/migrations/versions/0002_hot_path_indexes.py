@@ -0,0 +1,38 @@
+"""Индексы для частых запросов: записи по времени и клиенту, переписка, непрочитанные
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_index("ix_appointments_scheduled_time", "appointments", ["scheduled_time"])
+    op.create_index(
+        "ix_appointments_client_id_scheduled_time",
+        "appointments",
+        ["client_id", "scheduled_time"]
+    )
+    op.create_index("ix_appointments_service_id", "appointments", ["service_id"])
+    op.create_index("ix_messages_user_id_created_at", "messages", ["user_id", "created_at"])
+    # Частичный индекс: в нем только непрочитанные сообщения от администратора,
+    # поэтому он остается маленьким и подсчет не читает всю переписку клиента
+    op.create_index(
+        "ix_messages_unread_from_admin",
+        "messages",
+        ["user_id"],
+        postgresql_where=sa.text("is_read = 0 AND is_from_admin = 1")
+    )
+
+def downgrade():
+    op.drop_index("ix_messages_unread_from_admin", table_name="messages")
+    op.drop_index("ix_messages_user_id_created_at", table_name="messages")
+    op.drop_index("ix_appointments_service_id", table_name="appointments")
+    op.drop_index("ix_appointments_client_id_scheduled_time", table_name="appointments")
+    op.drop_index("ix_appointments_scheduled_time", table_name="appointments")
@@ -0,0 +1,40 @@
+"""Индексы по ключам курсорной пагинации: (scheduled_time, id) и (created_at, id)
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17
+"""
+from alembic import op
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    # Индексы из 0002 расширяются колонкой id, чтобы выборка страницы
+    # по условию (время, id) > (:after_time, :after_id) шла по одному индексу
+    op.create_index("ix_appointments_scheduled_time_id", "appointments", ["scheduled_time", "id"])
+    op.drop_index("ix_appointments_scheduled_time", table_name="appointments")
+    op.create_index(
+        "ix_appointments_client_id_scheduled_time_id",
+        "appointments",
+        ["client_id", "scheduled_time", "id"]
+    )
+    op.drop_index("ix_appointments_client_id_scheduled_time", table_name="appointments")
+    op.create_index("ix_messages_user_id_created_at_id", "messages", ["user_id", "created_at", "id"])
+    op.drop_index("ix_messages_user_id_created_at", table_name="messages")
+    op.create_index("ix_messages_created_at_id", "messages", ["created_at", "id"])
+
+def downgrade():
+    op.drop_index("ix_messages_created_at_id", table_name="messages")
+    op.create_index("ix_messages_user_id_created_at", "messages", ["user_id", "created_at"])
+    op.drop_index("ix_messages_user_id_created_at_id", table_name="messages")
+    op.create_index(
+        "ix_appointments_client_id_scheduled_time",
+        "appointments",
+        ["client_id", "scheduled_time"]
+    )
+    op.drop_index("ix_appointments_client_id_scheduled_time_id", table_name="appointments")
+    op.create_index("ix_appointments_scheduled_time", "appointments", ["scheduled_time"])
+    op.drop_index("ix_appointments_scheduled_time_id", table_name="appointments")
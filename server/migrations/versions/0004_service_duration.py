@@ -0,0 +1,23 @@
+"""Длительность услуги в минутах
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    # Существующие услуги получают прежнюю неявную длительность записи - 60 минут
+    op.add_column(
+        "services",
+        sa.Column("duration", sa.Integer(), nullable=False, server_default="60")
+    )
+
+def downgrade():
+    op.drop_column("services", "duration")
@@ -1,12 +1,25 @@
-from datetime import datetime
-from typing import Optional
+from datetime import date, datetime
+from typing import Generic, List, Optional, TypeVar
 
-from sqlalchemy import Column, Integer, String, Float, ForeignKey, DateTime, BigInteger, Text
+from sqlalchemy import Column, Integer, String, Float, ForeignKey, DateTime, BigInteger, Text, Index
+from sqlalchemy import text as sql_text
 from sqlalchemy.orm import relationship
 
 from server.database import Base
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
+
+T = TypeVar("T")
+
+class Cursor(BaseModel):
+    """Параметры запроса следующей страницы (передаются как after_id / after_time)"""
+    after_id: int
+    after_time: Optional[datetime] = None
+
+class Page(BaseModel, Generic[T]):
+    """Страница списка; next_cursor = None, если это последняя страница"""
+    items: List[T]
+    next_cursor: Optional[Cursor] = None
 
 class Service(Base):
     __tablename__ = 'services'
@@ -15,17 +28,20 @@ class Service(Base):
     name = Column(String, unique=True, nullable=False)
     description = Column(String)
     price = Column(Float, nullable=False)
+    duration = Column(Integer, nullable=False, default=60, server_default="60")  # Длительность услуги в минутах
     orders = relationship("Appointment", back_populates="service")
 
 class ServiceCreate(BaseModel):
     name: str
     description: Optional[str] = None
     price: float
+    duration: int = Field(default=60, gt=0)
 
 class ServiceUpdate(BaseModel):
     name: Optional[str] = None
     description: Optional[str] = None
     price: Optional[float] = None
+    duration: Optional[int] = Field(default=None, gt=0)
 
 class ServiceOut(ServiceCreate):
     id: int
@@ -75,6 +91,17 @@ class Appointment(Base):
     status = Column(String, nullable=False, default="pending")
     created_at = Column(DateTime, default=datetime.utcnow)
 
+    # Индексы создаются миграциями (server/migrations), здесь описаны для полноты метаданных
+    __table_args__ = (
+        # Выборка записей по диапазону времени (слоты на день, списки записей)
+        # и постраничный вывод по ключу (scheduled_time, id)
+        Index("ix_appointments_scheduled_time_id", "scheduled_time", "id"),
+        # Записи конкретного клиента в хронологическом порядке
+        Index("ix_appointments_client_id_scheduled_time_id", "client_id", "scheduled_time", "id"),
+        # Проверка наличия записей перед удалением услуги
+        Index("ix_appointments_service_id", "service_id"),
+    )
+
 class AppointmentCreate(BaseModel):
     client_id: int
     service_id: int
@@ -94,6 +121,11 @@ class AppointmentOut(AppointmentCreate):
     created_at: datetime
     model_config = {"from_attributes": True}
 
+# Запись со связанными объектами, запрошенными через ?expand=client,service
+class AppointmentExpandedOut(AppointmentOut):
+    client: Optional[ClientOut] = None
+    service: Optional[ServiceOut] = None
+
 class WorkingPeriod(Base):
     __tablename__ = "working_periods"
 
@@ -134,6 +166,12 @@ class TimeSlot(BaseModel):
     end_time: datetime
     is_available: bool = True
 
+# Сводка по дню для календаря: сколько слотов свободно из общего числа
+class DayAvailability(BaseModel):
+    date: date
+    free: int
+    total: int
+
 class Message(Base):
     __tablename__ = "messages"
 
@@ -147,6 +185,19 @@ class Message(Base):
     is_read = Column(Integer, default=0)  # 0 - не прочитано, 1 - прочитано
     created_at = Column(DateTime, default=datetime.utcnow)
 
+    __table_args__ = (
+        # Переписка клиента, отсортированная по дате (ключ пагинации (created_at, id))
+        Index("ix_messages_user_id_created_at_id", "user_id", "created_at", "id"),
+        # Общий список сообщений для администратора
+        Index("ix_messages_created_at_id", "created_at", "id"),
+        # Частичный индекс для подсчета непрочитанных сообщений от администратора
+        Index(
+            "ix_messages_unread_from_admin",
+            "user_id",
+            postgresql_where=sql_text("is_read = 0 AND is_from_admin = 1")
+        ),
+    )
+
 class MessageCreate(BaseModel):
     text: str
     user_id: int
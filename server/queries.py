@@ -0,0 +1,86 @@
+"""Общие помощники для списков: курсорная (keyset) пагинация"""
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Callable, List, Optional, Sequence, Type, Union
+
+from fastapi import HTTPException
+from pydantic import BaseModel
+from sqlalchemy import ARRAY, Integer, Select, any_, literal, tuple_
+
+from server.models import Cursor, Page
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+def parse_ids(ids: Optional[str]) -> Optional[List[int]]:
+    """Разобрать параметр ids=1,2,3 (None - параметр не передан)"""
+    if ids is None:
+        return None
+    try:
+        values = sorted({int(value) for value in ids.split(",") if value.strip()})
+    except ValueError:
+        raise HTTPException(status_code=400, detail="ids must be a comma-separated list of integers")
+    if len(values) > MAX_PAGE_SIZE:
+        raise HTTPException(status_code=400, detail=f"Too many ids, at most {MAX_PAGE_SIZE} allowed")
+    return values
+
+def id_in(column, ids: List[int]):
+    """Условие column = ANY(:ids): один параметр-массив вместо IN со списком литералов"""
+    return column == any_(literal(ids, type_=ARRAY(Integer)))
+
+def as_utc_naive(value: Optional[datetime]) -> Optional[datetime]:
+    """Привести время из параметров запроса к наивному UTC, в котором хранятся даты в БД"""
+    if value is None or value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+def day_bound(value: Union[datetime, date, None], end: bool = False) -> Optional[datetime]:
+    """Граница диапазона from / to, переданная датой: начало дня, для конца (end) - начало следующего дня,
+    чтобы полуинтервал [from, to) включал этот день целиком"""
+    if value is None or isinstance(value, datetime):
+        return value
+    return datetime.combine(value + timedelta(days=1) if end else value, time.min)
+
+def apply_keyset(
+    query: Select,
+    columns: Sequence,
+    after_id: Optional[int],
+    after_time: Optional[datetime] = None,
+    descending: bool = False
+) -> Select:
+    """Добавить к запросу сортировку по ключу и условие «после курсора».
+
+    columns - колонки ключа сортировки: (id,) или (время, id). Условие строится как
+    сравнение кортежей, поэтому страница читается по индексу с нужной позиции,
+    а не пропуском строк через OFFSET.
+    """
+    after_time = as_utc_naive(after_time)
+    if len(columns) == 2:
+        if after_id is not None and after_time is None:
+            raise HTTPException(status_code=400, detail="after_id requires after_time")
+        if after_time is not None:
+            key = tuple_(*columns)
+            if after_id is not None:
+                bound = tuple_(after_time, after_id)
+                query = query.where(key < bound if descending else key > bound)
+            else:
+                query = query.where(columns[0] < after_time if descending else columns[0] > after_time)
+    elif after_id is not None:
+        query = query.where(columns[0] < after_id if descending else columns[0] > after_id)
+
+    return query.order_by(*(column.desc() if descending else column for column in columns))
+
+def build_page(
+    rows: List,
+    limit: int,
+    schema: Type[BaseModel],
+    cursor: Callable[[object], Cursor],
+    serialize: Optional[Callable[[object], BaseModel]] = None
+) -> Page:
+    """Собрать страницу из limit + 1 строк: лишняя строка означает, что есть продолжение"""
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    serialize = serialize or schema.model_validate
+    return Page[schema](
+        items=[serialize(row) for row in rows],
+        next_cursor=cursor(rows[-1]) if has_more else None
+    )